@@ -0,0 +1,99 @@
+# benchmarks/compare.py
+"""
+Compares benchmark results (benchmarks/suite.py) against a stored baseline.
+
+A benchmark regresses when its time or peak RSS grows by more than the
+threshold (relative to the baseline), or when it is in the baseline but
+failed or is missing from the results. Exits with status 1 on regressions.
+
+Usage:
+    python -m benchmarks.compare bench_results.json bench_baseline.json \
+        --threshold 0.10 --rss-threshold 0.20
+"""
+
+import argparse
+import json
+import sys
+
+TIME_THRESHOLD = 0.10
+RSS_THRESHOLD = 0.20
+
+# Metric -> which threshold applies (all metrics: lower is better)
+METRICS = {"seconds": "time", "peak_rss_mb": "rss"}
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    time_threshold: float = TIME_THRESHOLD,
+    rss_threshold: float = RSS_THRESHOLD,
+) -> list:
+    """
+    Returns the regressions of `results` against `baseline`, as dicts with the
+    benchmark, metric, baseline and current values and relative change, or
+    with the benchmark and an `error` when it failed or did not run.
+    Benchmarks that failed in the baseline, or are new, are not compared.
+    """
+    thresholds = {"time": time_threshold, "rss": rss_threshold}
+    regressions = []
+    current_results = results.get("results", {})
+    for name, reference in baseline.get("results", {}).items():
+        if "error" in reference:
+            continue
+        current = current_results.get(name)
+        if current is None or "error" in current:
+            error = "missing from the results" if current is None else current["error"]
+            regressions.append({"benchmark": name, "error": error})
+            continue
+        for metric, kind in METRICS.items():
+            if not reference.get(metric) or metric not in current:
+                continue
+            change = current[metric] / reference[metric] - 1
+            if change > thresholds[kind]:
+                regressions.append(
+                    {
+                        "benchmark": name,
+                        "metric": metric,
+                        "baseline": reference[metric],
+                        "current": current[metric],
+                        "change": change,
+                    }
+                )
+    return regressions
+
+
+def print_report(regressions: list):
+    if not regressions:
+        print("No regressions against the baseline.")
+        return
+    print(f"{len(regressions)} regression(s) against the baseline:")
+    for regression in regressions:
+        if "error" in regression:
+            print(f"  {regression['benchmark']}: failed ({regression['error']})")
+            continue
+        print(
+            f"  {regression['benchmark']} {regression['metric']}: "
+            f"{regression['baseline']:.3f} -> {regression['current']:.3f} "
+            f"({regression['change']:+.1%})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("results")
+    parser.add_argument("baseline")
+    parser.add_argument("--threshold", type=float, default=TIME_THRESHOLD)
+    parser.add_argument("--rss-threshold", type=float, default=RSS_THRESHOLD)
+    args = parser.parse_args()
+
+    with open(args.results, encoding="utf-8") as f:
+        results = json.load(f)
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold, args.rss_threshold)
+    print_report(regressions)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# benchmarks/compare_backends.py
+"""
+Accuracy-vs-speed comparison of the inference backends of the model agents.
+
+Every agent runs on the same fixed sample set with each backend. Speed is the
+median time per sample over `--repeats` runs (after one warm-up run); accuracy
+is agreement with the PyTorch fp32 outputs.
+
+Usage:
+    python -m benchmarks.compare_backends --backends pytorch int8 onnx \
+        --agents summarization_agent qa_agent ner_agent formula_agent \
+        --threads 4 --output backend_comparison.json
+"""
+
+import argparse
+import json
+import statistics
+import time
+from src.agents.backends import BACKENDS
+from src.agents.registry import AGENT_CLASSES, MODEL_AGENTS, AgentRegistry
+from src.document import Document
+
+SAMPLE_TEXTS = [
+    "The board of Northwind Traders approved the annual budget on Tuesday. "
+    "Chief executive Maria Jensen said revenue grew by twelve percent, driven "
+    "by exports to Germany and Japan, while costs rose more slowly than "
+    "expected. The company plans to open two new warehouses next year.",
+    "Heavy rain caused flooding across the southern districts overnight. "
+    "Mayor Thomas Berg told reporters that three schools would remain closed "
+    "until Friday and that emergency shelters had been opened in the city "
+    "hall and the central library.",
+    "The study followed 1,200 patients over five years. Researchers led by "
+    "Dr. Aisha Khan found that a daily thirty-minute walk reduced the risk of "
+    "heart disease by a fifth, independent of diet and body weight.",
+    "This agreement is entered into by Acme Corporation and Peter Olsen. The "
+    "contractor shall deliver the software no later than March 1 and the "
+    "client shall pay the invoice within thirty days of delivery.",
+    "The central bank left interest rates unchanged at four percent. Governor "
+    "Elena Rossi warned that inflation remains above target and that further "
+    "increases could not be ruled out if wage growth stays strong.",
+]
+
+SAMPLE_QUESTIONS = [
+    "Who is the chief executive?",
+    "How long will the schools remain closed?",
+    "How much did walking reduce the risk of heart disease?",
+    "When must the invoice be paid?",
+    "What is the interest rate?",
+]
+
+SAMPLE_FORMULAS = ["x^2 + y^2 = z^2", "E = mc^2", "a/b + c/d", "f(x) = 3x + 1"]
+
+
+def _formula_documents() -> list:
+    """
+    Renders the sample formulas as images (deterministic, no files needed).
+    """
+    from PIL import Image, ImageDraw
+
+    images = []
+    for formula in SAMPLE_FORMULAS:
+        image = Image.new("RGB", (320, 64), "white")
+        ImageDraw.Draw(image).text((10, 24), formula, fill="black")
+        images.append(image)
+    documents = []
+    for image in images:
+        document = Document("")
+        document.image_paths = [image]  # to_pil_image accepts PIL images
+        documents.append(document)
+    return documents
+
+
+def _run(agent_name: str, agent, documents: list) -> list:
+    if agent_name == "qa_agent":
+        return [
+            agent.execute(document, question=question)
+            for document, question in zip(documents, SAMPLE_QUESTIONS)
+        ]
+    if agent_name == "formula_agent":
+        return [agent.execute(document) for document in documents]
+    return agent.execute_batch(documents)
+
+
+def _token_f1(prediction: str, reference: str) -> float:
+    prediction_tokens = prediction.lower().split()
+    reference_tokens = reference.lower().split()
+    if not prediction_tokens or not reference_tokens:
+        return float(prediction_tokens == reference_tokens)
+    common = 0
+    remaining = list(reference_tokens)
+    for token in prediction_tokens:
+        if token in remaining:
+            remaining.remove(token)
+            common += 1
+    if not common:
+        return 0.0
+    precision = common / len(prediction_tokens)
+    recall = common / len(reference_tokens)
+    return 2 * precision * recall / (precision + recall)
+
+
+def _set_f1(prediction, reference) -> float:
+    prediction, reference = set(prediction), set(reference)
+    if not prediction and not reference:
+        return 1.0
+    common = len(prediction & reference)
+    if not common:
+        return 0.0
+    precision = common / len(prediction)
+    recall = common / len(reference)
+    return 2 * precision * recall / (precision + recall)
+
+
+def agreement(agent_name: str, outputs: list, reference: list) -> float:
+    """
+    Mean agreement of `outputs` with the reference (PyTorch) outputs:
+    token F1 for summaries, set F1 for entities and exact match otherwise.
+    """
+    if agent_name == "summarization_agent":
+        scores = [_token_f1(o, r) for o, r in zip(outputs, reference)]
+    elif agent_name == "ner_agent":
+        scores = [_set_f1(o, r) for o, r in zip(outputs, reference)]
+    else:
+        scores = [float(o == r) for o, r in zip(outputs, reference)]
+    return statistics.mean(scores)
+
+
+def compare_backends(
+    agent_names: list,
+    backends: list,
+    repeats: int = 3,
+    num_threads: int = None,
+    model_cache_dir: str = None,
+) -> list:
+    """
+    Times every (agent, backend) pair and scores it against the PyTorch
+    backend. Returns one result dict per pair.
+    """
+    text_documents = [Document(text) for text in SAMPLE_TEXTS]
+    results = []
+    for agent_name in agent_names:
+        documents = (
+            _formula_documents() if agent_name == "formula_agent" else text_documents
+        )
+        reference = None
+        reference_time = None
+        # PyTorch first: it is the accuracy reference
+        for backend in sorted(backends, key=lambda b: b != "pytorch"):
+            options = {
+                AGENT_CLASSES[agent_name][2]: True,
+                "inference_backend": backend,
+                "inference_threads": num_threads,
+                "model_cache_dir": model_cache_dir,
+            }
+            start = time.perf_counter()
+            agent = AgentRegistry(options)[agent_name]
+            load_seconds = time.perf_counter() - start
+
+            outputs = _run(agent_name, agent, documents)  # Warm-up
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                outputs = _run(agent_name, agent, documents)
+                timings.append((time.perf_counter() - start) / len(documents))
+            seconds = statistics.median(timings)
+
+            if backend == "pytorch":
+                reference, reference_time = outputs, seconds
+            result = {
+                "agent": agent_name,
+                "backend": backend,
+                "load_seconds": round(load_seconds, 3),
+                "seconds_per_sample": round(seconds, 4),
+                "speedup": None,
+                "agreement": None,
+            }
+            if reference is not None:
+                result["speedup"] = round(reference_time / seconds, 2)
+                result["agreement"] = round(agreement(agent_name, outputs, reference), 3)
+            results.append(result)
+            print(
+                f"{agent_name:20} {backend:8} {seconds:8.4f}s/sample "
+                f"speedup={result['speedup']} agreement={result['agreement']}"
+            )
+            del agent
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--agents", nargs="+", default=list(MODEL_AGENTS))
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--model-cache-dir", default=None)
+    parser.add_argument("--output", default="backend_comparison.json")
+    args = parser.parse_args()
+
+    results = compare_backends(
+        args.agents, args.backends, args.repeats, args.threads, args.model_cache_dir
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
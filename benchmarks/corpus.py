@@ -0,0 +1,239 @@
+# benchmarks/corpus.py
+"""
+Deterministic synthetic corpus for the benchmarks.
+
+The same seed and sizes always give the same documents: text PDFs, scanned
+(image-only) PDFs, PDFs with ruled tables, DOCX, XLSX and PNG files.
+
+Usage:
+    python -m benchmarks.corpus --output bench_corpus --count 5 --pages 10
+"""
+
+import argparse
+import os
+import random
+
+WORDS = (
+    "agreement supplier customer delivery payment invoice goods services "
+    "quality period notice termination liability warranty clause party "
+    "schedule price order report revenue growth market budget risk review "
+    "shall must within days written consent prior reasonable material"
+).split()
+NAMES = ["Maria Jensen", "Thomas Berg", "Aisha Khan", "Peter Olsen", "Elena Rossi"]
+
+# Corpus kind -> file extension
+KINDS = {
+    "text_pdf": ".pdf",
+    "scanned_pdf": ".pdf",
+    "table_pdf": ".pdf",
+    "docx": ".docx",
+    "xlsx": ".xlsx",
+    "png": ".png",
+}
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+
+
+def sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 18))]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), rng.choice(NAMES))
+    return " ".join(words).capitalize() + "."
+
+
+def paragraph(rng: random.Random, sentences: int = 4) -> str:
+    return " ".join(sentence(rng) for _ in range(sentences))
+
+
+def _page_lines(rng: random.Random, lines: int = 40) -> list:
+    return [sentence(rng)[:90] for _ in range(lines)]
+
+
+def _render_text_image(lines: list, width: int, height: int):
+    """
+    Black text on white, as a scanner would produce it.
+    """
+    from PIL import Image, ImageDraw
+
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    line_height = max(12, (height - 40) // max(len(lines), 1))
+    for number, line in enumerate(lines):
+        draw.text((30, 20 + number * line_height), line, fill=0)
+    return image
+
+
+def _save_pdf(doc, path: str):
+    doc.set_metadata({})  # No creation dates: identical runs, identical files
+    doc.save(path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+
+
+def write_text_pdf(path: str, rng: random.Random, pages: int):
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        page.insert_text((40, 50), "\n".join(_page_lines(rng)), fontsize=9)
+    _save_pdf(doc, path)
+
+
+def write_scanned_pdf(path: str, rng: random.Random, pages: int, dpi: int = 150):
+    import io
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    scale = dpi / 72
+    for _ in range(pages):
+        image = _render_text_image(
+            _page_lines(rng), int(PAGE_WIDTH * scale), int(PAGE_HEIGHT * scale)
+        )
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        page.insert_image(page.rect, stream=buffer.getvalue())
+    _save_pdf(doc, path)
+
+
+def write_table_pdf(path: str, rng: random.Random, pages: int):
+    """
+    Pages of text, every other one with a ruled 6x4 table.
+    """
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        page.insert_text((40, 50), "\n".join(_page_lines(rng, 15)), fontsize=9)
+        if page_number % 2:
+            continue
+        top, left, row_height, column_width = 300, 40, 24, 128
+        for row in range(7):
+            y = top + row * row_height
+            page.draw_line((left, y), (left + 4 * column_width, y))
+        for column in range(5):
+            x = left + column * column_width
+            page.draw_line((x, top), (x, top + 6 * row_height))
+        for row in range(6):
+            for column in range(4):
+                cell = f"{rng.choice(WORDS)} {rng.randint(1, 9999)}"
+                page.insert_text(
+                    (left + column * column_width + 4, top + row * row_height + 16),
+                    cell,
+                    fontsize=9,
+                )
+    _save_pdf(doc, path)
+
+
+def write_docx(path: str, rng: random.Random, pages: int):
+    """
+    About `pages` pages: headings, paragraphs and a table every other page.
+    """
+    import docx
+
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = "Synthetic agreement"
+    for page_number in range(pages):
+        document.add_heading(f"Section {page_number + 1}", level=2)
+        for _ in range(5):
+            document.add_paragraph(paragraph(rng))
+        if page_number % 2 == 0:
+            table = document.add_table(rows=5, cols=4)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = f"{rng.choice(WORDS)} {rng.randint(1, 9999)}"
+    document.save(path)
+
+
+def write_xlsx(path: str, rng: random.Random, pages: int, rows_per_page: int = 500):
+    """
+    Two sheets with the header on row 3 (the ExcelScraper default).
+    """
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_number in range(2):
+        sheet = workbook.create_sheet(f"Sheet{sheet_number + 1}")
+        sheet.append(["Synthetic report"])
+        sheet.append([])
+        sheet.append(["Topic", "Owner", "Amount", "Quantity", "Note"])
+        for _ in range(pages * rows_per_page // 2):
+            sheet.append(
+                [
+                    rng.choice(WORDS),
+                    rng.choice(NAMES),
+                    round(rng.uniform(1, 10000), 2),
+                    rng.randint(1, 500),
+                    sentence(rng),
+                ]
+            )
+    workbook.save(path)
+
+
+def write_png(path: str, rng: random.Random, pages: int, dpi: int = 150):
+    scale = dpi / 72
+    image = _render_text_image(
+        _page_lines(rng), int(PAGE_WIDTH * scale), int(PAGE_HEIGHT * scale)
+    )
+    image.save(path, format="PNG")
+
+
+WRITERS = {
+    "text_pdf": write_text_pdf,
+    "scanned_pdf": write_scanned_pdf,
+    "table_pdf": write_table_pdf,
+    "docx": write_docx,
+    "xlsx": write_xlsx,
+    "png": write_png,
+}
+
+
+def generate_corpus(
+    directory: str,
+    count: int = 3,
+    pages: int = 5,
+    kinds: list = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Writes `count` files of each kind to `directory`.
+
+    Parameters:
+    - directory (str): Output directory (created if missing).
+    - count (int): Files per kind.
+    - pages (int): Pages per document (rows of XLSX scale with it too).
+    - kinds (list): Kinds to generate, see KINDS (default: all).
+    - seed (int): Random seed; every file has its own seeded generator, so a
+      file's content doesn't depend on which other kinds are generated.
+
+    Returns:
+    dict: File paths by kind.
+    """
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    for kind in kinds or list(KINDS):
+        files[kind] = []
+        for number in range(count):
+            path = os.path.join(directory, f"{kind}_{number:03d}{KINDS[kind]}")
+            rng = random.Random(f"{seed}-{kind}-{number}-{pages}")
+            WRITERS[kind](path, rng, pages)
+            files[kind].append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", default="bench_corpus")
+    parser.add_argument("--count", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=KINDS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    files = generate_corpus(args.output, args.count, args.pages, args.kinds, args.seed)
+    print(f"Wrote {sum(len(paths) for paths in files.values())} files to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/docx_scrapers.py
+"""
+Speed and memory comparison of the streaming DOCX scraper with the previous
+python-docx based one, on generated contract-like documents.
+
+Each document has numbered clauses of several paragraphs, a table every few
+clauses and a header and footer. Time is the median over `--repeats` runs;
+peak memory is measured with tracemalloc on a separate run.
+
+Usage:
+    python -m benchmarks.docx_scrapers --clauses 1000 5000 --repeats 3 \
+        --output docx_scrapers.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from src.scraper.file_scrapers import DocxScraper, PythonDocxScraper
+
+SCRAPERS = {"python-docx": PythonDocxScraper, "streaming": DocxScraper}
+
+CLAUSE_TEXT = (
+    "The Supplier shall deliver the Goods to the Premises on the Delivery "
+    "Date and shall ensure that the Goods conform with the Specification, "
+    "are of satisfactory quality and are fit for any purpose held out by the "
+    "Supplier or made known to the Supplier by the Customer in writing."
+)
+
+
+def make_contract(path: str, clauses: int, table_every: int = 10):
+    """
+    Writes a contract-like .docx with `clauses` clauses to `path`.
+    """
+    import docx
+
+    document = docx.Document()
+    section = document.sections[0]
+    section.header.paragraphs[0].text = "MASTER SUPPLY AGREEMENT - CONFIDENTIAL"
+    section.footer.paragraphs[0].text = "Initials: ______ / ______"
+    document.add_heading("Master Supply Agreement", level=0)
+    for clause in range(1, clauses + 1):
+        document.add_heading(f"{clause}. Clause {clause}", level=2)
+        for sub_clause in range(1, 4):
+            document.add_paragraph(f"{clause}.{sub_clause} {CLAUSE_TEXT}")
+        if clause % table_every == 0:
+            table = document.add_table(rows=6, cols=4)
+            for row_index, row in enumerate(table.rows):
+                for cell_index, cell in enumerate(row.cells):
+                    cell.text = f"Item {clause}-{row_index}-{cell_index}"
+    document.save(path)
+
+
+def _measure(scraper, path: str, repeats: int) -> dict:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        document = scraper.scrape(path)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    scraper.scrape(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": statistics.median(timings),
+        "peak_mb": peak / (1 << 20),
+        "characters": len(document.get_text()),
+        "tables": len(document.tables or []),
+    }
+
+
+def compare_scrapers(clause_counts: list, repeats: int = 3) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for clauses in clause_counts:
+            path = os.path.join(directory, f"contract_{clauses}.docx")
+            make_contract(path, clauses)
+            for name, scraper_class in SCRAPERS.items():
+                result = {
+                    "scraper": name,
+                    "clauses": clauses,
+                    "file_mb": os.path.getsize(path) / (1 << 20),
+                    **_measure(scraper_class(), path, repeats),
+                }
+                results.append(result)
+                print(
+                    f"{name:12} {clauses:6} clauses: {result['seconds']:.2f}s, "
+                    f"peak {result['peak_mb']:.1f} MB, "
+                    f"{result['characters']} chars, {result['tables']} tables"
+                )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clauses", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default="docx_scrapers.json")
+    args = parser.parse_args()
+
+    results = compare_scrapers(args.clauses, args.repeats)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+# benchmarks/suite.py
+"""
+Performance benchmark suite: scrapers, OCR, agents and end-to-end runs on a
+generated corpus (see benchmarks/corpus.py).
+
+Every benchmark runs in a fresh process, so its peak RSS (including model
+loading) is measured on its own. Times are medians over `--repeats` runs
+after one warm-up run. Results are written as JSON and can be checked
+against a stored baseline (see benchmarks/compare.py).
+
+Usage:
+    python -m benchmarks.suite --count 3 --pages 5 --output bench.json
+    python -m benchmarks.suite --agents regex_agent ner_agent \
+        --baseline bench_baseline.json --threshold 0.15
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .corpus import KINDS, generate_corpus
+from . import compare
+
+# Corpus kinds each agent is benchmarked on
+AGENT_INPUTS = {
+    "table_agent": ["table_pdf"],
+    "formula_agent": ["png"],
+}
+DEFAULT_AGENT_INPUTS = ["text_pdf", "docx"]
+CHEAP_AGENTS = ["text_agent", "regex_agent", "table_agent"]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def _timed(function, repeats: int) -> dict:
+    function()  # Warm-up: imports, lazy initialization, file cache
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {"seconds": statistics.median(timings), "runs": repeats}
+
+
+def _scraper_for(kind: str):
+    from src.ocr_engines.tesseract_ocr import TesseractOCREngine
+    from src.scraper.file_scrapers import (
+        DocxScraper,
+        ExcelScraper,
+        ImageScraper,
+        PDFScraper,
+    )
+
+    if kind in ("text_pdf", "table_pdf"):
+        return PDFScraper()
+    if kind == "scanned_pdf":
+        return PDFScraper(ocr_engine=TesseractOCREngine())
+    if kind == "docx":
+        return DocxScraper()
+    if kind == "xlsx":
+        return ExcelScraper()
+    return ImageScraper(ocr_engine=TesseractOCREngine())
+
+
+def bench_scraper(kind: str, paths: list, repeats: int) -> dict:
+    scraper = _scraper_for(kind)
+    result = _timed(lambda: [scraper.scrape(path).close() for path in paths], repeats)
+    result["scraper"] = type(scraper).__name__
+    return result
+
+
+def bench_ocr(engine: str, paths: list, repeats: int) -> dict:
+    from src.ocr_engines.pooled_tesseract_ocr import PooledTesseractOCREngine
+    from src.ocr_engines.tesseract_ocr import TesseractOCREngine
+
+    if engine == "pooled":
+        ocr_engine = PooledTesseractOCREngine()
+    else:
+        ocr_engine = TesseractOCREngine()
+    return _timed(lambda: ocr_engine.perform_ocr_batch(paths), repeats)
+
+
+def bench_agent(name: str, paths: list, options: dict, repeats: int) -> dict:
+    from src.agents.registry import AgentRegistry
+    from src.pipelines.runner import agent_kwargs, build_pipeline
+
+    pipeline = build_pipeline(options)
+    documents = [pipeline.process(path) for path in paths]
+    start = time.perf_counter()
+    agent = AgentRegistry(options)[name]
+    load_seconds = time.perf_counter() - start
+    documents = [document for document in documents if agent.accepts(document)]
+    kwargs = agent_kwargs(name, options)
+    result = _timed(lambda: agent.execute_batch(documents, **kwargs), repeats)
+    result["load_seconds"] = load_seconds
+    return result
+
+
+def bench_end_to_end(corpus_dir: str, options: dict, repeats: int) -> dict:
+    from process_documents import process_documents
+
+    def run():
+        with tempfile.TemporaryDirectory() as output_dir:
+            process_documents(corpus_dir, output_dir, **options)
+
+    return _timed(run, repeats)
+
+
+def _run_task(task, args: tuple) -> dict:
+    """
+    Runs one benchmark in the current (fresh) process.
+    """
+    try:
+        result = task(*args)
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    result["peak_rss_mb"] = round(_peak_rss_mb(), 1)
+    return result
+
+
+def run_isolated(task, *args) -> dict:
+    """
+    Runs a benchmark in its own spawned process, so peak memory is its own.
+    """
+    # Executor workers (unlike Pool workers) may start processes of their
+    # own, which end-to-end runs with several workers need
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_run_task, task, args).result()
+
+
+def _agent_options(name: str) -> dict:
+    from src.agents.registry import AGENT_CLASSES
+
+    return {
+        AGENT_CLASSES[name][2]: True,
+        "question": "What is the main topic of the document?",
+        "regex_pattern": r"\b[A-Z][a-z]+ [A-Z][a-z]+\b",
+        "table_engine": "pymupdf",
+    }
+
+
+def run_suite(
+    corpus_dir: str,
+    count: int = 3,
+    pages: int = 5,
+    seed: int = 0,
+    repeats: int = 3,
+    agents: list = None,
+    ocr: bool = True,
+    workers: list = None,
+) -> dict:
+    """
+    Generates the corpus and runs all benchmarks.
+
+    Returns:
+    dict: {"meta": {...}, "results": {benchmark name: measurements}}
+    """
+    files = generate_corpus(corpus_dir, count, pages, seed=seed)
+    ocr_kinds = ("scanned_pdf", "png")
+    results = {}
+
+    def record(name: str, task, *args):
+        results[name] = run_isolated(task, *args)
+        print(f"{name}: {results[name]}")
+
+    for kind in KINDS:
+        if ocr or kind not in ocr_kinds:
+            record(f"scraper/{kind}", bench_scraper, kind, files[kind], repeats)
+    if ocr:
+        for engine in ("tesseract", "pooled"):
+            record(f"ocr/{engine}", bench_ocr, engine, files["png"], repeats)
+    for name in agents if agents is not None else CHEAP_AGENTS:
+        paths = [
+            path
+            for kind in AGENT_INPUTS.get(name, DEFAULT_AGENT_INPUTS)
+            for path in files[kind]
+        ]
+        options = _agent_options(name)
+        record(f"agent/{name}", bench_agent, name, paths, options, repeats)
+
+    # Everything but the model agents, with OCR only if enabled
+    e2e_dir = os.path.join(corpus_dir, "end_to_end")
+    shutil.rmtree(e2e_dir, ignore_errors=True)
+    os.makedirs(e2e_dir)
+    for kind, paths in files.items():
+        if ocr or kind not in ocr_kinds:
+            for path in paths:
+                link = os.path.join(e2e_dir, os.path.basename(path))
+                os.symlink(os.path.abspath(path), link)
+    document_count = len(os.listdir(e2e_dir))
+    for worker_count in workers or [1]:
+        options = {
+            "use_summarization": False,
+            "use_qa": False,
+            "use_ner": False,
+            "use_formula_extraction": False,
+            "workers": worker_count,
+        }
+        name = f"end_to_end/workers={worker_count}"
+        record(name, bench_end_to_end, e2e_dir, options, repeats)
+        if "seconds" in results[name]:
+            results[name]["documents"] = document_count
+            results[name]["documents_per_second"] = (
+                document_count / results[name]["seconds"]
+            )
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "count": count,
+            "pages": pages,
+            "seed": seed,
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus-dir", default="bench_corpus")
+    parser.add_argument("--count", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--agents", nargs="*", default=None, help="Default: the non-model agents"
+    )
+    parser.add_argument("--no-ocr", action="store_true")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--threshold", type=float, default=compare.TIME_THRESHOLD)
+    parser.add_argument("--rss-threshold", type=float, default=compare.RSS_THRESHOLD)
+    args = parser.parse_args()
+
+    report = run_suite(
+        args.corpus_dir,
+        args.count,
+        args.pages,
+        args.seed,
+        args.repeats,
+        args.agents,
+        not args.no_ocr,
+        args.workers,
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare.compare(
+            report, baseline, args.threshold, args.rss_threshold
+        )
+        compare.print_report(regressions)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,29 @@
+import json
 import os
+import time
+import multiprocessing
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from tqdm import tqdm
-import pandas as pd
-from src.pipelines.pipeline import DocumentProcessingPipeline
-from src.agents.text_extraction_agent import TextExtractionAgent
-from src.agents.regex_agent import RegexAgent
-from src.agents.qa_agent import QuestionAnsweringAgent
-from src.agents.summarization_agent import SummarizationAgent
-from src.agents.ner_agent import NERAgent
-from src.agents.table_extraction_agent import TableExtractionAgent
-from src.agents.formula_extraction_agent import (
-    FormulaExtractionAgent,
+from src.pipelines.runner import (
+    build_agents,
+    build_pipeline,
+    process_batch,
+    init_worker,
+    page_ranges,
+    run_merge_task,
+    run_shard_task,
+    run_worker_task,
 )
-from src.document import Document
+from src.pipelines.sinks import build_sink, ConcatenatedTextWriter
+from src.pipelines.staged import StagedExecutor
+from src.pipelines.work_queue import WorkQueue, process_queue
 from src.utils.logging import Logger
+from src.utils.metrics import METRICS
 
 
 def process_documents(
@@ -26,8 +37,30 @@ def process_documents(
     use_table: bool = True,
     use_formula_extraction: bool = True,  # New parameter
     concatenate_text: bool = False,  # New parameter for concatenation
-    question: str = "What is the main topic of the document?",
-    regex_pattern: str = r"\b[A-Z][a-z]+ [A-Z][a-z]+\b",  # Example pattern for names
+    question="What is the main topic of the document?",
+    regex_pattern=r"\b[A-Z][a-z]+ [A-Z][a-z]+\b",  # Example pattern for names
+    workers: int = 1,
+    cache_dir: str = None,
+    cache_max_bytes: int = 1 << 30,
+    pooled_ocr: bool = False,
+    smart_ocr: bool = False,
+    batch_size: int = 8,
+    long_summaries: bool = False,
+    inference_backend="pytorch",
+    inference_threads: int = None,
+    model_cache_dir: str = None,
+    table_engine: str = "pymupdf",
+    export_sheets: str = None,
+    sink="folder",
+    pipelined: bool = False,
+    metrics_dir: str = None,
+    work_queue: str = None,
+    lease_seconds: float = 600.0,
+    max_attempts: int = 3,
+    queue_journal_mode: str = "DELETE",
+    dedup_threshold: float = None,
+    shard_pages: int = 200,
+    ocr_preprocessing=None,
 ):
     """
     Process documents in the input directory using specified agents.
@@ -43,18 +76,81 @@ def process_documents(
     - use_table (bool): Whether to extract tables from PDFs.
     - use_formula_extraction (bool): Whether to extract formulas and LaTeX code.
     - concatenate_text (bool): Whether to concatenate all extracted text into one file.
-    - question (str): Question to ask in question answering.
-    - regex_pattern (str): Regex pattern to search for.
+    - question (str | list): Question to ask in question answering, or a list of
+      questions; a list yields ranked answers with scores and pages per question.
+    - regex_pattern (str | dict): Regex pattern to search for, or a dict of
+      patterns by name, matched in a single pass per page; a dict yields the
+      pattern name, page and offset of every match.
+    - workers (int): Number of worker processes. Each worker builds its own
+      pipeline and agents once and reuses them; 1 processes files serially.
+    - cache_dir (str): Directory of a persistent cache of scraped documents and
+      agent results, keyed by content hash. Unchanged files are not re-processed.
+    - cache_max_bytes (int): Size bound of the cache; least recently used
+      entries are evicted beyond it.
+    - pooled_ocr (bool): OCR all images of a document in one batch over a pool
+      of long-lived Tesseract workers sized to the available cores.
+    - smart_ocr (bool): Only OCR pages without a usable text layer, skip tiny
+      and repeated images and render scanned pages whole (see OCRPolicy).
+    - batch_size (int): Number of documents handed to each agent at once, so
+      model-backed agents can run batched inference.
+    - long_summaries (bool): Summarize whole documents (map-reduce over
+      token-budgeted chunks) instead of only their beginning.
+    - inference_backend (str | dict): "pytorch", "int8" (dynamic quantization)
+      or "onnx" (ONNX Runtime), for all model agents or as a dict by agent
+      name, e.g. {"qa_agent": "onnx"}. See benchmarks/compare_backends.py.
+    - inference_threads (int): Intra-op threads per model (None: library default).
+    - model_cache_dir (str): Cache of quantized / exported models.
+    - table_engine (str): "pymupdf" (tables found while the PDF is parsed,
+      only on pages with ruling lines, in parallel for long PDFs) or
+      "pdfplumber" (slower, every page).
+    - export_sheets (str): Also write the sheets of spreadsheets to "csv" or
+      "parquet" files in each document's output folder (folder sink).
+    - sink (str | BaseSink): Where results go: "folder" (one folder per
+      document), "sqlite" (output_dir/results.sqlite), "parquet"
+      (output_dir/documents.parquet and agent_outputs.parquet) or a sink
+      object, see src/pipelines/sinks.py.
+    - pipelined (bool): Run scraping, OCR, agents and writing as concurrent
+      stages connected by bounded queues (see StagedExecutor); `workers` > 1
+      then parses files in that many processes.
+    - metrics_dir (str): Record time, calls, errors and memory growth of
+      every scrape, OCR and agent call and write them per process to this
+      directory, as Prometheus text (metrics-<pid>.prom) and Chrome trace
+      (trace-<pid>.json) files.
+    - work_queue (str): Path of a SQLite work queue (see WorkQueue), e.g. on
+      storage shared by several nodes. Files are added to it and claimed in
+      leased batches, so any number of processes can run on the same input
+      directory and an interrupted run resumes with the files not finished
+      yet. Not combined with `concatenate_text` or `pipelined`.
+    - lease_seconds (float): How long a crashed worker's files stay claimed.
+    - max_attempts (int): Attempts per file (failures and agent errors are
+      retried) before its outcome is kept as it is.
+    - queue_journal_mode (str): SQLite journal mode of the work queue, and of
+      the "sqlite" sink's database shared by the queue's workers. "DELETE"
+      is safe on network file systems; "WAL" is faster but only safe when
+      every worker runs on the host storing the files.
+    - dedup_threshold (float): Detect near-duplicate documents (estimated
+      Jaccard similarity of their word 5-shingles at least this, e.g. 0.9)
+      and give them the summary, answer and entities of the first document
+      of their cluster instead of running these models again. Clusters are written to
+      duplicate_clusters.json. Each worker process keeps its own index, so
+      duplicates are only found within a worker's share of the files.
+    - shard_pages (int): With `workers` > 1, PDFs longer than this are split
+      into ranges of this many pages. The ranges are scraped, OCRed and run
+      through the page-local agents (text, regex, tables, formulas) by all
+      workers in parallel, then merged into one document for the other
+      agents and one output record. None disables splitting.
 
     Returns:
     None
     """
+    # Agents and parser libraries load lazily, so this measures the real
+    # cold start: everything until the first document is finished
+    start_time = time.perf_counter()
 
     # Initialize logger
     logger = Logger(name="DocumentProcessorLogger")
-
-    # Initialize the processing pipeline
-    pipeline = DocumentProcessingPipeline()
+    if metrics_dir:
+        METRICS.enable()
 
     # Output directory
     os.makedirs(output_dir, exist_ok=True)
@@ -72,80 +168,293 @@ def process_documents(
         print("No supported files found in the input directory.")
         return
 
-    # Initialize agents based on user input
-    agents = {}
-    if use_text:
-        agents["text_agent"] = TextExtractionAgent(logger=logger)
-    if use_summarization:
-        agents["summarization_agent"] = SummarizationAgent(
-            model_name="facebook/bart-large-cnn"
+    # Agent settings, shared with the worker processes
+    options = {
+        "use_text": use_text,
+        "use_summarization": use_summarization,
+        "use_qa": use_qa,
+        "use_regex": use_regex,
+        "use_ner": use_ner,
+        "use_table": use_table,
+        "use_formula_extraction": use_formula_extraction,
+        "question": question,
+        "regex_pattern": regex_pattern,
+        "cache_dir": cache_dir,
+        "cache_max_bytes": cache_max_bytes,
+        "pooled_ocr": pooled_ocr,
+        "smart_ocr": smart_ocr,
+        "long_summaries": long_summaries,
+        "inference_backend": inference_backend,
+        "inference_threads": inference_threads,
+        "model_cache_dir": model_cache_dir,
+        "table_engine": table_engine,
+        "export_sheets": export_sheets,
+        "workers": workers,
+        "metrics_dir": metrics_dir,
+        "dedup_threshold": dedup_threshold,
+        "ocr_preprocessing": ocr_preprocessing,
+    }
+
+    queue = None
+    total = len(files)
+    if work_queue:
+        queue = WorkQueue(
+            work_queue,
+            lease_seconds=lease_seconds,
+            max_attempts=max_attempts,
+            journal_mode=queue_journal_mode,
         )
-    if use_qa:
-        agents["qa_agent"] = QuestionAnsweringAgent(
-            model_name="deepset/roberta-base-squad2"
+        added = queue.add(files)
+        states = queue.progress()["states"]
+        total = states["pending"] + states["leased"]
+        logger.info(f"Work queue: {added} files added, {total} left to process.")
+        if concatenate_text or pipelined:
+            logger.warning(
+                "concatenate_text and pipelined are ignored with a work queue."
+            )
+            concatenate_text = pipelined = False
+        if sink == "parquet":
+            # Parquet files have one writer: one directory per worker
+            output_dir = os.path.join(output_dir, f"parquet-{os.getpid()}")
+
+    # Results go to the sink as they arrive; the concatenated text is
+    # streamed in input order instead of being collected in memory
+    sink = build_sink(
+        sink,
+        output_dir,
+        logger=logger,
+        sheet_format=export_sheets,
+        # Shared with the other queue workers, possibly over a network
+        journal_mode=queue_journal_mode if queue is not None else "WAL",
+    )
+    concatenated = None
+    if concatenate_text:
+        concatenated = ConcatenatedTextWriter(
+            os.path.join(output_dir, "concatenated_text.txt")
         )
-    if use_regex:
-        agents["regex_agent"] = RegexAgent(pattern=regex_pattern)
-    if use_ner:
-        agents["ner_agent"] = NERAgent()
-    if use_table:
-        agents["table_agent"] = TableExtractionAgent(logger=logger)
-    if use_formula_extraction:
-        agents["formula_agent"] = FormulaExtractionAgent(logger=logger)
-
-    # Store extracted texts for concatenation
-    all_extracted_texts = []
-
-    # Process each file with tqdm progress bar
-    for file_name in tqdm(files, desc="Processing documents"):
-        try:
-            file_path = os.path.join(input_dir, file_name)
-            logger.info(f"Processing document: {file_name}")
-
-            # Process the document
-            document = pipeline.process(file_path)
-            logger.info("Document processed successfully.")
-
-            # Create a subfolder in output_results for this document
-            folder_name = os.path.splitext(file_name)[0]
-            folder_name = "".join(
-                c for c in folder_name if c.isalnum() or c in (" ", "_", "-")
-            ).rstrip()
-            document_output_dir = os.path.join(output_dir, folder_name)
-            os.makedirs(document_output_dir, exist_ok=True)
-
-            # Extract text (for non-Excel documents)
-            if use_text:
-                extracted_text = agents["text_agent"].execute(document)
-                logger.info("Text extracted.")
-
-                # Save extracted text to a file
-                text_file_path = os.path.join(document_output_dir, "extracted_text.txt")
-                with open(text_file_path, "w", encoding="utf-8") as f:
-                    f.write(extracted_text)
-                logger.info(f"Extracted text saved to {text_file_path}")
-
-                # Collect extracted text for concatenation
-                if concatenate_text:
-                    all_extracted_texts.append(extracted_text)
-
-        except Exception as e:
-            logger.info(f"An error occurred while processing {file_name}: {e}")
-            print(f"An error occurred while processing {file_name}: {e}")
-
-    # Concatenate all extracted texts into one file
-    if concatenate_text and all_extracted_texts:
-        concatenated_file_path = os.path.join(output_dir, "concatenated_text.txt")
-        with open(concatenated_file_path, "w", encoding="utf-8") as f:
-            for text in all_extracted_texts:
-                f.write(text + "\n\n")  # Add new lines between documents
+
+    first_result_time = None
+    clusters = {}  # Canonical file name -> its near-duplicates
+
+    def handle_result(index, file_name, result, error):
+        nonlocal first_result_time
+        if first_result_time is None:
+            first_result_time = time.perf_counter() - start_time
+            logger.info(
+                f"Cold start: first document finished after {first_result_time:.2f}s"
+            )
+
+        if error is not None:
+            logger.info(f"An error occurred while processing {file_name}: {error}")
+            print(f"An error occurred while processing {file_name}: {error}")
+        sink.write(index, file_name, result, error)
+        if result is not None and "duplicate_of" in result:
+            duplicate = result["duplicate_of"]
+            clusters.setdefault(duplicate["file"], []).append(
+                {"file": file_name, "similarity": duplicate["similarity"]}
+            )
+
+        if concatenated is not None:
+            if result is not None and "text" in result:
+                concatenated.write(index, result["text"])
+            else:
+                concatenated.skip(index)
+
+    # Long PDFs are split into page ranges spread over the workers
+    shards = {}  # File index -> (first, last) page ranges
+    if workers > 1 and shard_pages and queue is None and not pipelined:
+        for index, file_name in enumerate(files):
+            if file_name.lower().endswith(".pdf"):
+                page_count = _pdf_page_count(os.path.join(input_dir, file_name))
+                ranges = page_ranges(page_count, shard_pages)
+                if ranges:
+                    shards[index] = ranges
+        if shards:
+            logger.info(f"{len(shards)} long PDFs split into page ranges.")
+
+    # Files are handed out in batches so agents can run batched inference
+    unsharded = [index for index in range(len(files)) if index not in shards]
+    batches = [
+        unsharded[start : start + batch_size]
+        for start in range(0, len(unsharded), batch_size)
+    ]
+
+    def batch_paths(batch):
+        return [os.path.join(input_dir, files[i]) for i in batch]
+
+    pipeline = agents = None  # Built in this process, closed at the end
+    try:
+        with tqdm(total=total, desc="Processing documents") as progress:
+            if queue is not None:
+                # Leased batches of the shared queue; a failed file is retried
+                # by whichever worker claims it next
+                if workers > 1:
+                    executor = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=init_worker,
+                        initargs=(options,),
+                    )
+
+                    def submit(paths):
+                        return executor.submit(run_worker_task, paths)
+
+                else:
+                    pipeline = build_pipeline(options)
+                    agents = build_agents(options, logger=logger)
+                    # A thread, so leases are renewed while a batch runs
+                    executor = ThreadPoolExecutor(max_workers=1)
+
+                    def submit(paths):
+                        return executor.submit(
+                            process_batch, pipeline, agents, paths, options, logger
+                        )
+
+                def on_queue_result(index, path, result, error):
+                    handle_result(index, path, result, error)
+                    progress.update(1)
+
+                with executor:
+                    process_queue(
+                        queue,
+                        input_dir,
+                        submit,
+                        on_queue_result,
+                        batch_size=batch_size,
+                        in_flight=workers,
+                        flush=sink.flush,
+                        logger=logger,
+                    )
+            elif pipelined:
+                # Scrape, OCR, agents and writing run as overlapping stages
+                pipeline = build_pipeline(options)
+                agents = build_agents(options, logger=logger)
+                executor = StagedExecutor(
+                    pipeline,
+                    agents,
+                    options,
+                    logger=logger,
+                    # PyMuPDF is not thread-safe: parallel parsing needs processes
+                    scrape_workers=workers,
+                    scrape_executor="process" if workers > 1 else "thread",
+                    batch_size=batch_size,
+                )
+
+                def on_result(index, result, error):
+                    handle_result(index, files[index], result, error)
+                    progress.update(1)
+
+                executor.run(
+                    [os.path.join(input_dir, file_name) for file_name in files],
+                    on_result,
+                )
+            elif workers > 1:
+                # Spawn (rather than fork) so workers do not inherit torch threads or
+                # the parent's logging handlers.
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=context,
+                    initializer=init_worker,
+                    initargs=(options,),
+                ) as executor:
+                    # Page ranges first, so a long file is not the tail
+                    # everything else waits on
+                    futures = {}
+                    for index, ranges in shards.items():
+                        path = os.path.join(input_dir, files[index])
+                        for number, (first, last) in enumerate(ranges):
+                            future = executor.submit(run_shard_task, path, first, last)
+                            futures[future] = ("shard", index, number)
+                    for batch in batches:
+                        future = executor.submit(run_worker_task, batch_paths(batch))
+                        futures[future] = ("batch", batch, None)
+                    shard_outcomes = {
+                        index: [None] * len(ranges) for index, ranges in shards.items()
+                    }
+
+                    while futures:
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            kind, key, number = futures.pop(future)
+                            try:
+                                outcome = future.result()
+                            except Exception as e:  # e.g. a worker died
+                                outcome = e
+                            if kind == "batch":
+                                if isinstance(outcome, Exception):
+                                    outcome = [(None, str(outcome))] * len(key)
+                                for index, (result, error) in zip(key, outcome):
+                                    handle_result(index, files[index], result, error)
+                                progress.update(len(key))
+                            elif kind == "shard":
+                                if isinstance(outcome, Exception):
+                                    outcome = (None, str(outcome), None)
+                                shard_outcomes[key][number] = outcome
+                                if all(shard_outcomes[key]):
+                                    # All ranges done: merge and run the
+                                    # whole-document agents
+                                    path = os.path.join(input_dir, files[key])
+                                    future = executor.submit(
+                                        run_merge_task, path, shard_outcomes.pop(key)
+                                    )
+                                    futures[future] = ("merge", key, None)
+                            else:
+                                if isinstance(outcome, Exception):
+                                    outcome = (None, str(outcome))
+                                handle_result(key, files[key], *outcome)
+                                progress.update(1)
+            else:
+                # Initialize the processing pipeline and agents based on user input
+                pipeline = build_pipeline(options)
+                agents = build_agents(options, logger=logger)
+
+                for batch in batches:
+                    outcomes = process_batch(
+                        pipeline, agents, batch_paths(batch), options, logger=logger
+                    )
+                    for index, (result, error) in zip(batch, outcomes):
+                        handle_result(index, files[index], result, error)
+                    progress.update(len(batch))
+    finally:
+        # Flush whatever was buffered, also when the run is interrupted
+        sink.close()
+        if concatenated is not None:
+            concatenated.close()
+        if metrics_dir:
+            METRICS.export(metrics_dir)
+        if queue is not None:
+            queue.close()
+        if agents is not None:
+            agents.close()
+        if pipeline is not None:
+            pipeline.close()
+    if concatenated is not None and concatenated.written:
         logger.info(
-            f"All extracted texts concatenated and saved to {concatenated_file_path}"
+            f"All extracted texts concatenated and saved to {concatenated.path}"
         )
 
+    if clusters:
+        clusters_path = os.path.join(output_dir, "duplicate_clusters.json")
+        with open(clusters_path, "w", encoding="utf-8") as f:
+            json.dump(clusters, f, ensure_ascii=False, indent=2)
+        duplicates = sum(len(cluster) for cluster in clusters.values())
+        logger.info(f"{duplicates} near-duplicates found, see {clusters_path}")
+
+    elapsed = time.perf_counter() - start_time
+    logger.info(f"Processed {total} documents in {elapsed:.2f}s")
     print("All documents processed. Results are saved in the output directory.")
 
 
+def _pdf_page_count(file_path: str) -> int:
+    from src.scraper.file_scrapers import PDFScraper
+
+    try:
+        return PDFScraper.page_count(file_path)
+    except Exception:  # Left to the worker to report
+        return 0
+
+
 if __name__ == "__main__":
     process_documents(
         input_dir="input_documents",
@@ -160,4 +469,7 @@ if __name__ == "__main__":
         concatenate_text=True,  # Concatenate all extracted texts
         question="What is the main topic of the document?",
         regex_pattern=r"\b[A-Z][a-z]+ [A-Z][a-z]+\b",
+        workers=1,
+        batch_size=8,
+        cache_dir=None,  # e.g. ".docintel_cache" to skip unchanged files on re-runs
     )
@@ -0,0 +1,164 @@
+# src/agents/backends.py
+
+import os
+import shutil
+import threading
+
+# Inference backends selectable per agent:
+# - "pytorch": eager fp32 PyTorch (the default)
+# - "int8": PyTorch with Linear layers dynamically quantized to int8
+# - "onnx": model exported to ONNX and run with ONNX Runtime (needs `optimum`)
+BACKENDS = ("pytorch", "int8", "onnx")
+
+DEFAULT_MODEL_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "docintel", "models"
+)
+
+# Task -> (transformers auto class, optimum ONNX Runtime class)
+_MODEL_CLASSES = {
+    "summarization": ("AutoModelForSeq2SeqLM", "ORTModelForSeq2SeqLM"),
+    "question-answering": (
+        "AutoModelForQuestionAnswering",
+        "ORTModelForQuestionAnswering",
+    ),
+    "ner": ("AutoModelForTokenClassification", "ORTModelForTokenClassification"),
+    "image-to-text": ("VisionEncoderDecoderModel", "ORTModelForVision2Seq"),
+}
+
+_export_lock = threading.Lock()
+
+
+def artifact_dir(model_name: str, backend: str, cache_dir: str = None) -> str:
+    """
+    Directory holding the exported / quantized artifacts of a model.
+    """
+    return os.path.join(
+        cache_dir or DEFAULT_MODEL_CACHE_DIR, model_name.replace("/", "__"), backend
+    )
+
+
+def set_num_threads(num_threads: int = None):
+    """
+    Sets the PyTorch intra-op thread count (None keeps the default).
+    """
+    if num_threads:
+        import torch
+
+        torch.set_num_threads(num_threads)
+
+
+def load_model(
+    task: str,
+    model_name: str,
+    backend: str = "pytorch",
+    cache_dir: str = None,
+    num_threads: int = None,
+):
+    """
+    Loads a model for `task` with the given inference backend.
+
+    Quantized weights and ONNX exports are written to `cache_dir` the first
+    time and loaded from there afterwards.
+
+    Parameters:
+    - task (str): One of "summarization", "question-answering", "ner",
+      "image-to-text".
+    - model_name (str): HuggingFace model name or path.
+    - backend (str): "pytorch", "int8" or "onnx".
+    - cache_dir (str): Root of the artifact cache (default ~/.cache/docintel/models).
+    - num_threads (int): Intra-op threads for PyTorch / ONNX Runtime.
+
+    Returns:
+    The loaded model (a transformers or optimum model).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+    if task not in _MODEL_CLASSES:
+        raise ValueError(f"Unsupported task: {task}")
+
+    if backend == "onnx":
+        return _load_onnx(task, model_name, cache_dir, num_threads)
+
+    import transformers
+
+    set_num_threads(num_threads)
+    model_class = getattr(transformers, _MODEL_CLASSES[task][0])
+    if backend == "pytorch":
+        return model_class.from_pretrained(model_name)
+    return _load_int8(model_class, model_name, cache_dir)
+
+
+def _quantize(model):
+    import torch
+
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def _load_int8(model_class, model_name: str, cache_dir: str):
+    import torch
+    from transformers import AutoConfig
+
+    path = os.path.join(artifact_dir(model_name, "int8", cache_dir), "model.pt")
+    if os.path.exists(path):
+        # Rebuild the quantized module structure, then load the cached weights
+        config = AutoConfig.from_pretrained(model_name)
+        if hasattr(model_class, "from_config"):  # Auto classes
+            model = model_class.from_config(config)
+        else:
+            model = model_class(config)
+        model = _quantize(model.eval())
+        model.load_state_dict(torch.load(path))
+        return model.eval()
+
+    model = _quantize(model_class.from_pretrained(model_name).eval())
+    with _export_lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save(model.state_dict(), tmp_path)
+        os.replace(tmp_path, path)
+    return model
+
+
+def _load_onnx(task: str, model_name: str, cache_dir: str, num_threads: int):
+    import onnxruntime
+    import optimum.onnxruntime
+
+    model_class = getattr(optimum.onnxruntime, _MODEL_CLASSES[task][1])
+    session_options = onnxruntime.SessionOptions()
+    if num_threads:
+        session_options.intra_op_num_threads = num_threads
+
+    path = artifact_dir(model_name, "onnx", cache_dir)
+    with _export_lock:
+        if not os.path.isdir(path):
+            # Export next to the target and rename, so concurrent processes
+            # never load a half-written export
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            model_class.from_pretrained(model_name, export=True).save_pretrained(
+                tmp_path
+            )
+            try:
+                os.rename(tmp_path, path)
+            except OSError:  # Another process finished its export first
+                shutil.rmtree(tmp_path, ignore_errors=True)
+    return model_class.from_pretrained(path, session_options=session_options)
+
+
+def build_pipeline(
+    task: str,
+    model_name: str,
+    backend: str = "pytorch",
+    cache_dir: str = None,
+    num_threads: int = None,
+    **pipeline_kwargs,
+):
+    """
+    Builds a transformers `pipeline` for `task` on top of `load_model`.
+    """
+    from transformers import AutoTokenizer, pipeline
+
+    model = load_model(task, model_name, backend, cache_dir, num_threads)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return pipeline(task, model=model, tokenizer=tokenizer, **pipeline_kwargs)
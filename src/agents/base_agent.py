@@ -2,9 +2,58 @@
 
 import abc
 from ..document import Document
+from ..utils.metrics import instrument_methods
+
+
+def _document_count(args: tuple, result) -> dict:
+    return {"documents": len(args[0])}
+
+
+_INSTRUMENTED = {"execute": None, "execute_batch": _document_count}
 
 
 class BaseAgent(abc.ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument_methods(cls, "agent", _INSTRUMENTED)
+
     @abc.abstractmethod
     def execute(self, document: Document):
         pass
+
+    def execute_batch(self, documents: list, **kwargs) -> list:
+        """
+        Runs the agent on several documents and returns the results in order.
+        Model-backed agents override this to run inference in batches.
+        """
+        return [self.execute(document, **kwargs) for document in documents]
+
+    def accepts(self, document: Document) -> bool:
+        """
+        Whether this agent can process the document (e.g. PDF-only agents).
+        """
+        return True
+
+    def cache_params(self) -> dict:
+        """
+        Settings that change this agent's output (model name, parameters).
+        Used to key cached results.
+        """
+        return {}
+
+    def cache_inputs(self, document: Document):
+        """
+        What this agent reads from a document besides its text (e.g. digests
+        of its images), as a JSON-serializable value. Used to key cached
+        results, so documents with the same text but other inputs don't share
+        them; None for agents reading only the text.
+        """
+        return None
+
+    def close(self):
+        """
+        Releases what the agent holds besides memory (e.g. process pools).
+        """
+
+
+instrument_methods(BaseAgent, "agent", _INSTRUMENTED)
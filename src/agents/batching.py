@@ -0,0 +1,67 @@
+# src/agents/batching.py
+
+
+def plan_batches(
+    lengths: list, max_batch_size: int = 16, max_padded_tokens: int = 8192
+) -> list:
+    """
+    Groups inputs of similar token length into batches.
+
+    Inputs are sorted by length so each batch pads to a similar size. A batch
+    is closed once it holds `max_batch_size` inputs or once padding every
+    input to the batch's longest one would exceed `max_padded_tokens`.
+
+    Parameters:
+    - lengths (list): Token length of each input.
+    - max_batch_size (int): Maximum number of inputs per batch.
+    - max_padded_tokens (int): Maximum of batch size x longest input length.
+
+    Returns:
+    list: Batches as lists of input indices.
+    """
+    batches = []
+    batch = []
+    batch_max = 0
+    for index in sorted(range(len(lengths)), key=lengths.__getitem__):
+        new_max = max(batch_max, lengths[index])
+        if batch and (
+            len(batch) >= max_batch_size
+            or new_max * (len(batch) + 1) > max_padded_tokens
+        ):
+            batches.append(batch)
+            batch = []
+            new_max = lengths[index]
+        batch.append(index)
+        batch_max = new_max
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def token_lengths(tokenizer, texts: list, max_length: int = None) -> list:
+    """
+    Returns the token length of each text, capped at `max_length`.
+    """
+    encoded = tokenizer(
+        texts, truncation=max_length is not None, max_length=max_length
+    )["input_ids"]
+    return [len(ids) for ids in encoded]
+
+
+def run_batched(
+    inputs: list,
+    lengths: list,
+    run_batch,
+    max_batch_size: int = 16,
+    max_padded_tokens: int = 8192,
+) -> list:
+    """
+    Runs `run_batch(batch_inputs)` over length-bucketed batches of `inputs`
+    and returns the outputs in input order.
+    """
+    outputs = [None] * len(inputs)
+    for batch in plan_batches(lengths, max_batch_size, max_padded_tokens):
+        batch_outputs = run_batch([inputs[i] for i in batch])
+        for index, output in zip(batch, batch_outputs):
+            outputs[index] = output
+    return outputs
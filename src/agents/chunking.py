@@ -0,0 +1,67 @@
+# src/agents/chunking.py
+
+
+def model_input_limit(pipe, default: int = 1024) -> int:
+    """
+    Maximum number of input tokens of a HuggingFace pipeline's model.
+    """
+    limit = getattr(pipe.model.config, "max_position_embeddings", None) or default
+    tokenizer_limit = pipe.tokenizer.model_max_length
+    # Tokenizers without a configured limit report a huge sentinel value
+    if tokenizer_limit and tokenizer_limit < 1_000_000:
+        limit = min(limit, tokenizer_limit)
+    return limit
+
+
+def chunk_token_windows(
+    tokenizer, text: str, max_tokens: int, overlap: int = 0
+) -> list:
+    """
+    Splits a text into windows of at most `max_tokens` tokens, consecutive
+    windows sharing `overlap` tokens.
+
+    With a fast tokenizer the windows are slices of the original text (via
+    the offset mapping); otherwise they are decoded from the token ids.
+
+    Returns:
+    list: The window texts, in order.
+    """
+    if overlap >= max_tokens:
+        raise ValueError("overlap must be smaller than max_tokens.")
+
+    fast = getattr(tokenizer, "is_fast", False)
+    encoding = tokenizer(
+        text,
+        add_special_tokens=False,
+        return_offsets_mapping=fast,
+        verbose=False,
+    )
+    ids = encoding["input_ids"]
+    if not ids:
+        return []
+
+    step = max_tokens - overlap
+    windows = []
+    for start in range(0, len(ids), step):
+        end = min(start + max_tokens, len(ids))
+        if fast:
+            offsets = encoding["offset_mapping"]
+            windows.append(text[offsets[start][0] : offsets[end - 1][1]])
+        else:
+            windows.append(tokenizer.decode(ids[start:end]))
+        if end == len(ids):
+            break
+    return windows
+
+
+def spread_sample(items: list, limit: int) -> list:
+    """
+    Picks at most `limit` items spread evenly over the list, always keeping
+    the first and the last one.
+    """
+    if limit <= 0 or len(items) <= limit:
+        return list(items)
+    if limit == 1:
+        return [items[0]]
+    last = len(items) - 1
+    return [items[round(i * last / (limit - 1))] for i in range(limit)]
@@ -1,52 +1,143 @@
-from transformers import VisionEncoderDecoderModel, AutoTokenizer, AutoFeatureExtractor
-from PIL import Image
+from transformers import AutoTokenizer, AutoFeatureExtractor
 import torch
+from .backends import load_model
 from .base_agent import BaseAgent
+from .batching import plan_batches
+from .formula_filter import looks_like_formula
+from ..document import to_pil_image
+from ..utils.cache import document_images_digest
 
 
 class FormulaExtractionAgent(BaseAgent):
-    def __init__(self, model_name="DGurgurov/im2latex", logger=None):
-        self.model = VisionEncoderDecoderModel.from_pretrained(model_name)
+    def __init__(
+        self,
+        model_name="DGurgurov/im2latex",
+        logger=None,
+        backend: str = "pytorch",
+        num_threads: int = None,
+        model_cache_dir: str = None,
+        max_batch_size: int = 16,
+        max_new_tokens: int = 256,
+        prefilter=True,
+    ):
+        """
+        Parameters:
+        - model_name (str): HuggingFace image-to-LaTeX model.
+        - logger (Logger): Optional logger.
+        - backend (str): Inference backend, "pytorch", "int8" or "onnx".
+        - num_threads (int): Intra-op inference threads (None: library default).
+        - model_cache_dir (str): Where quantized / exported models are cached.
+        - max_batch_size (int): Maximum number of images per `generate` call.
+        - max_new_tokens (int): Cap on generated tokens per formula.
+        - prefilter (bool | callable): Skip images unlikely to contain a
+          formula before running the model. True uses `looks_like_formula`;
+          a callable taking a PIL image and returning a bool (e.g. a small
+          classifier) can be passed instead.
+        """
+        self.model_name = model_name
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_new_tokens = max_new_tokens
+        if prefilter is True:
+            prefilter = looks_like_formula
+        self.prefilter = prefilter or None
+        self.model = load_model(
+            "image-to-text", model_name, backend, model_cache_dir, num_threads
+        )
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.feature_extractor = AutoFeatureExtractor.from_pretrained(
             "microsoft/swin-base-patch4-window7-224-in22k"
         )
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model.to(self.device)
+        if backend != "onnx":  # ONNX Runtime picks its device via providers
+            self.model.to(self.device)
+        else:
+            self.device = torch.device("cpu")
         self.logger = logger
 
     def execute(self, document):
-        if not hasattr(document, "image_paths") or not document.image_paths:
-            if self.logger:
-                self.logger.info("No images found in document for formula extraction.")
-            return []
+        return self.execute_batch([document])[0]
 
-        formula_results = []
-        for image_path in document.image_paths:
-            try:
+    def execute_batch(self, documents):
+        # Load the candidate images of all documents, dropping the ones the
+        # pre-filter rules out
+        candidates = []  # (document index, PIL image, source)
+        for doc_index, document in enumerate(documents):
+            # Prefer the in-memory images; image files are the fallback (e.g.
+            # for image inputs, whose only image is the input file itself)
+            images = getattr(document, "images", None) or getattr(
+                document, "image_paths", None
+            )
+            if not images:
                 if self.logger:
                     self.logger.info(
-                        f"Processing image for formula extraction: {image_path}"
+                        "No images found in document for formula extraction."
                     )
+                continue
+            for image_source in images:
+                try:
+                    image = to_pil_image(image_source).convert("RGB")
+                    if self.prefilter and not self.prefilter(image):
+                        continue
+                    candidates.append((doc_index, image, image_source))
+                except Exception as e:
+                    if self.logger:
+                        self.logger.error(
+                            f"Error processing image {image_source}: {e}"
+                        )
 
-                # Load and preprocess image
-                image = Image.open(image_path).convert("RGB")
-                pixel_values = self.feature_extractor(
-                    images=image, return_tensors="pt"
-                ).pixel_values
-                pixel_values = pixel_values.to(self.device)
+        if self.logger and candidates:
+            self.logger.info(f"Extracting formulas from {len(candidates)} images.")
 
-                # Generate LaTeX code
-                generated_ids = self.model.generate(pixel_values)
-                latex_code = self.tokenizer.decode(
-                    generated_ids[0], skip_special_tokens=True
-                )
+        # Wide crops tend to hold long formulas: bucket by aspect ratio so a
+        # batch doesn't keep generating for one long formula among short ones
+        aspect_ratios = [image.width / image.height for _, image, _ in candidates]
+        latex = [None] * len(candidates)
+        for batch in plan_batches(aspect_ratios, self.max_batch_size, float("inf")):
+            try:
+                outputs = self._generate([candidates[i][1] for i in batch])
+            except Exception:
+                # Retry one by one so a single bad image only loses itself
+                outputs = []
+                for i in batch:
+                    try:
+                        outputs.extend(self._generate([candidates[i][1]]))
+                    except Exception as e:
+                        if self.logger:
+                            self.logger.error(
+                                f"Error processing image {candidates[i][2]}: {e}"
+                            )
+                        outputs.append(None)
+            for i, output in zip(batch, outputs):
+                latex[i] = output
 
-                formula_results.append(latex_code)
+        formula_results = [[] for _ in documents]
+        for (doc_index, _, _), latex_code in zip(candidates, latex):
+            if latex_code is not None:
+                formula_results[doc_index].append(latex_code)
+        return formula_results
 
-            except Exception as e:
-                if self.logger:
-                    self.logger.error(f"Error processing image {image_path}: {e}")
-                continue
+    def cache_inputs(self, document) -> list:
+        return document_images_digest(document)  # Reads only the images
 
-        return formula_results
+    def _generate(self, images: list) -> list:
+        """
+        Preprocesses a batch of images at once and generates their LaTeX code
+        with a single `generate` call.
+        """
+        pixel_values = self.feature_extractor(
+            images=images, return_tensors="pt"
+        ).pixel_values.to(self.device)
+        with torch.no_grad():
+            generated_ids = self.model.generate(
+                pixel_values, max_new_tokens=self.max_new_tokens
+            )
+        return self.tokenizer.batch_decode(generated_ids, skip_special_tokens=True)
+
+    def cache_params(self) -> dict:
+        return {
+            "model_name": self.model_name,
+            "backend": self.backend,
+            "max_new_tokens": self.max_new_tokens,
+            "prefilter": getattr(self.prefilter, "__name__", repr(self.prefilter)),
+        }
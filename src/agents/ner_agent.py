@@ -1,17 +1,57 @@
 # src/agents/ner_agent.py
 
-from transformers import pipeline
+from .backends import build_pipeline
 from .base_agent import BaseAgent
+from .batching import run_batched, token_lengths
 
 
 class NERAgent(BaseAgent):
-    def __init__(self, model_name="dslim/bert-base-NER"):
-        self.ner_pipeline = pipeline("ner", model=model_name, grouped_entities=True)
+    def __init__(
+        self,
+        model_name="dslim/bert-base-NER",
+        max_batch_size: int = 16,
+        max_padded_tokens: int = 8192,
+        backend: str = "pytorch",
+        num_threads: int = None,
+        model_cache_dir: str = None,
+    ):
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_padded_tokens = max_padded_tokens
+        self.backend = backend
+        self.ner_pipeline = build_pipeline(
+            "ner",
+            model_name,
+            backend,
+            model_cache_dir,
+            num_threads,
+            grouped_entities=True,
+        )
 
     def execute(self, document):
-        text = document.get_text()
-        entities = self.ner_pipeline(text)
-        person_names = [
-            entity["word"] for entity in entities if entity["entity_group"] == "PER"
-        ]
-        return person_names
+        return self.execute_batch([document])[0]
+
+    def execute_batch(self, documents):
+        texts = [document.get_text() for document in documents]
+
+        def recognize(batch):
+            # The pipeline truncates each text to the model's maximum length
+            # itself; in transformers 4.31 it rejects a `truncation` argument
+            results = self.ner_pipeline(batch, batch_size=len(batch))
+            return [
+                [
+                    entity["word"]
+                    for entity in entities
+                    if entity["entity_group"] == "PER"
+                ]
+                for entities in results
+            ]
+
+        tokenizer = self.ner_pipeline.tokenizer
+        lengths = token_lengths(tokenizer, texts, max_length=tokenizer.model_max_length)
+        return run_batched(
+            texts, lengths, recognize, self.max_batch_size, self.max_padded_tokens
+        )
+
+    def cache_params(self) -> dict:
+        return {"model_name": self.model_name, "backend": self.backend}
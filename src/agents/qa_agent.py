@@ -1,20 +1,157 @@
 # src/agents/qa_agent.py
 
-from transformers import pipeline
+from .backends import build_pipeline
 from .base_agent import BaseAgent
+from .batching import run_batched, token_lengths
+from .retrieval import BM25Index, page_passages
 
 
 class QuestionAnsweringAgent(BaseAgent):
-    def __init__(self, model_name: str = "deepset/roberta-base-squad2"):
-        self.qa_pipeline = pipeline(
-            "question-answering", model=model_name, tokenizer=model_name
+    """
+    Answers questions over whole documents: passages are retrieved with BM25
+    and only the best `top_k` per question are read by the QA model.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "deepset/roberta-base-squad2",
+        max_batch_size: int = 16,
+        max_padded_tokens: int = 8192,
+        top_k: int = 3,
+        passage_words: int = 200,
+        passage_overlap: int = 50,
+        backend: str = "pytorch",
+        num_threads: int = None,
+        model_cache_dir: str = None,
+    ):
+        """
+        Parameters:
+        - model_name (str): HuggingFace extractive QA model.
+        - max_batch_size (int): Maximum number of passages per inference batch.
+        - max_padded_tokens (int): Maximum padded tokens per inference batch.
+        - top_k (int): Passages read by the model per question.
+        - passage_words (int): Words per retrieved passage.
+        - passage_overlap (int): Words shared by consecutive passages.
+        - backend (str): Inference backend, "pytorch", "int8" or "onnx".
+        - num_threads (int): Intra-op inference threads (None: library default).
+        - model_cache_dir (str): Where quantized / exported models are cached.
+        """
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_padded_tokens = max_padded_tokens
+        self.top_k = top_k
+        self.passage_words = passage_words
+        self.passage_overlap = passage_overlap
+        self.backend = backend
+        self.qa_pipeline = build_pipeline(
+            "question-answering", model_name, backend, model_cache_dir, num_threads
+        )
+
+    def execute(self, document, question):
+        """
+        Parameters:
+        - document (Document): The document to answer from.
+        - question (str | list): A question, or a list of questions.
+
+        Returns:
+        str | list: For a single question, the best answer (empty if the
+        document has no text). For a list, one ranked list per question of
+        dicts with "answer", "score", "page" and "offset".
+        """
+        return self.execute_batch([document], question=question)[0]
+
+    def execute_batch(self, documents, question):
+        questions = [question] if isinstance(question, str) else list(question)
+
+        # One index per document, shared by all its questions
+        reads = []  # (document index, question index, passage)
+        for doc_index, document in enumerate(documents):
+            passages = page_passages(
+                document, self.passage_words, self.passage_overlap
+            )
+            if not passages:
+                continue
+            index = BM25Index([passage["text"] for passage in passages])
+            for q_index, q in enumerate(questions):
+                hits = index.search(q, self.top_k)
+                # No lexical overlap at all: read the opening passages
+                hit_indices = [i for i, _ in hits] or range(
+                    min(self.top_k, len(passages))
+                )
+                for i in hit_indices:
+                    reads.append((doc_index, q_index, passages[i]))
+
+        answers = self._read(
+            [questions[q_index] for _, q_index, _ in reads],
+            [passage["text"] for _, _, passage in reads],
+        )
+
+        ranked = [[[] for _ in questions] for _ in documents]
+        for (doc_index, q_index, passage), answer in zip(reads, answers):
+            ranked[doc_index][q_index].append(
+                {
+                    "answer": answer["answer"],
+                    "score": float(answer["score"]),
+                    "page": passage["page"],
+                    "offset": passage["offset"] + answer["start"],
+                }
+            )
+        for per_document in ranked:
+            for q_index, candidates in enumerate(per_document):
+                per_document[q_index] = _rank(candidates)
+
+        if isinstance(question, str):
+            return [
+                per_document[0][0]["answer"] if per_document[0] else ""
+                for per_document in ranked
+            ]
+        return ranked
+
+    def _read(self, questions: list, contexts: list) -> list:
+        """
+        Runs the reader model over (question, passage) pairs in batches.
+        """
+        pairs = list(zip(questions, contexts))
+        if not pairs:
+            return []
+
+        def answer(batch):
+            results = self.qa_pipeline(
+                question=[q for q, _ in batch],
+                context=[context for _, context in batch],
+                batch_size=len(batch),
+            )
+            if isinstance(results, dict):  # A single input gives a bare dict
+                results = [results]
+            return results
+
+        lengths = token_lengths(
+            self.qa_pipeline.tokenizer, [q + " " + c for q, c in pairs]
+        )
+        return run_batched(
+            pairs, lengths, answer, self.max_batch_size, self.max_padded_tokens
         )
 
-    def execute(self, document, question: str):
-        context = document.get_text()
-        # Ensure context is within model's max length
-        max_context_length = 512  # Adjust based on the model
-        if len(context.split()) > max_context_length:
-            context = " ".join(context.split()[:max_context_length])
-        result = self.qa_pipeline(question=question, context=context)
-        return result["answer"]
+    def cache_params(self) -> dict:
+        return {
+            "model_name": self.model_name,
+            "backend": self.backend,
+            "top_k": self.top_k,
+            "passage_words": self.passage_words,
+            "passage_overlap": self.passage_overlap,
+        }
+
+
+def _rank(candidates: list) -> list:
+    """
+    Sorts answers by score, dropping repeats of the same span (overlapping
+    passages can yield the same answer twice).
+    """
+    ranked = []
+    seen = set()
+    for candidate in sorted(candidates, key=lambda c: c["score"], reverse=True):
+        key = (candidate["offset"], candidate["answer"])
+        if key not in seen:
+            seen.add(key)
+            ranked.append(candidate)
+    return ranked
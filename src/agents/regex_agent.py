@@ -3,12 +3,119 @@
 import re
 from .base_agent import BaseAgent
 
+# Constructs that break when a pattern is embedded in a combined alternation:
+# numbered backreferences shift with the added groups
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?\(\d")
+# Global inline flags such as "(?i)" must start the whole expression
+_GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+
+def _scoped(pattern: str) -> str:
+    """
+    Rewrites leading global inline flags as scoped ones, "(?i)x" -> "(?i:x)".
+    """
+    flags = _GLOBAL_FLAGS.match(pattern)
+    if not flags:
+        return pattern
+    return f"(?{flags.group(1)}:{pattern[flags.end():]})"
+
 
 class RegexAgent(BaseAgent):
-    def __init__(self, pattern: str):
+    """
+    Searches documents for one pattern or a named set of patterns.
+
+    A named set is compiled once into a single alternation with one named
+    group per pattern, so every page is scanned once however many patterns
+    there are. Like any alternation, the scan is leftmost-first and
+    non-overlapping: where two patterns match at the same position, the one
+    listed first wins, and a match hides other matches overlapping it.
+    Patterns that cannot be embedded (numbered backreferences, conflicting
+    group names) are compiled and scanned separately.
+    """
+
+    def __init__(self, pattern, flags: int = 0):
+        """
+        Parameters:
+        - pattern (str | dict): A regex pattern, or a dict of patterns by name.
+        - flags (int): `re` flags applied to all patterns.
+        """
         self.pattern = pattern
+        self.flags = flags
+        if isinstance(pattern, dict):
+            self._compile_set(pattern)
+        else:
+            self._regex = re.compile(pattern, flags)
+
+    def _compile_set(self, patterns: dict):
+        self._group_names = {}  # Group name -> pattern name
+        combined = []
+        separate = []
+        for pattern_name, pattern in patterns.items():
+            if _BACKREFERENCE.search(pattern):
+                separate.append((pattern_name, re.compile(pattern, self.flags)))
+                continue
+            group = f"_p{len(self._group_names)}"
+            self._group_names[group] = pattern_name
+            combined.append(f"(?P<{group}>{_scoped(pattern)})")
+
+        try:
+            self._regex = re.compile("|".join(combined), self.flags)
+        except re.error:
+            # e.g. the same named group in two patterns: scan them one by one
+            separate = [
+                (name, re.compile(pattern, self.flags))
+                for name, pattern in patterns.items()
+            ]
+            self._regex = None
+            self._group_names = {}
+        self._separate = separate
 
     def execute(self, document):
-        text = document.get_text()
-        matches = re.findall(self.pattern, text)
+        """
+        Scans a single pattern over the full text, so matches may span a
+        page break, and a named set page by page.
+
+        Returns:
+        list: With a single pattern, the `re.findall` results. With a named
+        set, one dict per match with the pattern name, page (starting at 1),
+        offset in the full text and matched text, in text order.
+        """
+        if not isinstance(self.pattern, dict):
+            return self._regex.findall(document.get_text())
+
+        matches = []
+        page_offset = 0
+        for page_number, page_text in document.iter_pages():
+            page_matches = []
+            if self._regex is not None and self._group_names:
+                for match in self._regex.finditer(page_text):
+                    page_matches.append(
+                        self._match(
+                            self._group_names[match.lastgroup],
+                            page_number,
+                            page_offset,
+                            match,
+                        )
+                    )
+            for pattern_name, regex in self._separate:
+                for match in regex.finditer(page_text):
+                    page_matches.append(
+                        self._match(pattern_name, page_number, page_offset, match)
+                    )
+            if self._separate:
+                page_matches.sort(key=lambda found: found["offset"])
+            matches.extend(page_matches)
+            page_offset += len(page_text)
         return matches
+
+    @staticmethod
+    def _match(pattern_name, page_number, page_offset, match) -> dict:
+        return {
+            "pattern": pattern_name,
+            "page": page_number,
+            "offset": page_offset + match.start(),
+            "match": match.group(),
+        }
+
+    def cache_params(self) -> dict:
+        return {"pattern": self.pattern, "flags": self.flags}
@@ -0,0 +1,139 @@
+# src/agents/registry.py
+
+import importlib
+import threading
+from ..utils.misc import cores_per_worker
+
+# Agent name -> (module in src/agents, class name, `process_documents` flag)
+AGENT_CLASSES = {
+    "text_agent": ("text_extraction_agent", "TextExtractionAgent", "use_text"),
+    "summarization_agent": (
+        "summarization_agent",
+        "SummarizationAgent",
+        "use_summarization",
+    ),
+    "qa_agent": ("qa_agent", "QuestionAnsweringAgent", "use_qa"),
+    "regex_agent": ("regex_agent", "RegexAgent", "use_regex"),
+    "ner_agent": ("ner_agent", "NERAgent", "use_ner"),
+    "table_agent": ("table_extraction_agent", "TableExtractionAgent", "use_table"),
+    "formula_agent": (
+        "formula_extraction_agent",
+        "FormulaExtractionAgent",
+        "use_formula_extraction",
+    ),
+}
+
+
+# Agents running a model, which take the inference backend arguments
+MODEL_AGENTS = ("summarization_agent", "qa_agent", "ner_agent", "formula_agent")
+
+
+def inference_arguments(name: str, options: dict) -> dict:
+    """
+    Backend, thread count and artifact cache of a model-backed agent.
+    `options["inference_backend"]` is either one backend for all agents or a
+    dict of backends by agent name.
+    """
+    backend = options.get("inference_backend") or "pytorch"
+    if isinstance(backend, dict):
+        backend = backend.get(name, "pytorch")
+    return {
+        "backend": backend,
+        "num_threads": options.get("inference_threads"),
+        "model_cache_dir": options.get("model_cache_dir"),
+    }
+
+
+def agent_arguments(name: str, options: dict, logger=None) -> dict:
+    """
+    Constructor arguments of an agent, taken from `process_documents` options.
+    """
+    arguments = inference_arguments(name, options) if name in MODEL_AGENTS else {}
+    if name == "summarization_agent":
+        arguments["model_name"] = "facebook/bart-large-cnn"
+        arguments["long_document"] = options.get("long_summaries", False)
+    elif name == "qa_agent":
+        arguments["model_name"] = "deepset/roberta-base-squad2"
+    elif name == "regex_agent":
+        arguments["pattern"] = options.get("regex_pattern")
+    elif name == "table_agent":
+        arguments["engine"] = options.get("table_engine") or "pymupdf"
+        arguments["workers"] = cores_per_worker(options.get("workers"))
+    if name in ("text_agent", "table_agent", "formula_agent"):
+        arguments["logger"] = logger
+    return arguments
+
+
+class AgentRegistry:
+    """
+    Dict-like collection of the enabled agents that imports and builds each
+    agent only when it is first used, so runs that never reach a model-backed
+    agent never import transformers/torch or load its weights. An agent that
+    fails to build is not retried: later lookups raise the same error.
+    """
+
+    def __init__(self, options: dict, logger=None):
+        """
+        Parameters:
+        - options (dict): The `use_*` flags and agent settings of `process_documents`.
+        - logger (Logger): Logger handed to the agents that accept one.
+        """
+        self.options = options
+        self.logger = logger
+        self.enabled = [
+            name for name, (_, _, flag) in AGENT_CLASSES.items() if options.get(flag)
+        ]
+        self._agents = {}
+        self._failures = {}  # Agent name -> (exception, its traceback)
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.enabled
+
+    def __iter__(self):
+        return iter(self.enabled)
+
+    def __len__(self) -> int:
+        return len(self.enabled)
+
+    def __getitem__(self, name: str):
+        if name not in self.enabled:
+            raise KeyError(name)
+        with self._lock:
+            if name in self._failures:
+                # The original traceback, not one growing with every raise
+                error, traceback = self._failures[name]
+                raise error.with_traceback(traceback)
+            if name not in self._agents:
+                module_name, class_name, _ = AGENT_CLASSES[name]
+                try:
+                    module = importlib.import_module(f".{module_name}", __package__)
+                    agent_class = getattr(module, class_name)
+                    self._agents[name] = agent_class(
+                        **agent_arguments(name, self.options, self.logger)
+                    )
+                except Exception as e:
+                    # e.g. a missing model: don't load it again for every batch
+                    self._failures[name] = (e, e.__traceback__)
+                    raise
+                if self.logger:
+                    self.logger.info(f"Loaded {class_name}.")
+            return self._agents[name]
+
+    def items(self):
+        return [(name, self[name]) for name in self.enabled]
+
+    def loaded(self) -> list:
+        """
+        Names of the agents built so far.
+        """
+        return list(self._agents)
+
+    def close(self):
+        """
+        Closes the agents built so far.
+        """
+        with self._lock:
+            agents = list(self._agents.values())
+        for agent in agents:
+            agent.close()
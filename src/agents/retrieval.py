@@ -0,0 +1,82 @@
+# src/agents/retrieval.py
+
+import math
+import re
+from collections import Counter, defaultdict
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list:
+    return [word.lower() for word in _WORD.findall(text)]
+
+
+def page_passages(document, window_words: int = 200, overlap_words: int = 50) -> list:
+    """
+    Splits a document into overlapping word windows that never cross a page.
+
+    Returns:
+    list: Passages as dicts with "text", "page" and "offset" (start of the
+    passage in the document's full text).
+    """
+    if overlap_words >= window_words:
+        raise ValueError("overlap_words must be smaller than window_words.")
+
+    step = window_words - overlap_words
+    passages = []
+    for page_number, page_text in document.iter_pages():
+        page_offset = document.page_offsets[page_number - document.first_page]
+        spans = [match.span() for match in re.finditer(r"\S+", page_text)]
+        for start in range(0, len(spans), step):
+            end = min(start + window_words, len(spans))
+            begin, finish = spans[start][0], spans[end - 1][1]
+            passages.append(
+                {
+                    "text": page_text[begin:finish],
+                    "page": page_number,
+                    "offset": page_offset + begin,
+                }
+            )
+            if end == len(spans):
+                break
+    return passages
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a list of passages, backed by an inverted index so a
+    query only scores the passages that contain one of its terms.
+    """
+
+    def __init__(self, texts: list, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(texts)
+        self.lengths = []
+        self.postings = defaultdict(list)  # term -> [(passage index, tf)]
+        for index, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((index, tf))
+        self.average_length = (sum(self.lengths) / self.size) if self.size else 0.0
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = 5) -> list:
+        """
+        Returns up to `top_k` (passage index, score) pairs, best first.
+        """
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for index, tf in postings:
+                norm = 1 - self.b + self.b * self.lengths[index] / self.average_length
+                scores[index] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
@@ -1,22 +1,136 @@
 # src/agents/summarization_agent.py
 
-from transformers import pipeline
+from .backends import build_pipeline
 from .base_agent import BaseAgent
+from .batching import run_batched, token_lengths
+from .chunking import chunk_token_windows, model_input_limit, spread_sample
 
 
 class SummarizationAgent(BaseAgent):
-    def __init__(self, model_name="facebook/bart-large-cnn"):
-        self.summarizer = pipeline(
-            "summarization", model=model_name, tokenizer=model_name
+    def __init__(
+        self,
+        model_name="facebook/bart-large-cnn",
+        max_batch_size: int = 8,
+        max_padded_tokens: int = 8192,
+        long_document: bool = False,
+        chunk_overlap: int = 64,
+        max_chunks: int = 16,
+        max_reduce_rounds: int = 2,
+        backend: str = "pytorch",
+        num_threads: int = None,
+        model_cache_dir: str = None,
+    ):
+        """
+        Parameters:
+        - model_name (str): HuggingFace summarization model.
+        - max_batch_size (int): Maximum number of texts per inference batch.
+        - max_padded_tokens (int): Maximum padded tokens per inference batch.
+        - long_document (bool): Summarize the whole document (map-reduce over
+          token-budgeted chunks) instead of only its first model input.
+        - chunk_overlap (int): Tokens shared by consecutive chunks.
+        - max_chunks (int): Ceiling on chunks summarized per document; longer
+          documents are covered by chunks spread evenly over the text.
+        - max_reduce_rounds (int): Ceiling on summary-of-summaries rounds (at
+          least one); the last round truncates its input to the model's limit.
+        - backend (str): Inference backend, "pytorch", "int8" or "onnx".
+        - num_threads (int): Intra-op inference threads (None: library default).
+        - model_cache_dir (str): Where quantized / exported models are cached.
+        """
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_padded_tokens = max_padded_tokens
+        self.long_document = long_document
+        self.chunk_overlap = chunk_overlap
+        self.max_chunks = max_chunks
+        self.max_reduce_rounds = max_reduce_rounds
+        self.backend = backend
+        self.summarizer = build_pipeline(
+            "summarization", model_name, backend, model_cache_dir, num_threads
+        )
+        tokenizer = self.summarizer.tokenizer
+        self.max_input_tokens = model_input_limit(self.summarizer)
+        self.chunk_tokens = (
+            self.max_input_tokens - tokenizer.num_special_tokens_to_add()
         )
 
     def execute(self, document, max_length=150, min_length=30):
-        text = document.get_text()
-        # Handle long texts by truncating if necessary
-        max_input_length = 1024  # Model's maximum input length
-        if len(text) > max_input_length:
-            text = text[:max_input_length]
-        summary = self.summarizer(
-            text, max_length=max_length, min_length=min_length, do_sample=False
+        return self.execute_batch(
+            [document], max_length=max_length, min_length=min_length
+        )[0]
+
+    def execute_batch(self, documents, max_length=150, min_length=30):
+        if self.long_document:
+            return self._summarize_long(documents, max_length, min_length)
+
+        # Only the first model input of each text is summarized; cut the text
+        # first so huge documents aren't tokenized just to be truncated
+        limit = self.max_input_tokens * 10
+        texts = [document.get_text()[:limit] for document in documents]
+        return self._summarize(texts, max_length, min_length)
+
+    def _summarize(self, texts, max_length, min_length):
+        def summarize(batch):
+            summaries = self.summarizer(
+                batch,
+                max_length=max_length,
+                min_length=min_length,
+                do_sample=False,
+                truncation=True,
+                batch_size=len(batch),
+            )
+            return [summary["summary_text"] for summary in summaries]
+
+        lengths = token_lengths(
+            self.summarizer.tokenizer, texts, max_length=self.max_input_tokens
+        )
+        return run_batched(
+            texts, lengths, summarize, self.max_batch_size, self.max_padded_tokens
         )
-        return summary[0]["summary_text"]
+
+    def _chunks(self, text: str) -> list:
+        chunks = chunk_token_windows(
+            self.summarizer.tokenizer, text, self.chunk_tokens, self.chunk_overlap
+        )
+        return spread_sample(chunks, self.max_chunks) or [text]
+
+    def _summarize_long(self, documents, max_length, min_length):
+        """
+        Map-reduce: summarize every chunk, then summarize the joined chunk
+        summaries until each document fits in one model input. Chunks of all
+        documents in a round share the same inference batches.
+        """
+        results = [None] * len(documents)
+        pending = {i: self._chunks(doc.get_text()) for i, doc in enumerate(documents)}
+
+        round_number = 0
+        while pending:
+            flat = [(i, chunk) for i, chunks in pending.items() for chunk in chunks]
+            summaries = self._summarize(
+                [chunk for _, chunk in flat], max_length, min_length
+            )
+            per_document = {}
+            for (i, _), summary in zip(flat, summaries):
+                per_document.setdefault(i, []).append(summary)
+
+            pending = {}
+            for i, chunk_summaries in per_document.items():
+                if len(chunk_summaries) == 1:
+                    results[i] = chunk_summaries[0]
+                elif round_number + 1 >= self.max_reduce_rounds:
+                    # Last round: summarize the first model input only
+                    pending[i] = ["\n".join(chunk_summaries)]
+                else:
+                    pending[i] = self._chunks("\n".join(chunk_summaries))
+            round_number += 1
+
+        return results
+
+    def cache_params(self) -> dict:
+        return {
+            "model_name": self.model_name,
+            "backend": self.backend,
+            "long_document": self.long_document,
+            "chunk_overlap": self.chunk_overlap,
+            "max_chunks": self.max_chunks,
+            "max_reduce_rounds": self.max_reduce_rounds,
+        }
@@ -1,16 +1,48 @@
 # src/agents/table_extraction_agent.py
 
-import pdfplumber
 from .base_agent import BaseAgent
 from ..utils.logging import Logger
 from ..document import Document
+from ..scraper.table_finder import PDFTableExtractor
+from ..utils.cache import file_digest, make_key
+from ..utils.metrics import METRICS
+
+TABLE_ENGINES = ("pymupdf", "pdfplumber")
 
 
 class TableExtractionAgent(BaseAgent):
-    def __init__(self, logger: Logger = None):
+    def __init__(
+        self,
+        logger: Logger = None,
+        engine: str = "pymupdf",
+        workers: int = 1,
+        check_ruling_lines: bool = True,
+    ):
+        """
+        Parameters:
+        - logger (Logger): Optional logger.
+        - engine (str): "pymupdf" (table finder on pages with ruling lines,
+          reusing the tables found while scraping) or "pdfplumber". PyMuPDF
+          falls back to pdfplumber if it fails or is too old to find tables.
+        - workers (int): Processes analysing the pages of a PDF in parallel.
+        - check_ruling_lines (bool): Skip pages without ruling lines (pymupdf).
+        """
+        if engine not in TABLE_ENGINES:
+            raise ValueError(f"Unknown table engine: {engine}")
         self.logger = logger
+        self.engine = engine
+        self.extractor = PDFTableExtractor(
+            workers=workers, check_ruling_lines=check_ruling_lines
+        )
+
+    def close(self):
+        self.extractor.close()
 
     def execute(self, document: Document):
+        # Tables read by the scraper of a non-PDF format (e.g. DOCX)
+        if document.tables is not None and not _is_pdf(document):
+            return document.tables
+
         # Check if the document has a file path (required for pdfplumber)
         if not hasattr(document, "file_path") or not document.file_path.endswith(
             ".pdf"
@@ -19,12 +51,37 @@ class TableExtractionAgent(BaseAgent):
                 "TableExtractionAgent requires a PDF document with a file_path attribute."
             )
 
+        if self.engine == "pymupdf":
+            tables = document.tables
+            try:
+                if tables is None:  # Not extracted while scraping
+                    tables = self.extractor.extract_file(
+                        document.file_path, _page_numbers(document)
+                    )
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(
+                        f"PyMuPDF table extraction failed, using pdfplumber: {e}"
+                    )
+            if tables is not None:
+                if self.logger:
+                    self.logger.info(f"Extracted {len(tables)} tables")
+                return tables
+
+        return self._extract_pdfplumber(document)
+
+    def _extract_pdfplumber(self, document: Document) -> list:
+        import pdfplumber
+
         tables = []
 
         try:
-            with pdfplumber.open(document.file_path) as pdf:
-                for page_number, page in enumerate(pdf.pages, start=1):
-                    page_tables = page.extract_tables()
+            with METRICS.span("tables_pdfplumber"), pdfplumber.open(
+                document.file_path
+            ) as pdf:
+                page_numbers = _page_numbers(document) or range(1, len(pdf.pages) + 1)
+                for page_number in page_numbers:
+                    page_tables = pdf.pages[page_number - 1].extract_tables()
                     for table_number, table in enumerate(page_tables, start=1):
                         if self.logger:
                             self.logger.info(
@@ -43,3 +100,32 @@ class TableExtractionAgent(BaseAgent):
             raise e
 
         return tables
+
+    def cache_inputs(self, document: Document) -> str:
+        # PDF tables are read from the file, other formats' from the scraper
+        if _is_pdf(document):
+            return file_digest(document.file_path)
+        return make_key(document.tables)
+
+    def accepts(self, document: Document) -> bool:
+        return _is_pdf(document) or document.tables is not None
+
+    def cache_params(self) -> dict:
+        params = {"engine": self.engine}
+        if self.engine == "pymupdf":
+            params.update(self.extractor.cache_params())
+        return params
+
+
+def _is_pdf(document: Document) -> bool:
+    return bool(document.file_path) and document.file_path.endswith(".pdf")
+
+
+def _page_numbers(document: Document) -> list:
+    """
+    The pages of the file a document covers (a page range for the shards of
+    a long PDF), None if it holds no pages.
+    """
+    if not document.page_count:
+        return None
+    return list(range(document.first_page, document.first_page + document.page_count))
@@ -1,17 +1,28 @@
 # src/agents/text_extraction_agent.py
 
+import re
 from .base_agent import BaseAgent
 from ..utils.logging import Logger
 
+# Lone surrogates are the only code points that fail to encode as UTF-8
+_SURROGATES = re.compile("[\ud800-\udfff]")
+
 
 class TextExtractionAgent(BaseAgent):
     def __init__(self, logger: Logger = None):
         self.logger = logger
 
     def execute(self, document):
-        text = document.get_text()
-        # Clean up text encoding
-        text = text.encode("utf-8", "ignore").decode("utf-8")
+        # Clean up text encoding page by page; clean pages are kept as-is
+        # instead of being copied through an encode/decode round-trip
+        pages = []
+        changed = False
+        for _, page_text in document.iter_pages():
+            if _SURROGATES.search(page_text):
+                page_text = page_text.encode("utf-8", "ignore").decode("utf-8")
+                changed = True
+            pages.append(page_text)
+        text = "".join(pages) if changed else document.get_text()
         if self.logger:
             self.logger.info("Extracted text from document.")
         return text
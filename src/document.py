@@ -1,17 +1,211 @@
 # src/document.py
 
+import os
+import shutil
+import weakref
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class ImageData:
+    """
+    An image held in memory as raw pixel samples, e.g. a PyMuPDF pixmap buffer.
+
+    The samples are kept as a buffer view of the source where possible, so
+    passing images to OCR and formula extraction needs no PNG encode/decode.
+    """
+
+    __slots__ = (
+        "samples",
+        "width",
+        "height",
+        "mode",
+        "stride",
+        "page",
+        "index",
+        "path",
+        "_owner",
+    )
+
+    # Pixel modes by number of channels (PyMuPDF's `pix.n`)
+    MODES = {1: "L", 2: "LA", 3: "RGB", 4: "RGBA"}
+
+    def __init__(
+        self,
+        samples,
+        width: int,
+        height: int,
+        mode: str,
+        stride: int = None,
+        page: int = None,
+        index: int = None,
+        path: str = None,
+        owner=None,
+    ):
+        """
+        Initializes the ImageData object.
+
+        Parameters:
+        - samples (bytes | memoryview): Raw pixel data, row by row.
+        - width (int), height (int): Image size in pixels.
+        - mode (str): PIL pixel mode of the samples ("L", "LA", "RGB", "RGBA").
+        - stride (int): Bytes per row; defaults to tightly packed rows.
+        - page (int): Page the image was found on (if applicable).
+        - index (int): Position of the image on its page.
+        - path (str): Copy of the image on disk, if it was spilled.
+        - owner: Object owning the memory `samples` points into; kept alive
+          as long as this image.
+        """
+        self.samples = samples
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.stride = stride or width * len(mode)
+        self.page = page
+        self.index = index
+        self.path = path
+        self._owner = owner
+
+    @classmethod
+    def from_pixmap(cls, pix, page: int = None, index: int = None):
+        """
+        Wraps a PyMuPDF pixmap without copying its samples.
+        """
+        samples = getattr(pix, "samples_mv", None)  # Zero-copy on recent PyMuPDF
+        if samples is None:
+            samples = pix.samples
+        return cls(
+            samples,
+            pix.width,
+            pix.height,
+            cls.MODES[pix.n],
+            stride=pix.stride,
+            page=page,
+            index=index,
+            owner=pix,
+        )
+
+    @classmethod
+    def from_encoded(cls, data: bytes, page: int = None, index: int = None):
+        """
+        Decodes an encoded image file (PNG, JPEG, ...) into raw samples.
+        """
+        from io import BytesIO
+        from PIL import Image
+
+        image = Image.open(BytesIO(data))
+        if image.mode not in cls.MODES.values():  # e.g. palette, CMYK, 16-bit
+            has_alpha = "transparency" in image.info or image.mode.endswith("A")
+            image = image.convert("RGBA" if has_alpha else "RGB")
+        return cls(
+            image.tobytes(),
+            image.width,
+            image.height,
+            image.mode,
+            page=page,
+            index=index,
+        )
+
+    @property
+    def name(self) -> str:
+        if self.index is None:  # A rendered page rather than an embedded image
+            return f"page{self.page}"
+        return f"image_page{self.page}_{self.index}"
+
+    def __repr__(self):
+        return f"<ImageData {self.name} {self.width}x{self.height} {self.mode}>"
+
+    def to_pil(self):
+        """
+        Returns the image as a PIL image, sharing the buffer where PIL allows it.
+        """
+        from PIL import Image
+
+        return Image.frombuffer(
+            self.mode,
+            (self.width, self.height),
+            self.samples,
+            "raw",
+            self.mode,
+            self.stride,
+            1,
+        )
+
+    def __getstate__(self):
+        # Buffer views can't be pickled; store the samples as bytes
+        return {
+            "samples": bytes(self.samples),
+            "width": self.width,
+            "height": self.height,
+            "mode": self.mode,
+            "stride": self.stride,
+            "page": self.page,
+            "index": self.index,
+            "path": self.path,
+        }
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._owner = None
+
+
+def to_pil_image(image):
+    """
+    Returns a PIL image for an image path, a PIL image, or an ImageData or
+    other object converting itself with `to_pil()` (e.g. PreprocessedImage).
+    """
+    if hasattr(image, "to_pil"):
+        return image.to_pil()
+    if isinstance(image, (str, os.PathLike)):
+        from PIL import Image
+
+        return Image.open(image)
+    return image
+
+
+# Document slots that are derived or tied to this process, and not pickled
+_TRANSIENT_SLOTS = ("_text", "_offsets", "_spill_dir", "_cleanup", "__weakref__")
+
 
 class Document:
     """
     Represents a scraped document.
+
+    Text is stored per page; the full text is only joined when first asked for
+    through `text` / `get_text()`, so agents that work page by page never pay
+    for one large string.
     """
 
+    __slots__ = (
+        "_pages",
+        "_text",
+        "_offsets",
+        "file_path",
+        "image_paths",
+        "_rows",
+        "sheets",
+        "images",
+        "ocr_stats",
+        "tables",
+        "first_page",
+        "_spill_dir",
+        "_cleanup",
+        "__weakref__",
+    )
+
     def __init__(
         self,
-        text: str,
+        text: str = None,
         file_path: str = None,
         image_paths: list = None,
         rows: list = None,
+        pages: list = None,
+        images: list = None,
+        ocr_stats: dict = None,
+        tables: list = None,
+        sheets: dict = None,
+        first_page: int = 1,
     ):
         """
         Initializes the Document object.
@@ -21,11 +215,157 @@ class Document:
         - file_path (str): The file path of the document.
         - image_paths (list): List of image paths related to the document (if applicable).
         - rows (list): List of rows for structured data (for Excel or table extraction).
+        - pages (list): Per-page texts, used instead of `text` by page-based scrapers.
+        - images (list): In-memory images (ImageData) found in the document.
+        - ocr_stats (dict): Counts of images OCRed and skipped (and why).
+        - tables (list): Tables found while scraping, as {page, table_number,
+          data} dicts; None if the scraper didn't look for tables.
+        - sheets (dict): Spreadsheet data as pandas DataFrames by sheet name.
+        - first_page (int): Number of the first page in `pages`, for a page
+          range of a larger file (see PDFScraper.scrape_pages).
         """
-        self.text = text
+        if pages is not None:
+            self._pages = list(pages)
+            self._text = None
+        else:
+            self._pages = [text] if text else []
+            self._text = text if text is not None else ""
+        self._offsets = None
         self.file_path = file_path
         self.image_paths = image_paths if image_paths else []
-        self.rows = rows if rows else []  # Add support for rows
+        self._rows = rows if rows else None  # Add support for rows
+        self.sheets = sheets if sheets else {}
+        self.images = images if images else []
+        self.ocr_stats = ocr_stats if ocr_stats else {}
+        self.tables = tables
+        self.first_page = first_page
+        self._spill_dir = None
+        self._cleanup = None
+
+    def attach_spill_dir(self, directory: str):
+        """
+        Makes this document own a directory of spilled images. The directory
+        is removed by `close()` or when the document is garbage collected.
+        """
+        self._spill_dir = directory
+        self._cleanup = weakref.finalize(self, shutil.rmtree, directory, True)
+
+    def close(self):
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def __getstate__(self):
+        # The joined text and offsets derive from the pages, and spilled files
+        # don't outlive this object; don't pickle them
+        state = {
+            slot: getattr(self, slot)
+            for slot in self.__slots__
+            if slot not in _TRANSIENT_SLOTS
+        }
+        if self._spill_dir:
+            state["image_paths"] = [
+                path
+                for path in self.image_paths
+                if not path.startswith(self._spill_dir + os.sep)
+            ]
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._text = None
+        self._offsets = None
+        self._spill_dir = None
+        self._cleanup = None
+
+    @property
+    def rows(self) -> list:
+        """
+        Rows of structured data as tuples; for spreadsheets they are built from
+        `sheets` on each access, so prefer the DataFrames for large data.
+        """
+        if self._rows is not None:
+            return self._rows
+        return [
+            row
+            for frame in self.sheets.values()
+            for row in frame.itertuples(index=False, name=None)
+        ]
+
+    @rows.setter
+    def rows(self, value: list):
+        self._rows = value
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._pages)
+        return self._text
+
+    @text.setter
+    def text(self, value: str):
+        self._pages = [value] if value else []
+        self._text = value
+        self._offsets = None
 
     def get_text(self) -> str:
         return self.text
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def iter_pages(self):
+        """
+        Yields (page_number, page_text) pairs, starting at `first_page`.
+        """
+        return enumerate(self._pages, start=self.first_page)
+
+    def get_page(self, page_number: int) -> str:
+        return self._pages[page_number - self.first_page]
+
+    @property
+    def page_offsets(self) -> list:
+        """
+        Start offset of each page within the full text.
+        """
+        if self._offsets is None:
+            self._offsets = [0]
+            self._offsets.extend(accumulate(len(page) for page in self._pages[:-1]))
+        return self._offsets
+
+    def page_for_offset(self, offset: int) -> int:
+        """
+        Returns the page number (starting at `first_page`) containing a
+        full-text offset.
+        """
+        return max(bisect_right(self.page_offsets, offset), 1) + self.first_page - 1
+
+    @classmethod
+    def merge(cls, documents: list) -> "Document":
+        """
+        Joins the documents of consecutive page ranges of one file (in page
+        order) into one Document. Spilled image files stay owned by the
+        parts.
+        """
+        first = documents[0]
+        tables = [document.tables for document in documents]
+        ocr_stats = {}
+        for document in documents:
+            for key, count in document.ocr_stats.items():
+                ocr_stats[key] = ocr_stats.get(key, 0) + count
+        return cls(
+            pages=[page for document in documents for page in document._pages],
+            file_path=first.file_path,
+            image_paths=[
+                path for document in documents for path in document.image_paths
+            ],
+            images=[image for document in documents for image in document.images],
+            ocr_stats=ocr_stats,
+            tables=(
+                None
+                if all(part is None for part in tables)
+                else [table for part in tables if part for table in part]
+            ),
+            first_page=first.first_page,
+        )
@@ -1,9 +1,47 @@
 # src/ocr_engines/base_ocr.py
 
 import abc
+from ..utils.metrics import instrument_methods
+
+
+def _batch_size(args: tuple, result) -> dict:
+    return {"images": len(result)}
+
+
+_INSTRUMENTED = {"perform_ocr": None, "perform_ocr_batch": _batch_size}
 
 
 class BaseOCREngine(abc.ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument_methods(cls, "ocr", _INSTRUMENTED)
+
     @abc.abstractmethod
-    def perform_ocr(self, image_path: str) -> str:
+    def perform_ocr(self, image) -> str:
+        """
+        Performs OCR on an image given as a file path, an in-memory
+        `ImageData` or a PIL image.
+        """
         pass
+
+    def perform_ocr_batch(self, images) -> list:
+        """
+        Performs OCR on several images and returns the texts in input order.
+        `images` may be a generator; engines that run OCR in parallel start on
+        the first images while the caller is still producing the rest.
+        """
+        return [self.perform_ocr(image) for image in images]
+
+    def cache_params(self) -> dict:
+        """
+        Settings that change this engine's output. Used to key cached documents.
+        """
+        return {"engine": type(self).__name__}
+
+    def close(self):
+        """
+        Releases the engine's worker threads or processes, if any.
+        """
+
+
+instrument_methods(BaseOCREngine, "ocr", _INSTRUMENTED)
@@ -0,0 +1,142 @@
+# src/ocr_engines/pooled_tesseract_ocr.py
+
+import importlib.util
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .base_ocr import BaseOCREngine
+from ..document import to_pil_image
+from ..utils.logging import Logger
+from ..utils.misc import available_cpu_count
+
+
+def _load_tesserocr():
+    """
+    Returns the tesserocr module (persistent Tesseract API, no process per
+    image), or None if it is not installed.
+    """
+    try:
+        import tesserocr
+    except ImportError:
+        return None
+    return tesserocr
+
+
+class PooledTesseractOCREngine(BaseOCREngine):
+    """
+    Tesseract OCR over a pool of long-lived worker threads.
+
+    With `tesserocr` installed, every worker keeps one initialized Tesseract
+    instance for its whole life (the C API releases the GIL while
+    recognizing). Without it, workers fall back to pytesseract, which still
+    starts one tesseract process per image but runs them in parallel; a
+    warning says so, as most of the pool's gain is lost.
+
+    The pool (and tesserocr) is only loaded on the first OCR call; `close()`
+    stops it.
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        lang: str = "eng",
+        config: str = "",
+        logger: Logger = None,
+        omp_thread_limit: int = 1,
+    ):
+        """
+        Parameters:
+        - workers (int): Number of OCR workers; defaults to the available cores.
+        - lang (str): Tesseract language(s), e.g. "eng" or "eng+deu".
+        - config (str): Extra Tesseract options (pytesseract backend only).
+        - logger (Logger): Where the pytesseract fallback warning goes
+          (default: stdout).
+        - omp_thread_limit (int): OpenMP threads per Tesseract, as the pool
+          provides the parallelism. Set as OMP_THREAD_LIMIT in the process
+          environment when the pool starts, unless already set, so it applies
+          to every Tesseract of the process (pytesseract's subprocesses
+          included). None leaves the environment alone.
+        """
+        self.workers = workers or available_cpu_count()
+        self.lang = lang
+        self.config = config
+        self.omp_thread_limit = omp_thread_limit
+        self._tesserocr = None  # Loaded with the pool, see _get_executor
+        has_tesserocr = importlib.util.find_spec("tesserocr") is not None
+        self.backend = "tesserocr" if has_tesserocr else "pytesseract"
+        if not has_tesserocr:
+            message = (
+                "tesserocr is not installed: pooled OCR falls back to pytesseract, "
+                "starting one tesseract process per image. Install tesserocr "
+                "(see the optional dependencies in the README)."
+            )
+            if logger:
+                logger.warning(message)
+            else:
+                print(f"[WARNING] {message}")
+        self._executor = None
+        self._local = threading.local()
+        self._apis = []
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                if self.omp_thread_limit:
+                    # OpenMP reads it when Tesseract's library is loaded
+                    os.environ.setdefault(
+                        "OMP_THREAD_LIMIT", str(self.omp_thread_limit)
+                    )
+                if self.backend == "tesserocr":
+                    self._tesserocr = _load_tesserocr()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="ocr"
+                )
+            return self._executor
+
+    def _get_api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = self._tesserocr.PyTessBaseAPI(lang=self.lang)
+            self._local.api = api
+            with self._lock:
+                self._apis.append(api)
+        return api
+
+    def _ocr(self, image) -> str:
+        image = to_pil_image(image)
+        if self._tesserocr:
+            api = self._get_api()
+            api.SetImage(image)
+            return api.GetUTF8Text()
+
+        import pytesseract
+
+        return pytesseract.image_to_string(image, lang=self.lang, config=self.config)
+
+    def perform_ocr(self, image) -> str:
+        return self._get_executor().submit(self._ocr, image).result()
+
+    def perform_ocr_batch(self, images) -> list:
+        # Executor.map submits while iterating `images`, so a generator that
+        # parses pages keeps producing while the workers OCR earlier images
+        return list(self._get_executor().map(self._ocr, images))
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._lock:
+            apis, self._apis = self._apis, []
+        for api in apis:
+            api.End()
+        self._local = threading.local()
+
+    def cache_params(self) -> dict:
+        return {
+            "engine": type(self).__name__,
+            "backend": self.backend,
+            "lang": self.lang,
+            "config": self.config,
+        }
@@ -1,11 +1,11 @@
 # src/ocr_engines/tesseract_ocr.py
 
-import pytesseract
-from PIL import Image
 from .base_ocr import BaseOCREngine
+from ..document import to_pil_image
 
 
 class TesseractOCREngine(BaseOCREngine):
-    def perform_ocr(self, image_path: str) -> str:
-        image = Image.open(image_path)
-        return pytesseract.image_to_string(image)
+    def perform_ocr(self, image) -> str:
+        import pytesseract  # Imported on first use to keep startup fast
+
+        return pytesseract.image_to_string(to_pil_image(image))
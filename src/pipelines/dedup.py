@@ -0,0 +1,183 @@
+# src/pipelines/dedup.py
+# Near-duplicate detection over extracted text: MinHash signatures of word
+# shingles, indexed with locality-sensitive hashing (LSH) bands.
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 5) -> set:
+    """
+    The distinct runs of `size` consecutive words of a text, lowercased.
+    Texts shorter than `size` words give a single shingle.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def _shingle_hashes(items: set) -> np.ndarray:
+    return np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(item.encode("utf-8"), digest_size=4).digest(), "little"
+            )
+            for item in items
+        ],
+        dtype=np.uint64,
+    )
+
+
+def lsh_bands(threshold: float, num_perm: int) -> tuple:
+    """
+    The (bands, rows) split of a signature for LSH: a pair with similarity s
+    shares a band with probability 1 - (1 - s**rows)**bands, a curve rising
+    steeply around (1 / bands)**(1 / rows). Takes the split whose rise is
+    closest below `threshold`, so pairs above it are rarely missed while
+    dissimilar pairs rarely become candidates.
+    """
+    splits = [
+        (num_perm // rows, rows)
+        for rows in range(1, num_perm + 1)
+        if num_perm % rows == 0
+    ]
+    below = [
+        split for split in splits if (1 / split[0]) ** (1 / split[1]) <= threshold
+    ]
+    return max(below or splits[:1], key=lambda split: split[1])
+
+
+class DuplicateIndex:
+    """
+    Finds documents whose text is a near-duplicate of one seen before, e.g. a
+    document scanned twice or a contract with a changed date.
+
+    Each text gets a MinHash signature of its word shingles; the share of
+    equal signature values estimates the Jaccard similarity of two shingle
+    sets. Signatures are split into LSH bands, so only documents sharing a
+    band are compared instead of all pairs. The first document of a cluster
+    is its canonical document; agent outputs computed for it can be reused
+    for its duplicates (see `run_agents`). Only the outputs of the
+    `max_results` most recently used canonical documents are kept; later
+    duplicates of the others run the agents again.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        min_words: int = 20,
+        seed: int = 1,
+        max_results: int = 1000,
+    ):
+        """
+        Parameters:
+        - threshold (float): Estimated Jaccard similarity of the shingle sets
+          from which a document is a duplicate.
+        - num_perm (int): Signature length; longer is more precise and slower.
+        - shingle_size (int): Words per shingle.
+        - min_words (int): Shorter texts (e.g. empty scans) are never matched.
+        - seed (int): Seed of the hash permutations; an index is only
+          consistent with signatures made with the same seed.
+        - max_results (int): Canonical documents whose agent outputs are
+          remembered for reuse.
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.max_results = max_results
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._signatures = {}  # canonical key -> signature
+        self._buckets = {}  # (band, band hash) -> canonical keys
+        self.clusters = {}  # canonical key -> [(duplicate key, similarity)]
+        # canonical key -> {output key: agent output}, LRU order
+        self.results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        MinHash signature of a text, None if it is too short to compare.
+        """
+        if len(_WORD.findall(text)) < self.min_words:
+            return None
+        hashes = _shingle_hashes(shingles(text, self.shingle_size))
+        # (a * h + b) mod p for every permutation and shingle; 32-bit hashes
+        # and 61-bit factors may overflow 64 bits, which only reshuffles the
+        # permutation consistently for all documents
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> list:
+        return [
+            (band, signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: str, text: str) -> tuple:
+        """
+        Looks up a document and indexes it.
+
+        Returns:
+        tuple: (canonical key, estimated similarity) if the document is a
+        near-duplicate of an indexed one, else None; the document then
+        becomes a canonical document itself.
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            best = None
+            candidates = {
+                candidate
+                for band_key in band_keys
+                for candidate in self._buckets.get(band_key, ())
+            }
+            for candidate in candidates:
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity >= self.threshold and (
+                    best is None or similarity > best[1]
+                ):
+                    best = (candidate, similarity)
+            if best is not None:
+                self.clusters.setdefault(best[0], []).append((key, best[1]))
+                return best
+            self._signatures[key] = signature
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, []).append(key)
+            return None
+
+    def remember(self, key: str, outputs: dict):
+        """
+        Stores the reusable agent outputs of a canonical document.
+        """
+        with self._lock:
+            self.results.setdefault(key, {}).update(outputs)
+            self.results.move_to_end(key)
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+
+    def outputs(self, key: str) -> dict:
+        """
+        The remembered outputs of a canonical document, empty if unknown or
+        evicted.
+        """
+        with self._lock:
+            outputs = self.results.get(key)
+            if outputs is None:
+                return {}
+            self.results.move_to_end(key)
+            return dict(outputs)
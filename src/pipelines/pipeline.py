@@ -1,28 +1,137 @@
 # src/pipelines/pipeline.py
 
-from ..scraper.file_scrapers import PDFScraper, DocxScraper, ImageScraper, ExcelScraper
+from ..scraper.file_scrapers import (
+    PDFScraper,
+    DocxScraper,
+    ImageScraper,
+    ExcelScraper,
+    OCRJob,
+)
+from ..ocr_engines.base_ocr import BaseOCREngine
 from ..ocr_engines.tesseract_ocr import TesseractOCREngine
+from ..scraper.ocr_policy import OCRPolicy
+from ..scraper.table_finder import PDFTableExtractor
+from ..utils.cache import DiskCache, CACHE_VERSION, make_key, file_digest
 
 # src/pipelines/pipeline.py
 
 
 class DocumentProcessingPipeline:
-    def __init__(self):
-        self.ocr_engine = TesseractOCREngine()  # For image OCR
-        self.pdf_scraper = PDFScraper(ocr_engine=self.ocr_engine)
+    def __init__(
+        self,
+        cache: DiskCache = None,
+        ocr_engine: BaseOCREngine = None,
+        ocr_policy: OCRPolicy = None,
+        table_extractor: PDFTableExtractor = None,
+        dedup=None,
+        preprocessors: dict = None,
+    ):
+        preprocessors = preprocessors or {}  # "pdf" / "image" -> ImagePreprocessor
+        self.ocr_engine = ocr_engine or TesseractOCREngine()  # For image OCR
+        self.pdf_scraper = PDFScraper(
+            ocr_engine=self.ocr_engine,
+            ocr_policy=ocr_policy,
+            table_extractor=table_extractor,
+            preprocessor=preprocessors.get("pdf"),
+        )
         self.docx_scraper = DocxScraper()
-        self.image_scraper = ImageScraper(ocr_engine=self.ocr_engine)
+        self.image_scraper = ImageScraper(
+            ocr_engine=self.ocr_engine, preprocessor=preprocessors.get("image")
+        )
         self.excel_scraper = ExcelScraper()  # Add ExcelScraper here
+        self.cache = cache  # Optional cache of scraped documents
+        self.dedup = dedup  # Optional DuplicateIndex, see run_agents
 
-    def process(self, filepath: str):
+    def _scraper_for(self, filepath: str):
         if filepath.endswith(".pdf"):
-            document = self.pdf_scraper.scrape(filepath)
+            return self.pdf_scraper
         elif filepath.endswith(".docx"):
-            document = self.docx_scraper.scrape(filepath)
+            return self.docx_scraper
         elif filepath.endswith((".png", ".jpg", ".jpeg")):
-            document = self.image_scraper.scrape(filepath)
+            return self.image_scraper
         elif filepath.endswith(".xlsx"):
-            document = self.excel_scraper.scrape(filepath)  # Excel processing
+            return self.excel_scraper  # Excel processing
         else:
             raise ValueError("Unsupported file format.")
+
+    def process(self, filepath: str):
+        scraper = self._scraper_for(filepath)
+        if self.cache is None:
+            return scraper.scrape(filepath)
+
+        # Same content scraped with the same settings gives the same Document
+        key = self._cache_key(scraper, filepath)
+        document = self.cache.get_or_compute(key, lambda: scraper.scrape(filepath))
+        document.file_path = filepath
+        return document
+
+    def process_pages(self, filepath: str, first_page: int, last_page: int):
+        """
+        Scrapes a page range of a PDF (see PDFScraper.scrape_pages), for the
+        shards of a long file.
+        """
+
+        def scrape():
+            return self.pdf_scraper.scrape_pages(filepath, first_page, last_page)
+
+        if self.cache is None:
+            return scrape()
+        key = self._cache_key(self.pdf_scraper, filepath, (first_page, last_page))
+        document = self.cache.get_or_compute(key, scrape)
+        document.file_path = filepath
+        return document
+
+    def page_count(self, filepath: str) -> int:
+        """
+        Number of pages of a PDF, 0 for other formats.
+        """
+        if self._scraper_for(filepath) is not self.pdf_scraper:
+            return 0
+        return self.pdf_scraper.page_count(filepath)
+
+    def _cache_key(self, scraper, filepath: str, pages: tuple = None) -> str:
+        parts = [file_digest(filepath), scraper.cache_params()]
+        if pages is not None:
+            parts.append(pages)
+        return make_key("document", CACHE_VERSION, *parts)
+
+    def scrape_deferred(self, filepath: str):
+        """
+        Like `process`, but PDFs with images to OCR come back as an OCRJob to
+        finish with `complete_ocr`, so parsing and OCR can run as separate
+        stages. Everything else (and cached documents) is a Document.
+        """
+        scraper = self._scraper_for(filepath)
+        if scraper is not self.pdf_scraper:
+            return self.process(filepath)
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(scraper, filepath)
+            document = self.cache.get(key)
+            if document is not None:
+                document.file_path = filepath
+                return document
+        result = scraper.scrape_deferred(filepath)
+        if isinstance(result, OCRJob):
+            result.cache_key = key
+        elif key is not None:
+            self.cache.set(key, result)
+        return result
+
+    def close(self):
+        """
+        Stops the OCR engine's workers and the process pool of the table
+        extractor, if they were started.
+        """
+        self.ocr_engine.close()
+        if self.pdf_scraper.table_extractor is not None:
+            self.pdf_scraper.table_extractor.close()
+
+    def complete_ocr(self, job: OCRJob):
+        """
+        Runs the OCR of a job from `scrape_deferred` and returns the Document.
+        """
+        document = self.pdf_scraper.complete_ocr(job)
+        if self.cache is not None and job.cache_key is not None:
+            self.cache.set(job.cache_key, document)
         return document
@@ -0,0 +1,540 @@
+# src/pipelines/runner.py
+
+import os
+from multiprocessing.util import Finalize
+from .pipeline import DocumentProcessingPipeline
+from ..document import Document
+from ..ocr_engines.pooled_tesseract_ocr import PooledTesseractOCREngine
+from ..scraper.ocr_policy import OCRPolicy
+from ..scraper.table_finder import PDFTableExtractor
+from ..agents.registry import AgentRegistry
+from ..utils.logging import Logger
+from ..utils.cache import DiskCache, cached_execute, cached_execute_batch
+from ..utils.metrics import METRICS
+from ..utils.misc import cores_per_worker
+
+
+def build_agents(options: dict, logger: Logger = None) -> AgentRegistry:
+    """
+    Returns the agents enabled in `options`. Agents are imported and built
+    on first use, see AgentRegistry.
+
+    Parameters:
+    - options (dict): The `use_*` flags and agent settings of `process_documents`.
+    - logger (Logger): Logger handed to the agents that accept one.
+    """
+    return AgentRegistry(options, logger=logger)
+
+
+def build_pipeline(options: dict) -> DocumentProcessingPipeline:
+    """
+    Builds the processing pipeline, with an on-disk cache if `options` names
+    a `cache_dir`, a pooled OCR engine if `pooled_ocr` is set, an OCR
+    policy if `smart_ocr` is set, PDF table extraction during scraping if
+    tables are extracted with PyMuPDF, a near-duplicate index if
+    `dedup_threshold` is set and image preprocessors before OCR if
+    `ocr_preprocessing` is set.
+    """
+    cache = None
+    if options.get("cache_dir"):
+        cache = DiskCache(options["cache_dir"], max_bytes=options["cache_max_bytes"])
+    ocr_engine = None
+    if options.get("pooled_ocr"):
+        # Share the cores between the document workers' OCR pools
+        ocr_engine = PooledTesseractOCREngine(
+            workers=cores_per_worker(options.get("workers"))
+        )
+    ocr_policy = OCRPolicy() if options.get("smart_ocr") else None
+    dedup = None
+    if options.get("dedup_threshold"):
+        from .dedup import DuplicateIndex  # Needs numpy
+
+        dedup = DuplicateIndex(threshold=options["dedup_threshold"])
+    preprocessors = None
+    if options.get("ocr_preprocessing"):
+        from ..ocr_engines.preprocessing import ImagePreprocessor  # Needs numpy
+
+        settings = options["ocr_preprocessing"]
+        if not isinstance(settings, dict):
+            settings = {"pdf": {}, "image": {}}
+        preprocessors = {
+            scraper: ImagePreprocessor(**kwargs)
+            for scraper, kwargs in settings.items()
+            if kwargs is not None
+        }
+    table_extractor = None
+    if options.get("use_table") and options.get("table_engine") == "pymupdf":
+        table_extractor = PDFTableExtractor(
+            workers=cores_per_worker(options.get("workers"))
+        )
+    return DocumentProcessingPipeline(
+        cache=cache,
+        ocr_engine=ocr_engine,
+        ocr_policy=ocr_policy,
+        table_extractor=table_extractor,
+        dedup=dedup,
+        preprocessors=preprocessors,
+    )
+
+
+def output_folder_name(file_name: str) -> str:
+    """
+    Returns the sanitized output folder name for an input file.
+    """
+    folder_name = os.path.splitext(file_name)[0]
+    return "".join(
+        c for c in folder_name if c.isalnum() or c in (" ", "_", "-")
+    ).rstrip()
+
+
+# Agents run on each batch of scraped documents: name -> result key
+AGENT_OUTPUTS = {
+    "summarization_agent": "summary",
+    "qa_agent": "answer",
+    "regex_agent": "regex_matches",
+    "ner_agent": "entities",
+    "table_agent": "tables",
+    "formula_agent": "formulas",
+}
+
+
+def agent_kwargs(name: str, options: dict) -> dict:
+    """
+    Extra `execute` arguments of an agent, taken from `options`.
+    """
+    if name == "qa_agent":
+        return {"question": options.get("question")}
+    return {}
+
+
+def process_batch(
+    pipeline: DocumentProcessingPipeline,
+    agents: dict,
+    file_paths: list,
+    options: dict,
+    logger: Logger = None,
+) -> list:
+    """
+    Scrapes a batch of files and runs the enabled agents on them, one
+    `execute_batch` call per agent for the whole batch.
+
+    Returns:
+    list: One (result, error) tuple per file, in input order. `result` holds
+    the outputs, e.g. {"text": "...", "agents": {"summary": "..."}}; an agent
+    failing on a document is recorded in result["errors"].
+    """
+    outcomes = [None] * len(file_paths)
+    items = []
+    for index, file_path in enumerate(file_paths):
+        try:
+            if logger:
+                logger.info(f"Processing document: {os.path.basename(file_path)}")
+            document = pipeline.process(file_path)
+            if logger:
+                logger.info("Document processed successfully.")
+            result = new_result(pipeline, agents, document, options, logger)
+            items.append((file_path, document, result))
+            outcomes[index] = (result, None)
+        except Exception as e:
+            outcomes[index] = (None, str(e))
+
+    run_agents(pipeline, agents, items, options, logger)
+    return outcomes
+
+
+def new_result(
+    pipeline: DocumentProcessingPipeline,
+    agents: dict,
+    document,
+    options: dict,
+    logger: Logger = None,
+) -> dict:
+    """
+    Starts the result of a scraped document with its extracted text.
+    """
+    result = {"agents": {}, "errors": {}}
+    if "text_agent" in agents:
+        result["text"] = cached_execute(pipeline.cache, agents["text_agent"], document)
+        if logger:
+            logger.info("Text extracted.")
+    if options.get("export_sheets") and document.sheets:
+        result["sheets"] = document.sheets
+    return result
+
+
+# Agents whose output depends only on the extracted text: near-duplicates
+# reuse their canonical document's outputs (not the formula agent's, which
+# reads the document's images)
+REUSABLE_AGENTS = ("summarization_agent", "qa_agent", "ner_agent")
+
+
+def run_agents(
+    pipeline: DocumentProcessingPipeline,
+    agents: dict,
+    items: list,
+    options: dict,
+    logger: Logger = None,
+    find_duplicates: bool = True,
+):
+    """
+    Runs the enabled agents on scraped documents, one `execute_batch` call per
+    agent, storing their outputs (or errors) in the results. The documents
+    are closed afterwards.
+
+    With a duplicate index on the pipeline, near-duplicates of a canonical
+    document get its REUSABLE_AGENTS outputs instead of running them, and
+    result["duplicate_of"] names the canonical document.
+
+    Parameters:
+    - items (list): (file path, Document, result from `new_result`) tuples.
+    - find_duplicates (bool): Look the documents up in the duplicate index
+      (off for the page ranges of a file, see `process_shard`).
+    """
+    canonicals = {}
+    if pipeline.dedup is not None and find_duplicates and items:
+        canonicals = _find_duplicates(pipeline.dedup, items)
+    batch_results = {
+        file_path: result
+        for file_path, _, result in items
+        if id(result) not in canonicals
+    }
+
+    for name, output_key in AGENT_OUTPUTS.items():
+        if name not in agents or not items:
+            continue
+        try:
+            agent = agents[name]  # Built on first use
+        except Exception as e:
+            if logger:
+                logger.error(f"Could not load {name}: {e}")
+            for _, _, result in items:
+                result["errors"][name] = f"Could not load {name}: {e}"
+            continue
+        accepted = [item for item in items if agent.accepts(item[1])]
+        if not accepted:
+            continue
+
+        reused = []
+        if canonicals and name in REUSABLE_AGENTS:
+            reused = [item for item in accepted if id(item[2]) in canonicals]
+            accepted = [item for item in accepted if id(item[2]) not in canonicals]
+        _execute_agent(pipeline, name, agent, accepted, options, logger)
+        missing = []
+        for item in reused:
+            result = item[2]
+            canonical = canonicals[id(result)]
+            if canonical in batch_results:
+                source = batch_results[canonical]["agents"]
+            else:
+                source = pipeline.dedup.outputs(canonical)
+            if output_key in source:
+                result["agents"][output_key] = source[output_key]
+            else:  # The canonical document has no output to share
+                missing.append(item)
+        _execute_agent(pipeline, name, agent, missing, options, logger)
+        if logger:
+            logger.info(
+                f"{name} processed {len(accepted) + len(missing)} documents"
+                + (f", reused {len(reused) - len(missing)}." if reused else ".")
+            )
+
+    if pipeline.dedup is not None and find_duplicates:
+        reusable = [AGENT_OUTPUTS[name] for name in REUSABLE_AGENTS]
+        for file_path, result in batch_results.items():
+            outputs = {
+                key: result["agents"][key]
+                for key in reusable
+                if key in result["agents"]
+            }
+            if outputs:
+                pipeline.dedup.remember(file_path, outputs)
+
+    # Release spilled images right away instead of waiting for collection
+    for _, document, _ in items:
+        document.close()
+
+
+def _find_duplicates(dedup, items: list) -> dict:
+    """
+    Indexes the documents of a batch and marks near-duplicates in their
+    results.
+
+    Returns:
+    dict: id(result) -> canonical file path, for the near-duplicates.
+    """
+    canonicals = {}
+    for file_path, document, result in items:
+        match = dedup.add(file_path, document.text)
+        if match is not None:
+            canonical, similarity = match
+            result["duplicate_of"] = {
+                "file": os.path.basename(canonical),
+                "similarity": round(similarity, 3),
+            }
+            canonicals[id(result)] = canonical
+    return canonicals
+
+
+def _execute_agent(
+    pipeline: DocumentProcessingPipeline,
+    name: str,
+    agent,
+    items: list,
+    options: dict,
+    logger: Logger = None,
+):
+    """
+    Runs one agent on (file path, Document, result) items in one batch and
+    stores its outputs, or each document's error, in the results.
+    """
+    if not items:
+        return
+    output_key = AGENT_OUTPUTS[name]
+    kwargs = agent_kwargs(name, options)
+    batch = [document for _, document, _ in items]
+    try:
+        outputs = cached_execute_batch(pipeline.cache, agent, batch, **kwargs)
+    except Exception:
+        # Retry one by one so a single bad document only loses its own output
+        outputs = []
+        for file_path, document, result in items:
+            try:
+                outputs.append(
+                    cached_execute(pipeline.cache, agent, document, **kwargs)
+                )
+            except Exception as e:
+                if logger:
+                    file_name = os.path.basename(file_path)
+                    logger.error(f"{name} failed on {file_name}: {e}")
+                result["errors"][name] = str(e)
+                outputs.append(None)
+    for (_, _, result), output in zip(items, outputs):
+        if name not in result["errors"]:
+            result["agents"][output_key] = output
+
+
+# Agents whose output for a page range doesn't depend on the other pages:
+# they run on each shard of a long PDF and their outputs are concatenated
+PAGE_LOCAL_AGENTS = ("text_agent", "regex_agent", "table_agent", "formula_agent")
+
+
+class _AgentView:
+    """
+    The agents of a registry named in `names`, still built on first use.
+    """
+
+    def __init__(self, agents, names):
+        self.agents = agents
+        self.names = [name for name in agents if name in names]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __getitem__(self, name: str):
+        if name not in self.names:
+            raise KeyError(name)
+        return self.agents[name]
+
+
+def page_ranges(page_count: int, shard_pages: int) -> list:
+    """
+    Splits pages 1 to `page_count` into (first, last) ranges of `shard_pages`
+    pages. Returns [] for files not longer than one range.
+    """
+    if not shard_pages or page_count <= shard_pages:
+        return []
+    return [
+        (first, min(first + shard_pages - 1, page_count))
+        for first in range(1, page_count + 1, shard_pages)
+    ]
+
+
+def process_shard(
+    pipeline: DocumentProcessingPipeline,
+    agents: dict,
+    file_path: str,
+    first_page: int,
+    last_page: int,
+    options: dict,
+    logger: Logger = None,
+) -> tuple:
+    """
+    Scrapes (and OCRs) a page range of a long PDF and runs the page-local
+    agents on it.
+
+    Returns:
+    tuple: (result, error, Document of the range without its images), to
+    combine with `merge_shards`.
+    """
+    try:
+        document = pipeline.process_pages(file_path, first_page, last_page)
+        local_agents = _AgentView(agents, PAGE_LOCAL_AGENTS)
+        result = new_result(pipeline, local_agents, document, options, logger)
+        items = [(file_path, document, result)]
+        run_agents(
+            pipeline, local_agents, items, options, logger, find_duplicates=False
+        )
+    except Exception as e:
+        return None, f"Pages {first_page}-{last_page}: {e}", None
+    # Only the pages are needed to finish the document
+    document.images = []
+    document.image_paths = []
+    return result, None, document
+
+
+def merge_shards(
+    pipeline: DocumentProcessingPipeline,
+    agents: dict,
+    file_path: str,
+    shards: list,
+    options: dict,
+    logger: Logger = None,
+) -> tuple:
+    """
+    Joins the shards of a file (`process_shard` outcomes in page order) into
+    one Document and one result, then runs the remaining (whole-document)
+    agents on it.
+
+    List outputs of the page-local agents are concatenated; regex match
+    offsets are moved to offsets in the whole text. Page numbers already are
+    those of the whole file.
+
+    Returns:
+    tuple: (result, error) of the file, see `process_batch`.
+    """
+    errors = [error for _, error, _ in shards if error is not None]
+    if errors:
+        return None, "; ".join(errors)
+
+    result = {"agents": {}, "errors": {}}
+    texts = []
+    offset = 0
+    for shard_result, _, document in shards:
+        if "text" in shard_result:
+            texts.append(shard_result["text"])
+        for key, output in shard_result["agents"].items():
+            if isinstance(output, list):
+                merged = result["agents"].setdefault(key, [])
+                merged.extend(_shift_offsets(output, offset))
+            else:
+                result["agents"].setdefault(key, output)
+        pages = f"{document.first_page}-{document.first_page + document.page_count - 1}"
+        for name, error in shard_result["errors"].items():
+            result["errors"].setdefault(name, f"Pages {pages}: {error}")
+        offset += len(document.text)
+    if texts:
+        result["text"] = "".join(texts)
+
+    try:
+        document = Document.merge([document for _, _, document in shards])
+        document.file_path = file_path
+        other_agents = [name for name in agents if name not in PAGE_LOCAL_AGENTS]
+        items = [(file_path, document, result)]
+        run_agents(pipeline, _AgentView(agents, other_agents), items, options, logger)
+    except Exception as e:
+        return None, str(e)
+    return result, None
+
+
+def _shift_offsets(output: list, offset: int) -> list:
+    if not offset:
+        return output
+    return [
+        dict(item, offset=item["offset"] + offset)
+        if isinstance(item, dict) and "offset" in item
+        else item
+        for item in output
+    ]
+
+
+# Per-process state of a pool worker, filled once by `init_worker`.
+_worker_state = {}
+
+
+def init_worker(options: dict):
+    """
+    Process pool initializer: builds the pipeline and the enabled agents once
+    so every file handled by this worker reuses them.
+    """
+    if options.get("metrics_dir"):
+        METRICS.enable()
+        # Pool workers skip atexit handlers, but run multiprocessing
+        # finalizers when the pool shuts them down
+        Finalize(None, export_worker_metrics, exitpriority=10)
+    logger = Logger(name="DocumentProcessorLogger")
+    _worker_state["logger"] = logger
+    _worker_state["options"] = options
+    _worker_state["pipeline"] = build_pipeline(options)
+    _worker_state["agents"] = build_agents(options, logger=logger)
+    # Before the metrics export (higher priorities run first)
+    Finalize(None, close_worker, exitpriority=20)
+
+
+def close_worker():
+    """
+    Closes this worker's agents and pipeline, see `init_worker`.
+    """
+    _worker_state["agents"].close()
+    _worker_state["pipeline"].close()
+
+
+def run_worker_task(file_paths: list) -> list:
+    """
+    Processes a batch of files inside a pool worker.
+
+    Returns:
+    list: One (result, error) tuple per file, see `process_batch`.
+    """
+    try:
+        return process_batch(
+            _worker_state["pipeline"],
+            _worker_state["agents"],
+            file_paths,
+            _worker_state["options"],
+            logger=_worker_state["logger"],
+        )
+    except Exception as e:
+        return [(None, str(e))] * len(file_paths)
+
+
+def run_shard_task(file_path: str, first_page: int, last_page: int) -> tuple:
+    """
+    Processes a page range of a long PDF inside a pool worker, see
+    `process_shard`.
+    """
+    return process_shard(
+        _worker_state["pipeline"],
+        _worker_state["agents"],
+        file_path,
+        first_page,
+        last_page,
+        _worker_state["options"],
+        logger=_worker_state["logger"],
+    )
+
+
+def run_merge_task(file_path: str, shards: list) -> tuple:
+    """
+    Merges the shards of a long PDF inside a pool worker, see `merge_shards`.
+    """
+    return merge_shards(
+        _worker_state["pipeline"],
+        _worker_state["agents"],
+        file_path,
+        shards,
+        _worker_state["options"],
+        logger=_worker_state["logger"],
+    )
+
+
+def export_worker_metrics():
+    """
+    Writes this worker's metrics files, if enabled. Registered by
+    `init_worker` to run once, when the worker exits.
+    """
+    metrics_dir = _worker_state["options"].get("metrics_dir")
+    if metrics_dir and METRICS.enabled:
+        METRICS.export(metrics_dir)
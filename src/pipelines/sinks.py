@@ -0,0 +1,361 @@
+# src/pipelines/sinks.py
+
+import abc
+import json
+import os
+from ..utils.export import export_sheets
+from ..utils.logging import Logger
+from .runner import output_folder_name
+from .work_queue import JOURNAL_MODES
+
+SINKS = ("folder", "sqlite", "parquet")
+
+
+class BaseSink(abc.ABC):
+    """
+    Destination of the per-document results of `process_documents`.
+
+    Results arrive in completion order, not input order; `index` is the
+    document's position in the input. Sinks may buffer writes and must have
+    written everything once `close()` returns.
+    """
+
+    @abc.abstractmethod
+    def write(self, index: int, file_name: str, result: dict = None, error=None):
+        """
+        Stores the result of one document, or the error that stopped it.
+        """
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FolderSink(BaseSink):
+    """
+    One folder per document holding `agent_results.json`,
+    `extracted_text.txt` and, if requested, one file per spreadsheet sheet.
+    """
+
+    def __init__(
+        self, output_dir: str, logger: Logger = None, sheet_format: str = None
+    ):
+        """
+        Parameters:
+        - output_dir (str): Directory holding the document folders.
+        - logger (Logger): Optional logger.
+        - sheet_format (str): "csv" or "parquet" to write spreadsheet sheets.
+        """
+        self.output_dir = output_dir
+        self.logger = logger
+        self.sheet_format = sheet_format
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, index: int, file_name: str, result: dict = None, error=None):
+        if error is not None:
+            return
+
+        # Create a subfolder in output_results for this document
+        document_output_dir = os.path.join(
+            self.output_dir, output_folder_name(file_name)
+        )
+        os.makedirs(document_output_dir, exist_ok=True)
+
+        # Save agent outputs (summary, answer, entities, ...) to a file
+        if result["agents"] or result["errors"] or "duplicate_of" in result:
+            results_file_path = os.path.join(document_output_dir, "agent_results.json")
+            with open(results_file_path, "w", encoding="utf-8") as f:
+                agent_results = dict(result["agents"])
+                if result["errors"]:
+                    agent_results["errors"] = result["errors"]
+                if "duplicate_of" in result:
+                    agent_results["duplicate_of"] = result["duplicate_of"]
+                json.dump(agent_results, f, ensure_ascii=False, indent=2, default=str)
+            self._log(f"Agent results saved to {results_file_path}")
+
+        # Save extracted text to a file
+        if "text" in result:
+            text_file_path = os.path.join(document_output_dir, "extracted_text.txt")
+            with open(text_file_path, "w", encoding="utf-8") as f:
+                f.write(result["text"])
+            self._log(f"Extracted text saved to {text_file_path}")
+
+        # Save spreadsheet data, one file per sheet
+        if self.sheet_format and result.get("sheets"):
+            for path in export_sheets(
+                result["sheets"], document_output_dir, self.sheet_format
+            ):
+                self._log(f"Sheet saved to {path}")
+
+    def _log(self, message: str):
+        if self.logger:
+            self.logger.info(message)
+
+
+def _json(value) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class _BufferedSink(BaseSink):
+    """
+    Collects one document row and one row per agent output, and hands them to
+    `_write_rows` every `batch_size` documents.
+    """
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self._documents = []
+        self._outputs = []
+
+    def write(self, index: int, file_name: str, result: dict = None, error=None):
+        result = result or {}
+        errors = result.get("errors") or {}
+        self._documents.append(
+            (
+                index,
+                file_name,
+                result.get("text"),
+                str(error) if error is not None else None,
+                _json(errors) if errors else None,
+            )
+        )
+        for agent, output in (result.get("agents") or {}).items():
+            self._outputs.append((index, file_name, agent, _json(output)))
+        if "duplicate_of" in result:
+            self._outputs.append(
+                (index, file_name, "duplicate_of", _json(result["duplicate_of"]))
+            )
+        if len(self._documents) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._documents:
+            self._write_rows(self._documents, self._outputs)
+            self._documents = []
+            self._outputs = []
+
+    @abc.abstractmethod
+    def _write_rows(self, documents: list, outputs: list):
+        pass
+
+
+class SQLiteSink(_BufferedSink):
+    """
+    Results in one SQLite database: a `documents` table (input index, file
+    name, text, error, agent errors) and an `agent_outputs` table with one
+    JSON-encoded output per document and agent. Each batch of documents is
+    written in one transaction.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, journal_mode: str = "WAL"):
+        """
+        Parameters:
+        - path (str): Database file; created if missing, appended to otherwise.
+        - batch_size (int): Documents buffered per transaction.
+        - journal_mode (str): SQLite journal mode. "WAL" is only safe when
+          every writer runs on the host storing the database; use "DELETE"
+          when processes on several nodes write one database over a network
+          file system (see WorkQueue).
+        """
+        import sqlite3
+
+        if journal_mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f"Unknown journal mode: {journal_mode}")
+        super().__init__(batch_size)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                file_name TEXT PRIMARY KEY,
+                input_index INTEGER,
+                text TEXT,
+                error TEXT,
+                agent_errors TEXT
+            );
+            CREATE TABLE IF NOT EXISTS agent_outputs (
+                file_name TEXT,
+                agent TEXT,
+                output TEXT,
+                PRIMARY KEY (file_name, agent)
+            );
+            """
+        )
+
+    def _write_rows(self, documents: list, outputs: list):
+        with self._connection:  # One transaction per batch
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO documents"
+                " (input_index, file_name, text, error, agent_errors)"
+                " VALUES (?, ?, ?, ?, ?)",
+                documents,
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO agent_outputs (file_name, agent, output)"
+                " VALUES (?, ?, ?)",
+                [(file_name, agent, output) for _, file_name, agent, output in outputs],
+            )
+
+    def close(self):
+        super().close()
+        self._connection.close()
+
+
+class ParquetSink(_BufferedSink):
+    """
+    Results as two Parquet files, `documents.parquet` and
+    `agent_outputs.parquet` (same columns as SQLiteSink), each batch of
+    documents appended as a row group. Needs pyarrow.
+    """
+
+    def __init__(self, directory: str, batch_size: int = 1000):
+        """
+        Parameters:
+        - directory (str): Directory of the Parquet files (overwritten).
+        - batch_size (int): Documents buffered per row group.
+        """
+        import pyarrow as pa
+
+        super().__init__(batch_size)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._schemas = {
+            "documents": pa.schema(
+                [
+                    ("input_index", pa.int64()),
+                    ("file_name", pa.string()),
+                    ("text", pa.string()),
+                    ("error", pa.string()),
+                    ("agent_errors", pa.string()),
+                ]
+            ),
+            "agent_outputs": pa.schema(
+                [
+                    ("input_index", pa.int64()),
+                    ("file_name", pa.string()),
+                    ("agent", pa.string()),
+                    ("output", pa.string()),
+                ]
+            ),
+        }
+        self._writers = {}
+
+    def _append(self, table_name: str, rows: list):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not rows:
+            return
+        schema = self._schemas[table_name]
+        if table_name not in self._writers:
+            path = os.path.join(self.directory, f"{table_name}.parquet")
+            self._writers[table_name] = pq.ParquetWriter(path, schema)
+        arrays = [
+            pa.array(column, type=field.type)
+            for column, field in zip(zip(*rows), schema)
+        ]
+        self._writers[table_name].write_table(
+            pa.Table.from_arrays(arrays, schema=schema)
+        )
+
+    def _write_rows(self, documents: list, outputs: list):
+        self._append("documents", documents)
+        self._append("agent_outputs", outputs)
+
+    def close(self):
+        super().close()
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+
+class ConcatenatedTextWriter:
+    """
+    Streams the extracted texts of all documents into one file, in input
+    order, as results come in.
+
+    Texts that arrive ahead of their turn wait in a reorder buffer until the
+    documents before them are written or skipped, so memory is bounded by
+    how far completion runs ahead of input order, not by the corpus.
+    """
+
+    def __init__(self, path: str, separator: str = "\n\n"):
+        """
+        Parameters:
+        - path (str): Output file, created on the first text.
+        - separator (str): Written after every text.
+        """
+        self.path = path
+        self.separator = separator
+        self._file = None
+        self._pending = {}  # Input index -> text (None: nothing to write)
+        self._next_index = 0
+        self.written = 0
+
+    def write(self, index: int, text: str):
+        self._pending[index] = text
+        while self._next_index in self._pending:
+            text = self._pending.pop(self._next_index)
+            self._next_index += 1
+            if text is None:
+                continue
+            if self._file is None:
+                self._file = open(self.path, "w", encoding="utf-8")
+            self._file.write(text + self.separator)
+            self.written += 1
+
+    def skip(self, index: int):
+        """
+        Marks a document without text (e.g. failed) so later ones can follow.
+        """
+        self.write(index, None)
+
+    def close(self):
+        # Gaps left by documents never reported: write what is left in order
+        while self._pending:
+            self._next_index = min(self._pending)
+            self.write(self._next_index, self._pending.pop(self._next_index))
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def build_sink(
+    sink,
+    output_dir: str,
+    logger: Logger = None,
+    sheet_format: str = None,
+    journal_mode: str = "WAL",
+) -> BaseSink:
+    """
+    Returns the sink named by `sink` ("folder", "sqlite" or "parquet"), or
+    `sink` itself if it already is a BaseSink. `journal_mode` is the SQLite
+    sink's, see SQLiteSink.
+    """
+    if isinstance(sink, BaseSink):
+        return sink
+    if sink == "folder":
+        return FolderSink(output_dir, logger=logger, sheet_format=sheet_format)
+    if sink == "sqlite":
+        return SQLiteSink(
+            os.path.join(output_dir, "results.sqlite"), journal_mode=journal_mode
+        )
+    if sink == "parquet":
+        return ParquetSink(output_dir)
+    raise ValueError(f"Unknown output sink: {sink}")
@@ -0,0 +1,324 @@
+# src/pipelines/staged.py
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from .pipeline import DocumentProcessingPipeline
+from .runner import (
+    _worker_state,
+    init_worker,
+    new_result,
+    run_agents,
+)
+from ..scraper.file_scrapers import OCRJob
+from ..utils.logging import Logger
+
+STAGES = ("scrape", "ocr", "agents", "write")
+
+_DONE = object()  # Queue sentinel: no more items for this worker
+
+
+def _scrape_in_worker(file_path: str):
+    """
+    Process pool task of the scrape stage, using the worker's own pipeline.
+    """
+    return _worker_state["pipeline"].scrape_deferred(file_path)
+
+
+class StageStats:
+    """
+    Live counters of one stage: items waiting in its input queue, items being
+    worked on, items done and the time spent working (summed over workers).
+    """
+
+    def __init__(self, name: str, queue: asyncio.Queue, concurrency: int):
+        self.name = name
+        self.queue = queue
+        self.concurrency = concurrency
+        self.active = 0
+        self.done = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+
+    def as_dict(self, elapsed: float) -> dict:
+        capacity = elapsed * self.concurrency
+        return {
+            "queued": self.queue.qsize(),
+            "max_queued": self.max_depth,
+            "active": self.active,
+            "done": self.done,
+            "busy_seconds": round(self.busy_seconds, 3),
+            # Share of the stage's worker time spent working: the bottleneck
+            # is the stage close to 1 whose input queue stays full
+            "utilization": round(self.busy_seconds / capacity, 3) if capacity else None,
+        }
+
+
+class StagedExecutor:
+    """
+    Runs documents through scrape -> OCR -> agents -> write as a pipeline of
+    asyncio stages, so reading and parsing the next files, OCR, inference
+    and writing results overlap instead of running one file at a time.
+
+    Stages are connected by bounded queues: a stage whose output queue is full
+    stops taking work, which bounds the number of documents held in memory
+    (backpressure). Each stage has its own number of workers and runs its work
+    in its own thread pool (or a process pool for scraping). The agents stage
+    takes up to `batch_size` documents at a time for batched inference.
+    Results are handed to the caller on the thread calling `run`.
+
+    Queue depths and per-stage utilization are available from `stats()` and
+    are logged every `report_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        pipeline: DocumentProcessingPipeline,
+        agents: dict,
+        options: dict,
+        logger: Logger = None,
+        scrape_workers: int = 1,
+        ocr_workers: int = 1,
+        agent_workers: int = 1,
+        queue_size: int = 8,
+        batch_size: int = 8,
+        scrape_executor: str = "thread",
+        report_interval: float = 10.0,
+    ):
+        """
+        Parameters:
+        - pipeline (DocumentProcessingPipeline): Scrapes and OCRs the files.
+        - agents (dict): The enabled agents, see `build_agents`.
+        - options (dict): The `process_documents` options.
+        - logger (Logger): Optional logger.
+        - scrape_workers (int): Files parsed concurrently. PyMuPDF is not
+          thread-safe: use more than 1 only with the "process" executor.
+        - ocr_workers (int): Documents OCRed concurrently.
+        - agent_workers (int): Batches run through the agents concurrently.
+        - queue_size (int): Capacity of each queue between stages.
+        - batch_size (int): Maximum documents per agents batch.
+        - scrape_executor (str): "thread", or "process" to parse in worker
+          processes (each with its own pipeline built from `options`). OCR
+          runs in this process either way, and reuses the texts its OCR
+          policy remembered across documents (see PDFScraper.complete_ocr).
+        - report_interval (float): Seconds between queue depth log lines
+          (0 disables them).
+        """
+        if scrape_executor not in ("thread", "process"):
+            raise ValueError(f"Unknown scrape executor: {scrape_executor}")
+        self.pipeline = pipeline
+        self.agents = agents
+        self.options = options
+        self.logger = logger
+        self.concurrency = {
+            "scrape": scrape_workers,
+            "ocr": ocr_workers,
+            "agents": agent_workers,
+            "write": 1,  # Sinks are written from the caller's thread
+        }
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.scrape_executor = scrape_executor
+        self.report_interval = report_interval
+        self._stats = {}
+        self._started = None
+
+    def stats(self) -> dict:
+        """
+        Per-stage queue depths and counters of the current (or last) run.
+        """
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return {name: stage.as_dict(elapsed) for name, stage in self._stats.items()}
+
+    def run(self, file_paths: list, on_result):
+        """
+        Processes the files and calls `on_result(index, result, error)` for
+        each of them, in completion order, from the write stage. The calls
+        are made on this thread, so `on_result` may use objects bound to it
+        (e.g. a SQLite connection).
+        """
+        return asyncio.run(self._run(file_paths, on_result))
+
+    def _executors(self) -> dict:
+        executors = {
+            name: ThreadPoolExecutor(max_workers=count, thread_name_prefix=name)
+            for name, count in self.concurrency.items()
+            if name != "write"  # Runs on the event loop's thread
+        }
+        if self.scrape_executor == "process":
+            executors["scrape"].shutdown()
+            executors["scrape"] = ProcessPoolExecutor(
+                max_workers=self.concurrency["scrape"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(self.options,),
+            )
+        return executors
+
+    async def _run(self, file_paths: list, on_result):
+        loop = asyncio.get_running_loop()
+        queues = {name: asyncio.Queue(maxsize=self.queue_size) for name in STAGES}
+        self._stats = {
+            name: StageStats(name, queues[name], self.concurrency[name])
+            for name in STAGES
+        }
+        self._started = time.perf_counter()
+        executors = self._executors()
+
+        async def call(stage: str, function, *args):
+            stats = self._stats[stage]
+            stats.active += 1
+            start = time.perf_counter()
+            try:
+                return await loop.run_in_executor(executors[stage], function, *args)
+            finally:
+                stats.active -= 1
+                stats.busy_seconds += time.perf_counter() - start
+
+        async def put(stage: str, item):
+            await queues[stage].put(item)  # Waits while the stage is saturated
+            stats = self._stats[stage]
+            stats.max_depth = max(stats.max_depth, queues[stage].qsize())
+
+        async def scrape_worker():
+            while True:
+                item = await queues["scrape"].get()
+                if item is _DONE:
+                    return
+                index, file_path = item
+                try:
+                    if self.scrape_executor == "process":
+                        scraped = await call("scrape", _scrape_in_worker, file_path)
+                    else:
+                        scraped = await call(
+                            "scrape", self.pipeline.scrape_deferred, file_path
+                        )
+                except Exception as e:
+                    await put("write", (index, None, str(e)))
+                else:
+                    next_stage = "ocr" if isinstance(scraped, OCRJob) else "agents"
+                    await put(next_stage, (index, file_path, scraped))
+                self._stats["scrape"].done += 1
+
+        async def ocr_worker():
+            while True:
+                item = await queues["ocr"].get()
+                if item is _DONE:
+                    return
+                index, file_path, job = item
+                try:
+                    document = await call("ocr", self.pipeline.complete_ocr, job)
+                except Exception as e:
+                    await put("write", (index, None, str(e)))
+                else:
+                    await put("agents", (index, file_path, document))
+                self._stats["ocr"].done += 1
+
+        def run_agent_batch(batch: list) -> list:
+            outcomes = []
+            items = []
+            for index, file_path, document in batch:
+                try:
+                    result = new_result(
+                        self.pipeline, self.agents, document, self.options, self.logger
+                    )
+                except Exception as e:
+                    document.close()
+                    outcomes.append((index, None, str(e)))
+                    continue
+                items.append((file_path, document, result))
+                outcomes.append((index, result, None))
+            run_agents(self.pipeline, self.agents, items, self.options, self.logger)
+            return outcomes
+
+        async def agents_worker():
+            finished = False
+            while not finished:
+                item = await queues["agents"].get()
+                if item is _DONE:
+                    return
+                # Take whatever else is ready, up to a full batch
+                batch = [item]
+                while len(batch) < self.batch_size and not queues["agents"].empty():
+                    item = queues["agents"].get_nowait()
+                    if item is _DONE:
+                        finished = True
+                        break
+                    batch.append(item)
+                for outcome in await call("agents", run_agent_batch, batch):
+                    await put("write", outcome)
+                self._stats["agents"].done += len(batch)
+
+        async def write_worker():
+            stats = self._stats["write"]
+            while True:
+                item = await queues["write"].get()
+                if item is _DONE:
+                    return
+                # Not in an executor: sinks such as SQLiteSink may only be
+                # used from the thread that created them
+                stats.active += 1
+                start = time.perf_counter()
+                try:
+                    on_result(*item)
+                finally:
+                    stats.active -= 1
+                    stats.busy_seconds += time.perf_counter() - start
+                stats.done += 1
+
+        async def workers(name: str, worker):
+            await asyncio.gather(*(worker() for _ in range(self.concurrency[name])))
+
+        async def close(name: str):
+            for _ in range(self.concurrency[name]):
+                await put(name, _DONE)
+
+        async def scrape_stage():
+            await workers("scrape", scrape_worker)
+            await close("ocr")
+
+        async def upstream():
+            # Scraping and OCR both feed the agents stage
+            await asyncio.gather(scrape_stage(), workers("ocr", ocr_worker))
+            await close("agents")
+
+        async def agents_stage():
+            await workers("agents", agents_worker)
+            await close("write")
+
+        async def feed():
+            for index, file_path in enumerate(file_paths):
+                await put("scrape", (index, file_path))
+            await close("scrape")
+
+        async def report():
+            while True:
+                await asyncio.sleep(self.report_interval)
+                if self.logger:
+                    depths = ", ".join(
+                        f"{name} {stats['queued']} queued/{stats['active']} active"
+                        for name, stats in self.stats().items()
+                    )
+                    self.logger.info(f"Stage queues: {depths}")
+
+        reporter = None
+        if self.report_interval:
+            reporter = asyncio.ensure_future(report())
+        try:
+            await asyncio.gather(
+                feed(), upstream(), agents_stage(), workers("write", write_worker)
+            )
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+        if self.logger:
+            for name, stats in self.stats().items():
+                self.logger.info(
+                    f"Stage {name}: {stats['done']} done, busy "
+                    f"{stats['busy_seconds']}s, utilization {stats['utilization']}, "
+                    f"max queue {stats['max_queued']}"
+                )
+        return self.stats()
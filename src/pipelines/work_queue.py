@@ -0,0 +1,410 @@
+# src/pipelines/work_queue.py
+"""
+Durable work queue of a corpus, shared by any number of processes or nodes
+through one SQLite database.
+
+Workers claim files in leases, record per-file and per-agent completion and
+retry failed files up to a cap. A crashed worker's leases expire and its
+files are claimed again, so a rerun resumes where the last one stopped.
+
+Usage (progress and throughput of all workers):
+    python -m src.pipelines.work_queue queue.sqlite --window 300
+"""
+
+import argparse
+import os
+import socket
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from .runner import AGENT_OUTPUTS
+from ..utils.logging import Logger
+
+# File states
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "WAL")
+
+# Result key -> agent name, for per-agent completion
+_AGENT_BY_OUTPUT = {output: name for name, output in AGENT_OUTPUTS.items()}
+_AGENT_BY_OUTPUT["text"] = "text_agent"
+
+
+def worker_name() -> str:
+    """
+    Identifies this process across nodes, e.g. "node-3-41552".
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    The files of a corpus and their processing state in a SQLite database.
+
+    Files are keyed by their path relative to the input directory, so nodes
+    may mount the shared storage at different places. Every state change is
+    one transaction; a claim takes the database's write lock, so two workers
+    never lease the same file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = 600.0,
+        max_attempts: int = 3,
+        journal_mode: str = "DELETE",
+    ):
+        """
+        Parameters:
+        - path (str): Database file; created if missing, resumed otherwise.
+        - lease_seconds (float): How long a claimed file stays reserved
+          without renewal. Workers renew their leases while processing, so
+          this only bounds how long a crashed worker's files stay blocked.
+        - max_attempts (int): Attempts per file before it is marked failed.
+        - journal_mode (str): SQLite journal mode. "DELETE" works on network
+          file systems (NFS, SMB), so nodes can share the database. "WAL"
+          lets readers run alongside the writer but needs shared memory
+          between the processes: only use it when all workers run on the
+          host holding the database file, or the queue can get corrupted.
+          None keeps the database's current mode.
+        """
+        if journal_mode and journal_mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f"Unknown journal mode: {journal_mode}")
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Transactions are managed explicitly (BEGIN IMMEDIATE for writes)
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        if journal_mode:
+            self._connection.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_expires REAL,
+                error TEXT,
+                started REAL,
+                finished REAL
+            );
+            CREATE INDEX IF NOT EXISTS files_status ON files (status);
+            CREATE TABLE IF NOT EXISTS agent_runs (
+                path TEXT,
+                agent TEXT,
+                attempt INTEGER,
+                error TEXT,
+                PRIMARY KEY (path, agent)
+            );
+            """
+        )
+
+    def _transaction(self, statements):
+        """
+        Runs `statements(cursor)` in one write transaction and returns its
+        result.
+        """
+        cursor = self._connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements(cursor)
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+        return result
+
+    def add(self, paths: list) -> int:
+        """
+        Adds files not in the queue yet. Files already queued keep their
+        state, so every worker may call this with the whole corpus.
+
+        Returns:
+        int: Number of files added.
+        """
+
+        def insert(cursor):
+            before = cursor.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            cursor.executemany(
+                "INSERT OR IGNORE INTO files (path) VALUES (?)",
+                [(path,) for path in paths],
+            )
+            return cursor.execute("SELECT COUNT(*) FROM files").fetchone()[0] - before
+
+        return self._transaction(insert)
+
+    def claim(self, worker: str, count: int) -> list:
+        """
+        Leases up to `count` pending files, or files whose lease expired.
+        Files whose lease expired on their last attempt (e.g. they crashed
+        the worker every time) are marked failed instead.
+
+        Returns:
+        list: (queue index, path, attempt number) tuples.
+        """
+
+        def lease(cursor):
+            now = time.time()
+            cursor.execute(
+                "UPDATE files SET status = ?, finished = ?,"
+                " error = 'Lease expired on the last attempt'"
+                " WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, now, LEASED, now, self.max_attempts),
+            )
+            rows = cursor.execute(
+                "SELECT id, path, attempts FROM files"
+                " WHERE status = ? OR (status = ? AND lease_expires < ?)"
+                " ORDER BY id LIMIT ?",
+                (PENDING, LEASED, now, count),
+            ).fetchall()
+            cursor.executemany(
+                "UPDATE files SET status = ?, worker = ?, lease_expires = ?,"
+                " attempts = attempts + 1, started = ? WHERE id = ?",
+                [
+                    (LEASED, worker, now + self.lease_seconds, now, file_id)
+                    for file_id, _, _ in rows
+                ],
+            )
+            return [(file_id, path, attempts + 1) for file_id, path, attempts in rows]
+
+        return self._transaction(lease)
+
+    def renew(self, worker: str, ids: list):
+        """
+        Extends the leases `worker` holds on these files.
+        """
+        if not ids:
+            return
+        expires = time.time() + self.lease_seconds
+        self._transaction(
+            lambda cursor: cursor.executemany(
+                "UPDATE files SET lease_expires = ?"
+                " WHERE id = ? AND status = ? AND worker = ?",
+                [(expires, file_id, LEASED, worker) for file_id in ids],
+            )
+        )
+
+    def is_final(self, attempt: int, result: dict = None, error=None) -> bool:
+        """
+        Whether an outcome ends its file: a success, or a failure (of the
+        file or one of its agents) on the last attempt.
+        """
+        failed = error is not None or bool((result or {}).get("errors"))
+        return not failed or attempt >= self.max_attempts
+
+    def complete(self, worker: str, outcomes: list) -> list:
+        """
+        Records the outcomes of leased files in one transaction: final ones
+        (see `is_final`) are marked done or failed, the others go back to
+        pending for a retry. Outcomes of files whose lease `worker` lost in
+        the meantime are ignored.
+
+        Parameters:
+        - outcomes (list): (queue index, path, attempt, result, error) tuples.
+
+        Returns:
+        list: The queue indexes whose outcome was recorded.
+        """
+
+        def record(cursor):
+            now = time.time()
+            recorded = []
+            for file_id, path, attempt, result, error in outcomes:
+                result = result or {}
+                agent_errors = result.get("errors") or {}
+                if error is None and not agent_errors:
+                    status = DONE
+                elif self.is_final(attempt, result, error):
+                    status = FAILED if error is not None else DONE
+                else:
+                    status = PENDING
+                message = error if error is not None else None
+                if message is None and agent_errors:
+                    message = "; ".join(f"{k}: {v}" for k, v in agent_errors.items())
+                updated = cursor.execute(
+                    "UPDATE files SET status = ?, error = ?, finished = ?,"
+                    " lease_expires = NULL"
+                    " WHERE id = ? AND status = ? AND worker = ?",
+                    (
+                        status,
+                        message,
+                        now if status != PENDING else None,
+                        file_id,
+                        LEASED,
+                        worker,
+                    ),
+                ).rowcount
+                if not updated:
+                    continue
+                recorded.append(file_id)
+                completed = ["text"] if "text" in result else []
+                completed += list(result.get("agents") or {})
+                agents = [
+                    (path, _AGENT_BY_OUTPUT.get(key, key), attempt, None)
+                    for key in completed
+                ]
+                agents += [
+                    (path, name, attempt, str(message))
+                    for name, message in agent_errors.items()
+                ]
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO agent_runs (path, agent, attempt, error)"
+                    " VALUES (?, ?, ?, ?)",
+                    agents,
+                )
+            return recorded
+
+        return self._transaction(record)
+
+    def progress(self, window: float = 300.0) -> dict:
+        """
+        Progress of the whole queue: files by state, overall and per-worker
+        throughput over the last `window` seconds, estimated time left and
+        failures by agent.
+        """
+        now = time.time()
+        connection = self._connection
+        states = dict(
+            connection.execute("SELECT status, COUNT(*) FROM files GROUP BY status")
+        )
+        total = sum(states.values())
+        workers = {
+            worker: {"done": done, "recent": recent}
+            for worker, done, recent in connection.execute(
+                "SELECT worker, COUNT(*), SUM(finished >= ?) FROM files"
+                " WHERE status IN (?, ?) GROUP BY worker",
+                (now - window, DONE, FAILED),
+            )
+        }
+        for worker in workers.values():
+            worker["files_per_second"] = round(worker.pop("recent") / window, 3)
+        recent = sum(worker["files_per_second"] for worker in workers.values())
+        remaining = states.get(PENDING, 0) + states.get(LEASED, 0)
+        agent_failures = dict(
+            connection.execute(
+                "SELECT agent, COUNT(*) FROM agent_runs"
+                " WHERE error IS NOT NULL GROUP BY agent"
+            )
+        )
+        return {
+            "total": total,
+            "states": {
+                state: states.get(state, 0) for state in (PENDING, LEASED, DONE, FAILED)
+            },
+            "files_per_second": round(recent, 3),
+            "eta_seconds": round(remaining / recent) if recent else None,
+            "workers": workers,
+            "agent_failures": agent_failures,
+        }
+
+    def close(self):
+        self._connection.close()
+
+
+def process_queue(
+    queue: WorkQueue,
+    input_dir: str,
+    submit,
+    on_result,
+    batch_size: int = 8,
+    in_flight: int = 1,
+    flush=None,
+    worker: str = None,
+    logger: Logger = None,
+) -> int:
+    """
+    Claims batches of files from the queue until none are left, with up to
+    `in_flight` batches running at once, renewing their leases meanwhile.
+
+    Parameters:
+    - queue (WorkQueue): The shared queue.
+    - input_dir (str): Directory the queued paths are relative to.
+    - submit (callable): Starts a batch: list of file paths -> Future of one
+      (result, error) tuple per file, see `process_batch`.
+    - on_result (callable): Called as on_result(index, path, result, error)
+      for every final outcome.
+    - batch_size (int): Files per claimed batch.
+    - in_flight (int): Batches running at once (e.g. the worker processes).
+    - flush (callable): Called after the results of a batch were handed to
+      `on_result` and before they are recorded as done, so that buffered
+      results are durable first (e.g. `sink.flush`). A crash in between
+      only reprocesses the batch.
+    - worker (str): This worker's name (default: host and process id).
+    - logger (Logger): Optional logger.
+
+    Returns:
+    int: Number of file outcomes recorded by this worker.
+    """
+    worker = worker or worker_name()
+    running = {}  # Future -> claimed (index, path, attempt) tuples
+    recorded = 0
+    exhausted = False
+    while True:
+        while not exhausted and len(running) < in_flight:
+            claimed = queue.claim(worker, batch_size)
+            if not claimed:
+                exhausted = True
+                break
+            paths = [os.path.join(input_dir, path) for _, path, _ in claimed]
+            running[submit(paths)] = claimed
+        if not running:
+            return recorded
+
+        finished, _ = wait(
+            running, timeout=queue.lease_seconds / 3, return_when=FIRST_COMPLETED
+        )
+        queue.renew(
+            worker,
+            [file_id for claimed in running.values() for file_id, _, _ in claimed],
+        )
+        for future in finished:
+            claimed = running.pop(future)
+            try:
+                outcomes = future.result()
+            except Exception as e:  # e.g. a worker process died
+                outcomes = [(None, str(e))] * len(claimed)
+            records = [
+                (file_id, path, attempt, result, error)
+                for (file_id, path, attempt), (result, error) in zip(claimed, outcomes)
+            ]
+            for file_id, path, attempt, result, error in records:
+                if queue.is_final(attempt, result, error):
+                    on_result(file_id, path, result, error)
+                elif logger:
+                    logger.warning(f"Attempt {attempt} failed on {path}, will retry.")
+            if flush is not None:
+                flush()
+            recorded += len(queue.complete(worker, records))
+        exhausted = False  # Retried files may be pending again
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path", help="Queue database")
+    parser.add_argument("--window", type=float, default=300.0)
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.path, journal_mode=None)
+    progress = queue.progress(args.window)
+    queue.close()
+    states = progress["states"]
+    print(
+        f"{progress['total']} files: {states[DONE]} done, {states[FAILED]} failed, "
+        f"{states[LEASED]} in progress, {states[PENDING]} pending"
+    )
+    eta = progress["eta_seconds"]
+    print(
+        f"Throughput: {progress['files_per_second']} files/s over the last "
+        f"{args.window:.0f}s" + (f", about {eta / 3600:.1f}h left" if eta else "")
+    )
+    for worker, counts in sorted(progress["workers"].items()):
+        print(f"  {worker}: {counts['done']} files, {counts['files_per_second']}/s")
+    for agent, failures in sorted(progress["agent_failures"].items()):
+        print(f"  {agent} failed on {failures} files")
+
+
+if __name__ == "__main__":
+    main()
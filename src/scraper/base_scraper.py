@@ -1,8 +1,35 @@
 # src/scraper/base_scraper.py
 
 import abc
+import os
 from ..document import Document
 from ..ocr_engines.base_ocr import BaseOCREngine
+from ..utils.metrics import METRICS, instrument_methods
+
+
+def _record_scrape(args: tuple, result) -> dict:
+    """
+    Span attributes and per-file-type counters of a scraped file.
+    """
+    file_path = args[0]
+    file_type = os.path.splitext(file_path)[1].lower().lstrip(".")
+    if hasattr(result, "page_count"):
+        pages = result.page_count
+    else:  # A PDF still waiting for OCR (OCRJob)
+        pages = len(result.page_parts)
+    images = len(result.images) or len(result.image_paths)
+    size = os.path.getsize(file_path)
+    METRICS.increment("scraped_documents_total", file_type=file_type)
+    METRICS.increment("scraped_pages_total", pages, file_type=file_type)
+    METRICS.increment("scraped_images_total", images, file_type=file_type)
+    METRICS.increment("scraped_bytes_total", size, file_type=file_type)
+    return {
+        "file": os.path.basename(file_path),
+        "file_type": file_type,
+        "pages": pages,
+        "images": images,
+        "bytes": size,
+    }
 
 
 class BaseScraper(abc.ABC):
@@ -10,9 +37,50 @@ class BaseScraper(abc.ABC):
     Abstract base class for file scrapers.
     """
 
-    def __init__(self, ocr_engine: BaseOCREngine = None):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument_methods(
+            cls,
+            "scraper",
+            {
+                "scrape": _record_scrape,
+                "scrape_deferred": _record_scrape,
+                "scrape_pages": _record_scrape,
+            },
+        )
+
+    def __init__(self, ocr_engine: BaseOCREngine = None, preprocessor=None):
+        """
+        Parameters:
+        - ocr_engine (BaseOCREngine): Engine used to OCR images.
+        - preprocessor (ImagePreprocessor): Cleans images up before OCR, see
+          src/ocr_engines/preprocessing.py; None OCRs them as they are.
+        """
         self.ocr_engine = ocr_engine
+        self.preprocessor = preprocessor
+
+    def _ocr_input(self, image):
+        """
+        What to hand the OCR engine for an image: the image itself, or the
+        image with its preprocessing, run by the engine when it reads it.
+        """
+        if self.preprocessor is None:
+            return image
+        from ..ocr_engines.preprocessing import PreprocessedImage
+
+        return PreprocessedImage(image, self.preprocessor)
 
     @abc.abstractmethod
     def scrape(self, filepath: str) -> Document:
         pass
+
+    def cache_params(self) -> dict:
+        """
+        Settings that change this scraper's output. Used to key cached documents.
+        """
+        params = {"scraper": type(self).__name__}
+        if self.ocr_engine:
+            params["ocr"] = self.ocr_engine.cache_params()
+        if self.ocr_engine and self.preprocessor is not None:
+            params.update(self.preprocessor.cache_params())
+        return params
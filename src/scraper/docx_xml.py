@@ -0,0 +1,118 @@
+# src/scraper/docx_xml.py
+# Incremental reading of the WordprocessingML parts of a .docx package.
+
+import posixpath
+import xml.etree.ElementTree as ET
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+A_BLIP = "{http://schemas.openxmlformats.org/drawingml/2006/main}blip"
+V_IMAGEDATA = "{urn:schemas-microsoft-com:vml}imagedata"
+PKG_RELATIONSHIP = (
+    "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+)
+
+PARAGRAPH = W + "p"
+TABLE = W + "tbl"
+ROW = W + "tr"
+CELL = W + "tc"
+_BLOCKS = (PARAGRAPH, TABLE)
+
+
+def read_relationships(package, part_name: str) -> dict:
+    """
+    Returns the relationships of a part: id -> (type, target part name).
+    """
+    directory, file_name = posixpath.split(part_name)
+    rels_name = posixpath.join(directory, "_rels", file_name + ".rels")
+    try:
+        data = package.read(rels_name)
+    except KeyError:
+        return {}
+    relationships = {}
+    for rel in ET.fromstring(data).iter(PKG_RELATIONSHIP):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = posixpath.normpath(posixpath.join(directory, rel.get("Target")))
+        relationships[rel.get("Id")] = (rel.get("Type"), target.lstrip("/"))
+    return relationships
+
+
+def iter_blocks(stream):
+    """
+    Streams the top-level blocks of a document, header or footer part in
+    document order, without building the whole XML tree.
+
+    Yields:
+    ("paragraph", text, image_ids) or ("table", rows, image_ids), where rows
+    is a list of lists of cell texts and image_ids the relationship ids of
+    the images the block embeds.
+    """
+    stack = []
+    depth = 0  # Open paragraphs / tables
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(element)
+            if element.tag in _BLOCKS:
+                depth += 1
+            continue
+
+        stack.pop()
+        if element.tag not in _BLOCKS:
+            continue
+        depth -= 1
+        if depth:
+            continue  # Part of an enclosing block, handled with it
+
+        if element.tag == PARAGRAPH:
+            yield "paragraph", paragraph_text(element), image_ids(element)
+        else:
+            yield "table", table_rows(element), image_ids(element)
+        # Drop the finished block so memory stays bounded by one block
+        element.clear()
+        if stack:
+            stack[-1].remove(element)
+
+
+def paragraph_text(paragraph) -> str:
+    parts = []
+    for node in paragraph.iter():
+        if node.tag == W + "t":
+            parts.append(node.text or "")
+        elif node.tag == W + "tab":
+            parts.append("\t")
+        elif node.tag in (W + "br", W + "cr"):
+            parts.append("\n")
+    return "".join(parts)
+
+
+def table_rows(table) -> list:
+    """
+    Cell texts of a table, row by row. Nested tables are flattened into the
+    text of their cell.
+    """
+    return [
+        [
+            "\n".join(paragraph_text(p) for p in cell.iter(PARAGRAPH))
+            for cell in _find(row, CELL)
+        ]
+        for row in _find(table, ROW)
+    ]
+
+
+def _find(node, tag):
+    """
+    Descendants of `node` with `tag`, not looking inside matches or nested
+    tables (rows and cells may sit in wrappers such as content controls).
+    """
+    for child in node:
+        if child.tag == tag:
+            yield child
+        elif child.tag != TABLE:
+            yield from _find(child, tag)
+
+
+def image_ids(block) -> list:
+    ids = [blip.get(R + "embed") for blip in block.iter(A_BLIP)]
+    ids.extend(data.get(R + "id") for data in block.iter(V_IMAGEDATA))
+    return [rel_id for rel_id in ids if rel_id]
@@ -1,62 +1,456 @@
 # src/scraper/file_scrapers.py
-import openpyxl
+# Parser libraries (PyMuPDF, python-docx, openpyxl) are imported on first use
+# so importing the scrapers stays cheap.
 import os
-import fitz  # PyMuPDF
-import docx
-from io import BytesIO
+import tempfile
 from .base_scraper import BaseScraper
-from ..document import Document
+from ..document import Document, ImageData
+from ..ocr_engines.base_ocr import BaseOCREngine
+from .ocr_policy import OCRPolicy
+from .table_finder import PDFTableExtractor
+from . import docx_xml
+from ..utils.logging import Logger
+
+_logger = None
+
+
+def _log_error(message: str):
+    """
+    Logs a recoverable scraping error (the document is still returned).
+    The logger is created on first use, so importing stays side-effect free.
+    """
+    global _logger
+    if _logger is None:
+        _logger = Logger(name="ScraperLogger")
+    _logger.error(message)
+
+
+class OCRJob:
+    """
+    A parsed PDF whose images still await OCR, see `PDFScraper.scrape_deferred`.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.page_parts = []  # Per-page text pieces, None where OCR text goes
+        self.pending = []  # (image, page index, part index, content hash)
+        self.images = []
+        self.image_paths = []
+        self.stats = OCRPolicy.new_stats()
+        self.tables = None
+        self.spill_dir = None
+        self.cache_key = None  # Where the finished Document gets cached
+        self.first_page = 1
 
 
 class PDFScraper(BaseScraper):
+    def __init__(
+        self,
+        ocr_engine: BaseOCREngine = None,
+        spill_images: bool = False,
+        image_dir: str = None,
+        ocr_policy: OCRPolicy = None,
+        table_extractor: PDFTableExtractor = None,
+        preprocessor=None,
+    ):
+        """
+        Parameters:
+        - ocr_engine (BaseOCREngine): Engine used to OCR embedded images.
+        - spill_images (bool): Also write embedded images to disk as PNG files
+          (listed in `Document.image_paths`). Images are always kept in memory.
+        - image_dir (str): Parent directory of the spilled images; defaults to
+          the system temp directory. Each document gets its own unique
+          subdirectory, removed when the Document is closed or collected.
+        - ocr_policy (OCRPolicy): Decides which pages and images get OCRed;
+          without one every embedded image is OCRed.
+        - table_extractor (PDFTableExtractor): Also extract the tables while
+          the PDF is open (stored in `Document.tables`), so the table agent
+          doesn't parse the file again.
+        - preprocessor (ImagePreprocessor): Cleans images and rendered pages
+          up before OCR. Images kept in the Document stay unchanged.
+        """
+        super().__init__(ocr_engine=ocr_engine, preprocessor=preprocessor)
+        self.spill_images = spill_images
+        self.image_dir = image_dir
+        self.ocr_policy = ocr_policy
+        self.table_extractor = table_extractor
+
     def scrape(self, filepath: str) -> Document:
+        return self._scrape(filepath, defer_ocr=False)
+
+    def scrape_deferred(self, filepath: str) -> "OCRJob":
+        """
+        Parses the PDF but leaves the OCR to `complete_ocr`, so a staged
+        executor can run parsing and OCR as separate stages.
+        """
+        return self._scrape(filepath, defer_ocr=True)
+
+    def scrape_pages(self, filepath: str, first_page: int, last_page: int) -> Document:
+        """
+        Scrapes pages `first_page` to `last_page` (inclusive, starting at 1)
+        only, so the page ranges of a long PDF can be scraped in parallel and
+        merged with `Document.merge`. Page numbers of images and tables are
+        those of the whole file.
+        """
+        return self._scrape(filepath, defer_ocr=False, pages=(first_page, last_page))
+
+    @staticmethod
+    def page_count(filepath: str) -> int:
+        import fitz  # PyMuPDF
+
+        with fitz.open(filepath) as doc:
+            return doc.page_count
+
+    def _scrape(self, filepath: str, defer_ocr: bool, pages: tuple = None):
         import fitz  # PyMuPDF
 
         doc = fitz.open(filepath)
-        text = ""
-        image_paths = []
-        # Create a temporary directory specific to this document
-        temp_image_dir = os.path.join(
-            "temp_images", os.path.splitext(os.path.basename(filepath))[0]
+        job = OCRJob(filepath)
+        first_page, last_page = pages or (1, doc.page_count)
+        last_page = min(last_page, doc.page_count)
+        page_numbers = list(range(first_page, last_page + 1))
+        job.first_page = first_page
+        if self.spill_images:
+            if self.image_dir:
+                os.makedirs(self.image_dir, exist_ok=True)
+            # Unique per document, so inputs sharing a basename can't collide
+            prefix = os.path.splitext(os.path.basename(filepath))[0] + "_"
+            job.spill_dir = tempfile.mkdtemp(prefix=prefix, dir=self.image_dir)
+
+        # Per-page pieces, joined once at the end: repeated `+=` on the whole
+        # document text is quadratic on long PDFs
+        ocr_inputs = self._iter_ocr_inputs(
+            doc,
+            page_numbers,
+            job.page_parts,
+            job.pending,
+            job.images,
+            job.image_paths,
+            job.spill_dir,
+            job.stats,
+        )
+        if self.ocr_engine and not defer_ocr:
+            # Submit all images of the document at once; a parallel engine
+            # OCRs them while the remaining pages are still being parsed
+            ocr_texts = self._ocr_images(
+                len(page_numbers), job.page_parts, ocr_inputs, job.pending, job.stats
+            )
+            self._apply_ocr(job, ocr_texts)
+        else:
+            for _ in ocr_inputs:
+                pass
+
+        if self.table_extractor is not None:
+            try:
+                job.tables = self.table_extractor.extract(doc, filepath, page_numbers)
+            except Exception as e:
+                # Left to the table agent, which falls back to pdfplumber
+                _log_error(f"Error extracting tables from {filepath}: {e}")
+
+        doc.close()
+        if defer_ocr and self.ocr_engine and job.pending:
+            return job
+        return self._build_document(job)
+
+    def complete_ocr(self, job: "OCRJob") -> Document:
+        """
+        OCRs the images left pending by `scrape_deferred` and returns the
+        finished Document. Images whose text the OCR policy learned since
+        parsing (e.g. when parsing ran in another process, with its own
+        policy) are not OCRed again.
+        """
+        self._reuse_ocr_texts(job)
+        if job.pending:
+            images = [image for image, _, _, _ in job.pending]
+            ocr_texts = self._ocr_images(
+                None, job.page_parts, images, job.pending, job.stats
+            )
+            self._apply_ocr(job, ocr_texts)
+        return self._build_document(job)
+
+    def _reuse_ocr_texts(self, job: "OCRJob"):
+        pending = []
+        for entry in job.pending:
+            _, page_index, part_index, content_hash = entry
+            ocr_text = self.ocr_policy.lookup(content_hash) if content_hash else None
+            if ocr_text is None:
+                pending.append(entry)
+                continue
+            job.page_parts[page_index][part_index] = ocr_text
+            job.stats["ocr_images"] -= 1
+            job.stats["reused_text"] += 1
+        job.pending = pending
+
+    def _apply_ocr(self, job: "OCRJob", ocr_texts: list):
+        for (_, page_index, part_index, content_hash), ocr_text in zip(
+            job.pending, ocr_texts
+        ):
+            job.page_parts[page_index][part_index] = ocr_text
+            if content_hash:
+                self.ocr_policy.remember(content_hash, ocr_text)
+        job.pending = []
+
+    @staticmethod
+    def _build_document(job: "OCRJob") -> Document:
+        document = Document(
+            pages=["".join(parts) for parts in job.page_parts],
+            file_path=job.file_path,
+            image_paths=job.image_paths,
+            images=job.images,
+            ocr_stats=job.stats,
+            tables=job.tables,
+            first_page=job.first_page,
         )
-        os.makedirs(temp_image_dir, exist_ok=True)
-
-        for page_num, page in enumerate(doc, start=1):
-            text += page.get_text()
-            # If page contains images, save them
-            images = page.get_images(full=True)
-            for img_index, img in enumerate(images):
-                xref = img[0]
-                base_image_name = f"image_page{page_num}_{img_index}.png"
-                image_path = os.path.join(temp_image_dir, base_image_name)
-                pix = fitz.Pixmap(doc, xref)
+        if job.spill_dir:
+            document.attach_spill_dir(job.spill_dir)
+        return document
 
-                try:
-                    # Only log important actions
-                    if pix.n - pix.alpha < 4:  # this is GRAY or RGB
-                        pix.save(image_path)
-                    else:  # CMYK or unsupported, convert to RGB
-                        pix = fitz.Pixmap(fitz.csRGB, pix)
-                        pix.save(image_path)
+    def _iter_ocr_inputs(
+        self,
+        doc,
+        page_numbers,
+        page_parts,
+        pending,
+        images,
+        image_paths,
+        spill_dir,
+        stats,
+    ):
+        """
+        Walks the given pages (numbers starting at 1), appending each page's
+        native text to `page_parts` and collecting the embedded images into
+        `images`. Yields the images to OCR (as chosen by the OCR policy) and
+        records their place in `pending`.
+        """
+        import fitz  # PyMuPDF
+
+        policy = self.ocr_policy
+        dedupe = policy is not None and policy.dedupe
+        seen_xrefs = set()
+        seen_hashes = set()
 
-                    image_paths.append(image_path)
+        for page_num in page_numbers:
+            page = doc[page_num - 1]
+            parts = [page.get_text()]
+            page_parts.append(parts)
+            page_index = len(page_parts) - 1
+            ocr_page = self.ocr_engine is not None and (
+                policy is None or not policy.has_text_layer(parts[0])
+            )
+            render_page = (
+                ocr_page and policy is not None and policy.is_scanned_page(page)
+            )
 
-                    # Perform OCR on the image if needed
-                    if self.ocr_engine:
-                        ocr_text = self.ocr_engine.perform_ocr(image_path)
-                        text += ocr_text
+            if render_page:
+                # A scan: OCR the whole page once rather than its fragments
+                pix = page.get_pixmap(dpi=policy.render_dpi)
+                image = ImageData.from_pixmap(pix, page=page_num)
+                stats["rendered_pages"] += 1
+                parts.append(None)
+                pending.append((image, page_index, len(parts) - 1, None))
+                yield image
+
+            # If page contains images, keep their pixel buffers in memory
+            for img_index, img in enumerate(page.get_images(full=True)):
+                xref, width, height = img[0], img[2], img[3]
+                stats["images"] += 1
+                if dedupe and xref in seen_xrefs:
+                    stats["skipped_duplicate"] += 1
+                    continue
+                seen_xrefs.add(xref)
+                if policy is not None and policy.is_too_small(width, height):
+                    stats["skipped_small"] += 1
+                    continue
+
+                try:
+                    pix = fitz.Pixmap(doc, xref)
+                    if pix.n - pix.alpha >= 4:  # CMYK or unsupported, convert to RGB
+                        pix = fitz.Pixmap(fitz.csRGB, pix)
+                    image = ImageData.from_pixmap(pix, page=page_num, index=img_index)
 
+                    if spill_dir:
+                        image.path = os.path.join(spill_dir, image.name + ".png")
+                        pix.save(image.path)
+                        image_paths.append(image.path)
                 except Exception as e:
-                    print(
-                        f"[ERROR] Error processing image {img_index} on page {page_num}: {e}"
+                    _log_error(
+                        f"Error processing image {img_index} on page {page_num}: {e}"
                     )
+                    stats["errors"] += 1
+                    continue
 
-        doc.close()
-        return Document(text, file_path=filepath, image_paths=image_paths)
+                images.append(image)
+                if render_page:
+                    continue
+                if not ocr_page:
+                    if self.ocr_engine is not None:
+                        stats["skipped_text_layer"] += 1
+                    continue
+
+                content_hash = None
+                if dedupe:
+                    content_hash = policy.content_hash(image)
+                    if content_hash in seen_hashes:
+                        stats["skipped_duplicate"] += 1
+                        continue
+                    seen_hashes.add(content_hash)
+                    ocr_text = policy.lookup(content_hash)
+                    if ocr_text is not None:
+                        stats["reused_text"] += 1
+                        parts.append(ocr_text)
+                        continue
+
+                stats["ocr_images"] += 1
+                parts.append(None)
+                pending.append((image, page_index, len(parts) - 1, content_hash))
+                yield image
+
+    def _ocr_images(self, page_count, page_parts, ocr_inputs, pending, stats) -> list:
+        """
+        OCRs all images in one batch. If the batch fails, falls back to one
+        image at a time so a single bad image only loses its own text.
+        `page_count` is the number of pages being parsed, to tell parsing
+        failures apart (None once parsing is done).
+        """
+        try:
+            return self.ocr_engine.perform_ocr_batch(map(self._ocr_input, ocr_inputs))
+        except Exception:
+            for _ in ocr_inputs:  # Finish parsing the remaining pages
+                pass
+            if page_count is not None and len(page_parts) < page_count:
+                raise  # Parsing itself failed, not OCR
+
+        ocr_texts = []
+        for image, _, _, _ in pending:
+            try:
+                ocr_texts.append(self.ocr_engine.perform_ocr(self._ocr_input(image)))
+            except Exception as e:
+                _log_error(
+                    f"Error processing image {image.index} on page {image.page}: {e}"
+                )
+                stats["errors"] += 1
+                ocr_texts.append("")
+        return ocr_texts
+
+    def cache_params(self) -> dict:
+        params = super().cache_params()
+        if self.ocr_policy is not None:
+            params["ocr_policy"] = self.ocr_policy.cache_params()
+        if self.table_extractor is not None:
+            params["tables"] = self.table_extractor.cache_params()
+        return params
 
 
 class DocxScraper(BaseScraper):
+    """
+    Reads .docx files by stream-parsing their XML parts, without building the
+    python-docx object model.
+
+    Paragraphs and tables are emitted in document order, headers first and
+    footers last; tables are also kept in `Document.tables` and their rows in
+    `Document.rows`, and embedded images in `Document.images`. Memory is
+    bounded by the largest paragraph or table rather than the document.
+    """
+
+    def __init__(self, headers_footers: bool = True, images: bool = True):
+        """
+        Parameters:
+        - headers_footers (bool): Include the text of headers and footers.
+        - images (bool): Decode embedded images into `Document.images`.
+        """
+        super().__init__()
+        self.headers_footers = headers_footers
+        self.images = images
+
+    def scrape(self, filepath: str) -> Document:
+        import zipfile
+
+        with zipfile.ZipFile(filepath) as package:
+            relationships = docx_xml.read_relationships(
+                package, "word/document.xml"
+            )
+            headers, footers = [], []
+            if self.headers_footers:
+                for rel_type, target in relationships.values():
+                    if rel_type.endswith("/header"):
+                        headers.append(target)
+                    elif rel_type.endswith("/footer"):
+                        footers.append(target)
+
+            lines = []
+            tables = []
+            images = []
+            seen_images = set()
+            for part_name in [*headers, "word/document.xml", *footers]:
+                if part_name not in package.NameToInfo:
+                    continue
+                if part_name != "word/document.xml":
+                    part_relationships = docx_xml.read_relationships(
+                        package, part_name
+                    )
+                else:
+                    part_relationships = relationships
+                with package.open(part_name) as stream:
+                    for kind, content, image_ids in docx_xml.iter_blocks(stream):
+                        if kind == "paragraph":
+                            lines.append(content)
+                        else:
+                            tables.append(
+                                {
+                                    "page": 1,
+                                    "table_number": len(tables) + 1,
+                                    "data": content,
+                                }
+                            )
+                            lines.extend("\t".join(row) for row in content)
+                        if self.images:
+                            self._read_images(
+                                package,
+                                part_relationships,
+                                image_ids,
+                                images,
+                                seen_images,
+                            )
+
+        rows = [tuple(row) for table in tables for row in table["data"]]
+        return Document(
+            "\n".join(lines),
+            file_path=filepath,
+            rows=rows,
+            images=images,
+            tables=tables,
+        )
+
+    def _read_images(self, package, relationships, image_ids, images, seen):
+        for rel_id in image_ids:
+            target = relationships.get(rel_id, (None, None))[1]
+            if target is None or target in seen:
+                continue
+            seen.add(target)
+            try:
+                image = ImageData.from_encoded(
+                    package.read(target), page=1, index=len(images)
+                )
+            except Exception as e:  # e.g. EMF/WMF drawings PIL can't decode
+                _log_error(f"Error processing image {target}: {e}")
+                continue
+            images.append(image)
+
+    def cache_params(self) -> dict:
+        params = super().cache_params()
+        params.update(headers_footers=self.headers_footers, images=self.images)
+        return params
+
+
+class PythonDocxScraper(BaseScraper):
+    """
+    The previous .docx scraper, on top of python-docx: body paragraphs only.
+    Kept for comparison, see benchmarks/docx_scrapers.py.
+    """
+
     def scrape(self, filepath: str) -> Document:
+        import docx
+
         doc = docx.Document(filepath)
         full_text = []
         for para in doc.paragraphs:
@@ -67,7 +461,7 @@ class DocxScraper(BaseScraper):
 class ImageScraper(BaseScraper):
     def scrape(self, filepath: str) -> Document:
         if self.ocr_engine:
-            text = self.ocr_engine.perform_ocr(filepath)
+            text = self.ocr_engine.perform_ocr(self._ocr_input(filepath))
             image_paths = [filepath]
             return Document(text, file_path=filepath, image_paths=image_paths)
         else:
@@ -75,20 +469,96 @@ class ImageScraper(BaseScraper):
 
 
 class ExcelScraper(BaseScraper):
+    """
+    Streams workbooks in openpyxl's read-only mode, one sheet after another.
+
+    Each sheet becomes one page of text and one pandas DataFrame in
+    `Document.sheets`. Values go straight into per-column lists, so rows are
+    never kept as tuples; `Document.rows` rebuilds them on demand.
+    """
+
+    def __init__(
+        self,
+        header_row: int = 3,
+        sheets: list = None,
+        require_first_cell: bool = True,
+    ):
+        """
+        Parameters:
+        - header_row (int): Row holding the column names (1-based); data
+          starts on the next row. 0 means no header: columns are numbered and
+          data starts on row 1.
+        - sheets (list): Names of the sheets to read (default: all).
+        - require_first_cell (bool): Skip rows whose first cell is empty.
+        """
+        super().__init__()
+        self.header_row = header_row
+        self.sheets = sheets
+        self.require_first_cell = require_first_cell
+
     def scrape(self, filepath: str) -> Document:
-        workbook = openpyxl.load_workbook(filepath, data_only=True)
-        sheet = workbook.active
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            pages = []
+            sheets = {}
+            for sheet in workbook.worksheets:
+                if self.sheets is not None and sheet.title not in self.sheets:
+                    continue
+                page, sheets[sheet.title] = self._read_sheet(sheet)
+                pages.append(page)
+        finally:
+            workbook.close()  # Read-only workbooks keep the file open
+
+        return Document(pages=pages, file_path=filepath, sheets=sheets)
 
-        # Initialize text to store extracted data
-        text = ""
+    def _read_sheet(self, sheet):
+        import pandas as pd
 
-        # Store data in rows for easy retrieval and CSV export
-        rows = []
+        rows = sheet.iter_rows(min_row=max(self.header_row, 1), values_only=True)
+        header = list(next(rows, None) or ()) if self.header_row else []
+        columns = [[] for _ in header]
+        lines = []
+        row_count = 0
+        for row in rows:
+            if self.require_first_cell and not (row and row[0]):
+                continue
+            if len(row) > len(columns):  # Wider than the header: pad new columns
+                new_columns = len(row) - len(columns)
+                columns.extend([None] * row_count for _ in range(new_columns))
+            for column, value in zip(columns, row):
+                column.append(value)
+            for column in columns[len(row) :]:
+                column.append(None)
+            row_count += 1
+            lines.append(" ".join([str(cell) for cell in row if cell]) + "\n")
+
+        names = _column_names(header, len(columns))
+        frame = pd.DataFrame(dict(zip(names, columns)), columns=names)
+        return "".join(lines), frame
+
+    def cache_params(self) -> dict:
+        params = super().cache_params()
+        params.update(
+            header_row=self.header_row,
+            sheets=self.sheets,
+            require_first_cell=self.require_first_cell,
+        )
+        return params
 
-        # Assume the data starts at row 4 (based on your example)
-        for row in sheet.iter_rows(min_row=4, values_only=True):
-            if row[0]:  # Assuming row[0] contains "Topic" or relevant data
-                text += " ".join([str(cell) for cell in row if cell]) + "\n"
-                rows.append(row)
 
-        return Document(text, file_path=filepath, rows=rows)
+def _column_names(header: list, width: int) -> list:
+    """
+    Unique string column names: header cells, falling back to the position.
+    """
+    names = []
+    seen = set()
+    for position in range(width):
+        value = header[position] if position < len(header) else None
+        name = str(value) if value not in (None, "") else f"column_{position + 1}"
+        while name in seen:
+            name += "_"
+        seen.add(name)
+        names.append(name)
+    return names
@@ -0,0 +1,118 @@
+# src/scraper/ocr_policy.py
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class OCRPolicy:
+    """
+    Decides which parts of a PDF are worth OCRing.
+
+    - Pages whose native text layer has at least `min_page_chars` characters
+      are not OCRed at all.
+    - Images smaller than `min_image_size` pixels on either side are skipped.
+    - An image (xref) repeated within a document is OCRed once, and images with
+      identical pixels reuse the OCR text of an earlier occurrence, also
+      across documents.
+    - Pages that are scans (sparse text layer, images covering most of the
+      page) are rendered whole at `render_dpi` and OCRed as one image.
+    """
+
+    def __init__(
+        self,
+        min_page_chars: int = 50,
+        min_image_size: int = 32,
+        render_scanned_pages: bool = True,
+        render_dpi: int = 300,
+        scanned_coverage: float = 0.8,
+        dedupe: bool = True,
+        max_cached_texts: int = 10000,
+    ):
+        """
+        Parameters:
+        - min_page_chars (int): Native text length from which a page counts as
+          having a text layer and is not OCRed.
+        - min_image_size (int): Images narrower or shorter than this (pixels)
+          are skipped.
+        - render_scanned_pages (bool): OCR scanned pages as one rendered image
+          instead of their image fragments.
+        - render_dpi (int): Resolution of rendered scanned pages.
+        - scanned_coverage (float): Fraction of the page area that images must
+          cover for a text-less page to count as scanned.
+        - dedupe (bool): Skip repeated images and reuse OCR text of identical
+          images.
+        - max_cached_texts (int): OCR texts remembered for reuse across documents.
+        """
+        self.min_page_chars = min_page_chars
+        self.min_image_size = min_image_size
+        self.render_scanned_pages = render_scanned_pages
+        self.render_dpi = render_dpi
+        self.scanned_coverage = scanned_coverage
+        self.dedupe = dedupe
+        self.max_cached_texts = max_cached_texts
+        self._texts = OrderedDict()  # content hash -> OCR text, LRU order
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_stats() -> dict:
+        return {
+            "images": 0,
+            "ocr_images": 0,
+            "rendered_pages": 0,
+            "skipped_text_layer": 0,
+            "skipped_small": 0,
+            "skipped_duplicate": 0,
+            "reused_text": 0,
+            "errors": 0,
+        }
+
+    def has_text_layer(self, native_text: str) -> bool:
+        return len(native_text.strip()) >= self.min_page_chars
+
+    def is_too_small(self, width: int, height: int) -> bool:
+        return width < self.min_image_size or height < self.min_image_size
+
+    def is_scanned_page(self, page) -> bool:
+        """
+        Returns whether images cover most of a (PyMuPDF) page.
+        """
+        if not self.render_scanned_pages:
+            return False
+        page_area = abs(page.rect)
+        if not page_area:
+            return False
+        covered = sum(
+            abs(page.rect & info["bbox"]) for info in page.get_image_info()
+        )
+        return covered / page_area >= self.scanned_coverage
+
+    @staticmethod
+    def content_hash(image) -> str:
+        digest = hashlib.blake2b(image.samples, digest_size=16)
+        digest.update(f"{image.width}x{image.height}{image.mode}".encode())
+        return digest.hexdigest()
+
+    def lookup(self, content_hash: str):
+        with self._lock:
+            text = self._texts.get(content_hash)
+            if text is not None:
+                self._texts.move_to_end(content_hash)
+            return text
+
+    def remember(self, content_hash: str, text: str):
+        with self._lock:
+            self._texts[content_hash] = text
+            self._texts.move_to_end(content_hash)
+            while len(self._texts) > self.max_cached_texts:
+                self._texts.popitem(last=False)
+
+    def cache_params(self) -> dict:
+        return {
+            "min_page_chars": self.min_page_chars,
+            "min_image_size": self.min_image_size,
+            "render_scanned_pages": self.render_scanned_pages,
+            "render_dpi": self.render_dpi,
+            "scanned_coverage": self.scanned_coverage,
+            "dedupe": self.dedupe,
+        }
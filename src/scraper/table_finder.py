@@ -0,0 +1,178 @@
+# src/scraper/table_finder.py
+# Table extraction with PyMuPDF's table finder, on a document that is already
+# open (e.g. while PDFScraper parses it) instead of re-parsing the file.
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
+from ..utils.metrics import METRICS
+
+
+def has_ruling_lines(page, min_lines: int = 2, min_length: float = 10.0) -> bool:
+    """
+    Cheap check whether a page may hold a ruled table: at least `min_lines`
+    horizontal and `min_lines` vertical line segments (rectangle edges
+    included). Only reads the page's vector drawings, no layout analysis.
+    """
+    horizontal = vertical = 0
+    for drawing in page.get_drawings():
+        for item in drawing["items"]:
+            if item[0] == "l":
+                start, end = item[1], item[2]
+                if abs(start.y - end.y) < 1 and abs(start.x - end.x) >= min_length:
+                    horizontal += 1
+                elif abs(start.x - end.x) < 1 and abs(start.y - end.y) >= min_length:
+                    vertical += 1
+            elif item[0] == "re":
+                rect = item[1]
+                # Thin rectangles are drawn rules, others are cell borders
+                if rect.height < 2:
+                    horizontal += rect.width >= min_length
+                elif rect.width < 2:
+                    vertical += rect.height >= min_length
+                else:
+                    horizontal += 2
+                    vertical += 2
+            if horizontal >= min_lines and vertical >= min_lines:
+                return True
+    return False
+
+
+def extract_page_tables(page, page_number: int) -> list:
+    """
+    Returns the tables of one page as {page, table_number, data} dicts.
+    """
+    return [
+        {"page": page_number, "table_number": table_number, "data": table.extract()}
+        for table_number, table in enumerate(page.find_tables().tables, start=1)
+    ]
+
+
+def _extract_file_pages(file_path: str, page_numbers: list) -> list:
+    """
+    Process pool task: opens the PDF and extracts the tables of some pages.
+    """
+    import fitz  # PyMuPDF
+
+    tables = []
+    with fitz.open(file_path) as doc:
+        for page_number in page_numbers:
+            tables.extend(extract_page_tables(doc[page_number - 1], page_number))
+    return tables
+
+
+class PDFTableExtractor:
+    """
+    Finds the tables of a PDF with PyMuPDF.
+
+    Pages without ruling lines are skipped before the (costly) table
+    analysis. When many pages qualify and `workers` > 1, they are analysed in
+    parallel by a process pool, as PyMuPDF documents can't be shared between
+    threads; each worker opens the file itself and handles a chunk of pages.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        check_ruling_lines: bool = True,
+        min_parallel_pages: int = 8,
+    ):
+        """
+        Parameters:
+        - workers (int): Processes analysing pages in parallel (1: in-process).
+        - check_ruling_lines (bool): Only analyse pages with ruling lines.
+          Disable to also look for borderless tables everywhere.
+        - min_parallel_pages (int): Candidate pages from which a document is
+          split across the workers.
+        """
+        self.workers = workers
+        self.check_ruling_lines = check_ruling_lines
+        self.min_parallel_pages = min_parallel_pages
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def candidate_pages(self, doc, page_numbers: list = None) -> list:
+        """
+        Page numbers (starting at 1) worth a full table analysis, among
+        `page_numbers` (default: all pages).
+        """
+        if page_numbers is None:
+            page_numbers = range(1, doc.page_count + 1)
+        return [
+            page_number
+            for page_number in page_numbers
+            if not self.check_ruling_lines or has_ruling_lines(doc[page_number - 1])
+        ]
+
+    def extract(self, doc, file_path: str = None, page_numbers: list = None) -> list:
+        """
+        Extracts the tables of an open PyMuPDF document.
+
+        Parameters:
+        - doc (fitz.Document): The open document.
+        - file_path (str): Its path, needed to analyse pages in parallel.
+        - page_numbers (list): Pages to look at (default: all pages).
+
+        Returns:
+        list: {page, table_number, data} dicts in page order.
+        """
+        with METRICS.span("tables_pymupdf") as span:
+            page_numbers = self.candidate_pages(doc, page_numbers)
+            span["pages"] = len(page_numbers)
+            tables = self._extract_pages(doc, file_path, page_numbers)
+            span["tables"] = len(tables)
+            return tables
+
+    def _extract_pages(self, doc, file_path: str, page_numbers: list) -> list:
+        if (
+            self.workers > 1
+            and file_path
+            and len(page_numbers) >= self.min_parallel_pages
+        ):
+            chunk_size = -(-len(page_numbers) // self.workers)
+            chunks = [
+                page_numbers[i : i + chunk_size]
+                for i in range(0, len(page_numbers), chunk_size)
+            ]
+            executor = self._get_executor()
+            tables = []
+            for chunk_tables in executor.map(
+                _extract_file_pages, [file_path] * len(chunks), chunks
+            ):
+                tables.extend(chunk_tables)
+            return tables
+
+        tables = []
+        for page_number in page_numbers:
+            tables.extend(extract_page_tables(doc[page_number - 1], page_number))
+        return tables
+
+    def extract_file(self, file_path: str, page_numbers: list = None) -> list:
+        """
+        Opens a PDF and extracts its tables, see `extract`.
+        """
+        import fitz  # PyMuPDF
+
+        with fitz.open(file_path) as doc:
+            return self.extract(doc, file_path, page_numbers)
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def cache_params(self) -> dict:
+        return {
+            "table_extractor": type(self).__name__,
+            "check_ruling_lines": self.check_ruling_lines,
+        }
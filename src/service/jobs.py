@@ -0,0 +1,365 @@
+# src/service/jobs.py
+
+import collections
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from ..pipelines.runner import (
+    _worker_state,
+    build_agents,
+    build_pipeline,
+    init_worker,
+    new_result,
+    run_agents,
+)
+from ..utils.logging import Logger
+from ..utils.misc import current_rss_bytes
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".png", ".jpg", ".jpeg", ".xlsx")
+
+# Job states
+QUEUED, RUNNING, DONE, CANCELLED = "queued", "running", "done", "cancelled"
+
+
+def _scrape_file(pipeline, file_path: str) -> tuple:
+    try:
+        return pipeline.process(file_path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _scrape_in_worker(file_path: str) -> tuple:
+    """
+    Process pool task: scrapes a file with the worker's own pipeline.
+    """
+    return _scrape_file(_worker_state["pipeline"], file_path)
+
+
+class AdmissionError(Exception):
+    """
+    A job was refused because the service is at capacity. Retry later.
+    """
+
+
+class Job:
+    """
+    Files submitted together, with their results as they complete.
+    """
+
+    def __init__(self, file_paths: list):
+        self.id = uuid.uuid4().hex
+        self.file_paths = file_paths
+        self.pending = collections.deque(range(len(file_paths)))
+        self.results = {}  # index -> (result, error)
+        self.status = QUEUED
+        self.created = time.time()
+        self.finished = None
+
+    def summary(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "files": len(self.file_paths),
+            "done": len(self.results),
+            "errors": sum(error is not None for _, error in self.results.values()),
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+    def outputs(self) -> list:
+        """
+        The completed files in input order, as {file, result, error} dicts.
+        """
+        return [
+            {"file": self.file_paths[index], "result": result, "error": error}
+            for index, (result, error) in sorted(self.results.items())
+        ]
+
+
+class JobManager:
+    """
+    Runs the files of submitted jobs on one warm pipeline and one set of
+    agents. Models are loaded once, when the manager starts, and reused by
+    every job.
+
+    A single dispatcher thread builds batches of up to `batch_size` files,
+    taking files from all active jobs in turn. Concurrent jobs therefore
+    share each batched inference call, and a small job is not stuck behind a
+    large one. The files of a batch are scraped one at a time, or in
+    `scrape_workers` worker processes: PyMuPDF is not thread-safe, so files
+    are never parsed by parallel threads.
+
+    New jobs are refused (AdmissionError) while the queued files would exceed
+    `max_queued_files` or the process uses more than `max_rss_bytes`.
+    """
+
+    def __init__(
+        self,
+        options: dict,
+        logger: Logger = None,
+        batch_size: int = 8,
+        batch_wait: float = 0.05,
+        scrape_workers: int = 1,
+        max_queued_files: int = 1000,
+        max_rss_bytes: int = None,
+        max_finished_jobs: int = 100,
+        warm: bool = True,
+    ):
+        """
+        Parameters:
+        - options (dict): The `use_*` flags and agent settings of
+          `process_documents`, fixed for the lifetime of the service.
+        - logger (Logger): Logger for the service and the agents.
+        - batch_size (int): Files per batch handed to the agents.
+        - batch_wait (float): Seconds to wait for more files once a batch has
+          been started, so jobs submitted together are batched together.
+        - scrape_workers (int): Files of a batch scraped in parallel; above 1
+          they are scraped in worker processes, each building its own
+          pipeline from `options`.
+        - max_queued_files (int): Files waiting or running above which new
+          jobs are refused.
+        - max_rss_bytes (int): Resident memory above which new jobs are
+          refused (None: no limit).
+        - max_finished_jobs (int): Finished jobs kept for their results; the
+          oldest are forgotten beyond it.
+        - warm (bool): Load all enabled agents at start instead of on first use.
+        """
+        self.options = dict(options, export_sheets=None)  # Results must be JSON
+        self.logger = logger
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_queued_files = max_queued_files
+        self.max_rss_bytes = max_rss_bytes
+        self.max_finished_jobs = max_finished_jobs
+
+        self.pipeline = build_pipeline(self.options)
+        self.agents = build_agents(self.options, logger=logger)
+        if warm:
+            for name in self.agents:
+                self.agents[name]
+
+        self._jobs = collections.OrderedDict()  # job id -> Job, oldest first
+        self._active = collections.deque()  # Jobs with pending files, in turn
+        self._queued_files = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        if scrape_workers > 1:
+            self._scrape_executor = ProcessPoolExecutor(
+                max_workers=scrape_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(self.options,),
+            )
+        else:
+            self._scrape_executor = ThreadPoolExecutor(max_workers=1)
+        self._scrape_in_processes = scrape_workers > 1
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="job-dispatcher", daemon=True
+        )
+        self._dispatcher.start()
+
+    def submit(self, path) -> Job:
+        """
+        Queues a job for a file, a directory (its supported files) or a list
+        of files.
+
+        Raises:
+        - ValueError: No supported file was found.
+        - AdmissionError: The service is at capacity.
+        """
+        file_paths = _collect_files(path)
+        if not file_paths:
+            raise ValueError(f"No supported files found in {path}.")
+        with self._condition:
+            if self._closed:
+                raise AdmissionError("The service is shutting down.")
+            if self._queued_files + len(file_paths) > self.max_queued_files:
+                raise AdmissionError(
+                    f"Queue full: {self._queued_files} files queued, "
+                    f"limit {self.max_queued_files}."
+                )
+            if self.max_rss_bytes and current_rss_bytes() > self.max_rss_bytes:
+                raise AdmissionError("Memory limit reached.")
+            job = Job(file_paths)
+            self._jobs[job.id] = job
+            self._active.append(job)
+            self._queued_files += len(file_paths)
+            self._forget_finished()
+            self._condition.notify()
+        if self.logger:
+            self.logger.info(f"Job {job.id} queued with {len(file_paths)} files.")
+        return job
+
+    def summary(self, job_id: str) -> dict:
+        """
+        Status and progress of a job, None if unknown.
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return job.summary() if job is not None else None
+
+    def outputs(self, job_id: str) -> dict:
+        """
+        Status and the results completed so far of a job, None if unknown.
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return dict(job.summary(), results=job.outputs())
+
+    def cancel(self, job_id: str) -> dict:
+        """
+        Drops the files of a job that have not started yet. Returns its
+        summary, None if unknown.
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in (QUEUED, RUNNING):
+                self._queued_files -= len(job.pending)
+                job.pending.clear()
+                job.status = CANCELLED
+                job.finished = time.time()
+            return job.summary()
+
+    def status(self) -> dict:
+        with self._condition:
+            jobs = collections.Counter(job.status for job in self._jobs.values())
+            return {
+                "queued_files": self._queued_files,
+                "max_queued_files": self.max_queued_files,
+                "jobs": dict(jobs),
+                "rss_bytes": current_rss_bytes(),
+                "max_rss_bytes": self.max_rss_bytes,
+                "agents": self.agents.loaded(),
+            }
+
+    def close(self):
+        """
+        Refuses new jobs, lets the dispatcher finish its current batch and
+        stops it, then closes the agents and the pipeline.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._scrape_executor.shutdown(wait=True)
+        self.agents.close()
+        self.pipeline.close()
+
+    def _forget_finished(self):
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in (DONE, CANCELLED)
+        ]
+        for job_id in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def _next_batch(self) -> list:
+        """
+        Waits for pending files and takes up to `batch_size` of them, one file
+        from each active job in turn. Returns [] if the jobs waiting were all
+        cancelled meanwhile, None once closed.
+        """
+        with self._condition:
+            while not self._closed and not self._active:
+                self._condition.wait()
+            if self._closed:
+                return None
+            deadline = time.monotonic() + self.batch_wait
+            while self._queued_files < self.batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = []
+            while self._active and len(batch) < self.batch_size:
+                job = self._active.popleft()
+                if not job.pending:  # Cancelled
+                    continue
+                batch.append((job, job.pending.popleft()))
+                job.status = RUNNING
+                if job.pending:
+                    self._active.append(job)
+            return batch
+
+    def _dispatch(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if not batch:  # Only cancelled jobs: wait for the next one
+                continue
+            try:
+                outcomes = self._process(batch)
+            except Exception as e:  # Keep serving
+                outcomes = [(None, str(e))] * len(batch)
+            with self._condition:
+                for (job, index), outcome in zip(batch, outcomes):
+                    self._queued_files -= 1
+                    job.results[index] = outcome
+                    if job.status == RUNNING and len(job.results) == len(
+                        job.file_paths
+                    ):
+                        job.status = DONE
+                        job.finished = time.time()
+                        if self.logger:
+                            self.logger.info(f"Job {job.id} done.")
+
+    def _process(self, batch: list) -> list:
+        """
+        Scrapes the files of a batch and runs every agent once on all of
+        them, see `process_batch`.
+        """
+        file_paths = [job.file_paths[index] for job, index in batch]
+        if self._scrape_in_processes:
+            documents = self._scrape_executor.map(_scrape_in_worker, file_paths)
+        else:
+            documents = self._scrape_executor.map(self._scrape, file_paths)
+        outcomes = []
+        items = []
+        for file_path, (document, error) in zip(file_paths, documents):
+            if error is not None:
+                outcomes.append((None, error))
+                continue
+            try:
+                result = new_result(
+                    self.pipeline, self.agents, document, self.options, self.logger
+                )
+            except Exception as e:
+                document.close()
+                outcomes.append((None, str(e)))
+                continue
+            items.append((file_path, document, result))
+            outcomes.append((result, None))
+        run_agents(self.pipeline, self.agents, items, self.options, self.logger)
+        return outcomes
+
+    def _scrape(self, file_path: str) -> tuple:
+        return _scrape_file(self.pipeline, file_path)
+
+
+def _collect_files(path) -> list:
+    """
+    The supported files of a path, a directory or a list of paths.
+    """
+    if isinstance(path, (list, tuple)):
+        return list(itertools.chain.from_iterable(_collect_files(p) for p in path))
+    path = os.path.abspath(path)
+    if os.path.isdir(path):
+        return [
+            os.path.join(path, file_name)
+            for file_name in sorted(os.listdir(path))
+            if file_name.lower().endswith(SUPPORTED_EXTENSIONS)
+        ]
+    if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS):
+        return [path]
+    return []
@@ -0,0 +1,220 @@
+# src/service/server.py
+"""
+Long-running document processing service: keeps the pipeline and the models
+loaded and runs jobs submitted over a local HTTP API, on a TCP port or a
+Unix socket.
+
+    POST   /jobs               {"path": "file or directory"} or {"paths": [...]}
+                               -> 202 job summary, 429 when at capacity
+    GET    /jobs/<id>          -> job summary (status, files, done, errors)
+    GET    /jobs/<id>/results  -> job summary and the results completed so far
+    DELETE /jobs/<id>          -> cancels the files not started yet
+    GET    /status             -> queue length, memory and loaded agents
+
+Usage:
+    python -m src.service.server --port 8765 --no-summarization
+    python -m src.service.server --socket /tmp/docintel.sock
+"""
+
+import argparse
+import json
+import os
+import re
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .jobs import AdmissionError, JobManager
+from ..utils.logging import Logger
+
+_JOB_PATH = re.compile(r"^/jobs/([0-9a-f]+)(/results)?$")
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    Maps the HTTP API onto the server's JobManager.
+    """
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            return self._send(404, {"error": "Not found."})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            path = request.get("paths") or request.get("path")
+            if not path:
+                raise ValueError('Expected "path" or "paths".')
+            job = self.server.manager.submit(path)
+        except AdmissionError as e:
+            return self._send(429, {"error": str(e)})
+        except (ValueError, AttributeError) as e:  # Also malformed JSON
+            return self._send(400, {"error": str(e)})
+        self._send(202, self.server.manager.summary(job.id))
+
+    def do_GET(self):
+        manager = self.server.manager
+        if self.path == "/status":
+            return self._send(200, manager.status())
+        match = _JOB_PATH.match(self.path)
+        if match is None:
+            return self._send(404, {"error": "Not found."})
+        job_id, results = match.groups()
+        body = manager.outputs(job_id) if results else manager.summary(job_id)
+        if body is None:
+            return self._send(404, {"error": f"Unknown job {job_id}."})
+        self._send(200, body)
+
+    def do_DELETE(self):
+        match = _JOB_PATH.match(self.path)
+        if match is None or match.group(2):
+            return self._send(404, {"error": "Not found."})
+        body = self.server.manager.cancel(match.group(1))
+        if body is None:
+            return self._send(404, {"error": f"Unknown job {match.group(1)}."})
+        self._send(200, body)
+
+    def _send(self, status: int, body: dict):
+        # Agent outputs may hold values json can't encode (e.g. numpy floats)
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "local"
+
+    def log_message(self, format: str, *args):
+        logger = self.server.logger
+        if logger:
+            logger.info(f"{self.address_string()} {format % args}")
+
+
+class DocumentServer(ThreadingHTTPServer):
+    """
+    HTTP server on a TCP port, one thread per request.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, manager: JobManager, logger: Logger = None):
+        self.manager = manager
+        self.logger = logger
+        super().__init__(address, RequestHandler)
+
+
+class UnixDocumentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    HTTP server on a Unix socket, reachable only through the file system.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, manager: JobManager, logger: Logger = None):
+        self.manager = manager
+        self.logger = logger
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Left over by a previous run
+        super().__init__(socket_path, RequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def serve(
+    options: dict,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: str = None,
+    **manager_options,
+):
+    """
+    Starts the job manager (loading the models) and serves the API until
+    interrupted.
+
+    Parameters:
+    - options (dict): The `use_*` flags and agent settings of
+      `process_documents`.
+    - host (str): Interface to listen on; the default only accepts local
+      connections.
+    - port (int): TCP port.
+    - socket_path (str): Listen on this Unix socket instead of a TCP port.
+    - manager_options: Batching and admission settings, see JobManager.
+    """
+    logger = Logger(name="DocumentServiceLogger")
+    manager = JobManager(options, logger=logger, **manager_options)
+    if socket_path:
+        server = UnixDocumentServer(socket_path, manager, logger=logger)
+        logger.info(f"Serving on {socket_path}")
+    else:
+        server = DocumentServer((host, port), manager, logger=logger)
+        logger.info(f"Serving on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", default=None, help="Unix socket path")
+    parser.add_argument("--no-summarization", action="store_true")
+    parser.add_argument("--no-qa", action="store_true")
+    parser.add_argument("--no-ner", action="store_true")
+    parser.add_argument("--no-table", action="store_true")
+    parser.add_argument("--formulas", action="store_true")
+    parser.add_argument("--question", default="What is the main topic of the document?")
+    parser.add_argument("--regex", default=r"\b[A-Z][a-z]+ [A-Z][a-z]+\b")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--pooled-ocr", action="store_true")
+    parser.add_argument("--smart-ocr", action="store_true")
+    parser.add_argument("--ocr-preprocessing", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument(
+        "--scrape-workers", type=int, default=1, help="Processes scraping files"
+    )
+    parser.add_argument("--max-queued-files", type=int, default=1000)
+    parser.add_argument(
+        "--max-rss-mb", type=int, default=None, help="Refuse jobs above this memory"
+    )
+    args = parser.parse_args()
+
+    options = {
+        "use_text": True,
+        "use_summarization": not args.no_summarization,
+        "use_qa": not args.no_qa,
+        "use_regex": True,
+        "use_ner": not args.no_ner,
+        "use_table": not args.no_table,
+        "use_formula_extraction": args.formulas,
+        "question": args.question,
+        "regex_pattern": args.regex,
+        "cache_dir": args.cache_dir,
+        "cache_max_bytes": 1 << 30,
+        "pooled_ocr": args.pooled_ocr,
+        "smart_ocr": args.smart_ocr,
+        "ocr_preprocessing": args.ocr_preprocessing,
+        "table_engine": "pymupdf",
+        "workers": 1,
+    }
+    serve(
+        options,
+        host=args.host,
+        port=args.port,
+        socket_path=args.socket,
+        batch_size=args.batch_size,
+        scrape_workers=args.scrape_workers,
+        max_queued_files=args.max_queued_files,
+        max_rss_bytes=args.max_rss_mb << 20 if args.max_rss_mb else None,
+    )
+
+
+if __name__ == "__main__":
+    main()
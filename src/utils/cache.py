@@ -0,0 +1,202 @@
+# src/utils/cache.py
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+# Bump when the pickled Document layout or agent outputs change shape, so
+# stale entries are ignored instead of being unpickled into the new code.
+CACHE_VERSION = 8
+
+_MISSING = object()
+
+
+def make_key(*parts) -> str:
+    """
+    Builds a stable cache key from JSON-serializable parts.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def image_digest(image) -> str:
+    """
+    Returns the SHA-256 hex digest of an image file, or of the pixels of an
+    in-memory image (ImageData).
+    """
+    if isinstance(image, (str, os.PathLike)):
+        return file_digest(image)
+    digest = hashlib.sha256(f"{image.width}x{image.height} {image.mode}".encode())
+    digest.update(image.samples)
+    return digest.hexdigest()
+
+
+def document_images_digest(document) -> list:
+    """
+    Digests of a document's images: the in-memory ones, or else the image
+    files (e.g. the input file of an image document).
+    """
+    images = getattr(document, "images", None) or getattr(
+        document, "image_paths", None
+    )
+    return [image_digest(image) for image in images or ()]
+
+
+def text_digest(text: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a text.
+    """
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent, size-bounded pickle cache keyed by content hashes.
+
+    Entries are stored one file per key, so several worker processes can share
+    the same directory. When the total size exceeds `max_bytes`, the least
+    recently used entries are evicted (hits refresh an entry's mtime).
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        """
+        Initializes the cache.
+
+        Parameters:
+        - directory (str): Directory holding the cache entries.
+        - max_bytes (int): Upper bound on the total size of the entries.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".pkl")
+
+    def _entries(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(".pkl"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:  # Evicted by another process
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def get(self, key: str, default=None):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            # Truncated or incompatible entry: drop it and treat as a miss
+            self._remove(path)
+            return default
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key: str, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        self._size += os.path.getsize(path)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        # Rescan: other processes may have added or evicted entries
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        # Evict down to 90% of the budget to avoid evicting on every write
+        target = int(self.max_bytes * 0.9)
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+        self._size = total
+
+    def get_or_compute(self, key: str, compute):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+
+def cached_execute(cache: DiskCache, agent, document, **kwargs):
+    """
+    Runs `agent.execute(document, **kwargs)`, reusing a cached result when the
+    same agent configuration already processed the same text and inputs (see
+    `BaseAgent.cache_inputs`).
+    """
+    if cache is None:
+        return agent.execute(document, **kwargs)
+    key = _agent_key(agent, document, kwargs)
+    return cache.get_or_compute(key, lambda: agent.execute(document, **kwargs))
+
+
+def cached_execute_batch(cache: DiskCache, agent, documents: list, **kwargs) -> list:
+    """
+    Batched `cached_execute`: only the documents without a cached result are
+    passed to `agent.execute_batch`.
+    """
+    if cache is None:
+        return agent.execute_batch(documents, **kwargs)
+    keys = [_agent_key(agent, document, kwargs) for document in documents]
+    results = [cache.get(key, _MISSING) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is _MISSING]
+    if missing:
+        computed = agent.execute_batch([documents[i] for i in missing], **kwargs)
+        for i, result in zip(missing, computed):
+            cache.set(keys[i], result)
+            results[i] = result
+    return results
+
+
+def _agent_key(agent, document, kwargs: dict) -> str:
+    return make_key(
+        "agent",
+        CACHE_VERSION,
+        type(agent).__name__,
+        agent.cache_params(),
+        text_digest(document.get_text()),
+        agent.cache_inputs(document),  # What it reads besides the text
+        document.first_page,  # Page numbers in the output differ per range
+        kwargs,
+    )
@@ -0,0 +1,36 @@
+# src/utils/export.py
+
+import os
+
+SHEET_FORMATS = ("csv", "parquet")
+
+
+def export_sheets(sheets: dict, directory: str, file_format: str = "csv") -> list:
+    """
+    Writes spreadsheet DataFrames to one file per sheet, straight from their
+    columns.
+
+    Parameters:
+    - sheets (dict): DataFrames by sheet name, e.g. `Document.sheets`.
+    - directory (str): Output directory.
+    - file_format (str): "csv" or "parquet" (needs pyarrow or fastparquet).
+
+    Returns:
+    list: Paths of the written files.
+    """
+    if file_format not in SHEET_FORMATS:
+        raise ValueError(f"Unsupported sheet export format: {file_format}")
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for sheet_name, frame in sheets.items():
+        safe_name = "".join(
+            c for c in sheet_name if c.isalnum() or c in (" ", "_", "-")
+        ).strip()
+        file_name = f"sheet_{safe_name or len(paths) + 1}.{file_format}"
+        path = os.path.join(directory, file_name)
+        if file_format == "csv":
+            frame.to_csv(path, index=False)
+        else:
+            frame.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
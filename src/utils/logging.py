@@ -1,14 +1,52 @@
+import atexit
 import logging
+import logging.handlers
+import queue
+import threading
+
+_lock = threading.Lock()
+_queue = None
+_listener = None
+
+
+def _log_queue() -> queue.SimpleQueue:
+    """
+    The process-wide log queue. Records are formatted and written by one
+    listener thread, so logging threads never wait on the stream.
+    """
+    global _queue, _listener
+    with _lock:
+        if _listener is None:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+            _queue = queue.SimpleQueue()
+            _listener = logging.handlers.QueueListener(_queue, handler)
+            _listener.start()
+            atexit.register(_stop_listener)
+        return _queue
+
+
+def _stop_listener():
+    """
+    Writes the queued records and stops the listener thread.
+    """
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
 
 
 class Logger:
     def __init__(self, name: str):
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter("[%(levelname)s] %(message)s")
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        # Loggers are global by name: attach the queue handler only once
+        if not any(
+            isinstance(handler, logging.handlers.QueueHandler)
+            for handler in self.logger.handlers
+        ):
+            self.logger.addHandler(logging.handlers.QueueHandler(_log_queue()))
 
     def info(self, message: str):
         self.logger.info(message)
@@ -0,0 +1,215 @@
+# src/utils/metrics.py
+# Timings, counters and memory of the pipeline stages, exported as Prometheus
+# text files and JSON traces. Disabled by default: the hooks then only check
+# one flag.
+
+import functools
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from .misc import current_rss_bytes
+
+PREFIX = "docintel"
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux: kilobytes
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Metrics:
+    """
+    Thread-safe counters, timers and trace spans of one process.
+    """
+
+    def __init__(self, max_events: int = 100000):
+        """
+        Parameters:
+        - max_events (int): Spans kept for the JSON trace; later ones are only
+          counted.
+        """
+        self.enabled = False
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._timers = {}  # (name, labels) -> [count, sum, max]
+        self._events = []
+        self._dropped_events = 0
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+            self._timers = {}
+            self._events = []
+            self._dropped_events = 0
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            timer = self._timers.setdefault(key, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Times a block: counts calls and errors, adds its duration to the
+        `<name>_seconds` timer and records a trace event with the change in
+        resident memory over the block. The yielded dict
+        can receive more attributes (e.g. page counts) before the block ends.
+        """
+        if not self.enabled:
+            yield attributes
+            return
+        labels = {key: attributes[key] for key in ("component",) if key in attributes}
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as e:
+            attributes["error"] = type(e).__name__
+            self.increment(f"{name}_errors_total", **labels)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self.increment(f"{name}_calls_total", **labels)
+            self.observe(f"{name}_seconds", duration, **labels)
+            # Includes what other threads allocated meanwhile
+            attributes["rss_delta_bytes"] = current_rss_bytes() - rss_before
+            self._record_event(name, start, duration, attributes)
+
+    def _record_event(self, name: str, start: float, duration: float, attributes):
+        event = {
+            "name": name,
+            "ph": "X",  # Chrome trace "complete" event
+            "ts": round((start - self._origin) * 1e6),
+            "dur": round(duration * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": attributes,
+        }
+        with self._lock:
+            if len(self._events) < self.max_events:
+                self._events.append(event)
+            else:
+                self._dropped_events += 1
+
+    def prometheus_text(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {key: list(value) for key, value in self._timers.items()}
+        lines = []
+
+        def metric(name, labels, value):
+            label_text = ",".join(f'{key}="{value}"' for key, value in labels)
+            label_text = "{" + label_text + "}" if label_text else ""
+            lines.append(f"{PREFIX}_{name}{label_text} {value}")
+
+        for (name, labels), value in sorted(counters.items()):
+            metric(name, labels, value)
+        for (name, labels), (count, total, longest) in sorted(timers.items()):
+            metric(f"{name}_count", labels, count)
+            metric(f"{name}_sum", labels, round(total, 6))
+            metric(f"{name}_max", labels, round(longest, 6))
+        metric("process_peak_rss_bytes", (("pid", str(os.getpid())),), _peak_rss_bytes())
+        return "\n".join(lines) + "\n"
+
+    def trace(self) -> dict:
+        """
+        The recorded spans in the Chrome trace event format (viewable in
+        chrome://tracing or Perfetto).
+        """
+        with self._lock:
+            return {
+                "traceEvents": list(self._events),
+                "otherData": {"dropped_events": self._dropped_events},
+            }
+
+    def export(self, directory: str, suffix: str = None):
+        """
+        Writes `metrics-<suffix>.prom` and `trace-<suffix>.json` to
+        `directory` (the suffix defaults to the process id, so the files of
+        several processes can sit side by side, e.g. for a Prometheus
+        textfile collector).
+        """
+        suffix = suffix or str(os.getpid())
+        _write_atomic(
+            os.path.join(directory, f"metrics-{suffix}.prom"), self.prometheus_text()
+        )
+        _write_atomic(
+            os.path.join(directory, f"trace-{suffix}.json"), json.dumps(self.trace())
+        )
+
+
+def _write_atomic(path: str, content: str):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+# Metrics of this process
+METRICS = Metrics()
+
+
+def instrument_methods(cls, kind: str, methods: dict):
+    """
+    Wraps the methods a class defines itself in metrics spans named
+    `<kind>_<method>`. Used by the base classes' `__init_subclass__`, so every
+    scraper, OCR engine and agent is instrumented without changes.
+
+    Parameters:
+    - cls (type): The class whose own methods are wrapped.
+    - kind (str): "scraper", "ocr" or "agent".
+    - methods (dict): Method name -> function(args, result) returning extra
+      span attributes, or None.
+    """
+    for method_name, attributes in methods.items():
+        function = cls.__dict__.get(method_name)
+        if function is None or getattr(function, "__instrumented__", False):
+            continue
+        setattr(cls, method_name, _instrumented(function, kind, method_name, attributes))
+
+
+def _instrumented(function, kind: str, method_name: str, attributes):
+    span_name = f"{kind}_{method_name}"
+
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        if not METRICS.enabled:
+            return function(self, *args, **kwargs)
+        with METRICS.span(span_name, component=type(self).__name__) as span:
+            result = function(self, *args, **kwargs)
+            if attributes is not None:
+                try:
+                    span.update(attributes(args, result))
+                except Exception:  # Attributes must never break the call
+                    pass
+            return result
+
+    wrapper.__instrumented__ = True
+    return wrapper
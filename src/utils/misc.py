@@ -5,3 +5,37 @@ import os
 
 def get_file_extension(file_path: str) -> str:
     return os.path.splitext(file_path)[1]
+
+
+def available_cpu_count() -> int:
+    """
+    Number of CPUs this process may run on (respects affinity / cgroup pinning).
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS / Windows
+        return os.cpu_count() or 1
+
+
+def cores_per_worker(workers: int = None) -> int:
+    """
+    CPUs left to each of `workers` document worker processes for its own
+    thread or process pools.
+    """
+    return max(1, available_cpu_count() // (workers or 1))
+
+
+def current_rss_bytes() -> int:
+    """
+    Resident memory of this process. Falls back to the peak resident memory
+    where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
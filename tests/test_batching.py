@@ -0,0 +1,81 @@
+# tests/test_batching.py
+
+from src.agents.batching import plan_batches, run_batched, token_lengths
+from src.agents.ner_agent import NERAgent
+from src.document import Document
+
+
+class WordTokenizer:
+    """
+    One token per word, truncating like a Hugging Face tokenizer.
+    """
+
+    model_max_length = 8
+
+    def __call__(self, texts, truncation=False, max_length=None, **kwargs):
+        ids = [list(range(len(text.split()))) for text in texts]
+        if truncation:
+            ids = [row[:max_length] for row in ids]
+        return {"input_ids": ids}
+
+
+class FakeNERPipeline:
+    tokenizer = WordTokenizer()
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, batch_size=None):
+        self.batches.append(list(texts))
+        return [
+            [{"word": word, "entity_group": "PER"} for word in text.split()[:1]]
+            for text in texts
+        ]
+
+
+def ner_agent(max_padded_tokens: int) -> NERAgent:
+    agent = NERAgent.__new__(NERAgent)  # Without loading a model
+    agent.max_batch_size = 16
+    agent.max_padded_tokens = max_padded_tokens
+    agent.ner_pipeline = FakeNERPipeline()
+    return agent
+
+
+def test_ner_batches_by_truncated_length():
+    # The pipeline truncates to 8 tokens: two long texts fit one 16-token batch
+    agent = ner_agent(max_padded_tokens=16)
+    documents = [Document(text=f"Name{i} " + "word " * 100) for i in range(2)]
+    assert agent.execute_batch(documents) == [["Name0"], ["Name1"]]
+    assert len(agent.ner_pipeline.batches) == 1
+
+
+def test_batches_group_similar_lengths():
+    lengths = [50, 3, 48, 5, 4, 52]
+    assert plan_batches(lengths, max_batch_size=3) == [[1, 4, 3], [2, 0, 5]]
+
+
+def test_batches_respect_the_padded_token_budget():
+    # Padded to the longest input: 3 x 40 tokens exceed 100, 2 x 40 don't
+    batches = plan_batches([10, 40, 20, 30], max_batch_size=16, max_padded_tokens=100)
+    assert batches == [[0, 2, 3], [1]]
+    # An input longer than the budget still gets a batch of its own
+    assert plan_batches([500, 1], max_padded_tokens=100) == [[1], [0]]
+
+
+def test_run_batched_returns_outputs_in_input_order():
+    inputs = ["ccc", "a", "bb", "dddd"]
+    calls = []
+
+    def run_batch(batch):
+        calls.append(batch)
+        return [text.upper() for text in batch]
+
+    outputs = run_batched(inputs, [len(text) for text in inputs], run_batch, 2)
+    assert outputs == ["CCC", "A", "BB", "DDDD"]
+    assert calls == [["a", "bb"], ["ccc", "dddd"]]
+
+
+def test_token_lengths_are_capped_at_max_length():
+    texts = ["one two three", "a " * 20]
+    assert token_lengths(WordTokenizer(), texts) == [3, 20]
+    assert token_lengths(WordTokenizer(), texts, max_length=8) == [3, 8]
@@ -0,0 +1,63 @@
+# tests/test_cache.py
+
+import os
+from src.agents.base_agent import BaseAgent
+from src.agents.table_extraction_agent import TableExtractionAgent
+from src.document import Document, ImageData
+from src.utils.cache import (
+    DiskCache,
+    cached_execute,
+    cached_execute_batch,
+    document_images_digest,
+)
+
+
+class ImageNameAgent(BaseAgent):
+    """
+    Reads only the images of a document, like the formula agent.
+    """
+
+    def execute(self, document):
+        return [os.path.basename(path) for path in document.image_paths]
+
+    def cache_inputs(self, document):
+        return document_images_digest(document)
+
+
+def test_same_text_different_images_are_cached_apart(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache"))
+    documents = []
+    for name, content in (("x.png", b"first image"), ("y.png", b"second image")):
+        path = tmp_path / name
+        path.write_bytes(content)
+        documents.append(Document("", file_path=str(path), image_paths=[str(path)]))
+
+    agent = ImageNameAgent()
+    assert cached_execute(cache, agent, documents[0]) == ["x.png"]
+    assert cached_execute(cache, agent, documents[1]) == ["y.png"]
+    assert cached_execute_batch(cache, agent, documents) == [["x.png"], ["y.png"]]
+
+
+def test_in_memory_images_are_part_of_the_key():
+    black = ImageData(bytes(4), 2, 2, "L")
+    white = ImageData(b"\xff" * 4, 2, 2, "L")
+    first = Document("", images=[black])
+    second = Document("", images=[white])
+    assert document_images_digest(first) != document_images_digest(second)
+    assert document_images_digest(first) == document_images_digest(
+        Document("", images=[ImageData(bytes(4), 2, 2, "L")])
+    )
+
+
+def test_same_text_different_tables_are_cached_apart(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache"))
+    tables = [
+        [{"page": 1, "table_number": 1, "data": [["a", "b"]]}],
+        [{"page": 1, "table_number": 1, "data": [["c", "d"]]}],
+    ]
+    documents = [
+        Document("Same text", file_path=f"doc{i}.docx", tables=tables[i])
+        for i in range(2)
+    ]
+    agent = TableExtractionAgent()
+    assert [cached_execute(cache, agent, document) for document in documents] == tables
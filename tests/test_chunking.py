@@ -0,0 +1,68 @@
+# tests/test_chunking.py
+
+import re
+import pytest
+from src.agents.chunking import chunk_token_windows, spread_sample
+
+WORD = re.compile(r"\S+")
+
+
+class FastWordTokenizer:
+    """
+    One token per word, with character offsets like a fast tokenizer.
+    """
+
+    is_fast = True
+
+    def __call__(self, text, return_offsets_mapping=False, **kwargs):
+        matches = list(WORD.finditer(text))
+        encoding = {"input_ids": list(range(len(matches)))}
+        if return_offsets_mapping:
+            encoding["offset_mapping"] = [match.span() for match in matches]
+        return encoding
+
+
+class SlowWordTokenizer:
+    is_fast = False
+
+    def __init__(self):
+        self.vocabulary = []
+
+    def __call__(self, text, **kwargs):
+        ids = []
+        for word in WORD.findall(text):
+            if word not in self.vocabulary:
+                self.vocabulary.append(word)
+            ids.append(self.vocabulary.index(word))
+        return {"input_ids": ids}
+
+    def decode(self, ids):
+        return " ".join(self.vocabulary[i] for i in ids)
+
+
+TEXT = "one two  three four\nfive six seven"
+
+
+def test_windows_are_slices_of_the_text_with_overlap():
+    windows = chunk_token_windows(FastWordTokenizer(), TEXT, max_tokens=3, overlap=1)
+    # Original spacing is kept inside a window
+    assert windows == ["one two  three", "three four\nfive", "five six seven"]
+
+
+def test_windows_are_decoded_without_offsets():
+    windows = chunk_token_windows(SlowWordTokenizer(), TEXT, max_tokens=4)
+    assert windows == ["one two three four", "five six seven"]
+
+
+def test_empty_text_and_invalid_overlap():
+    assert chunk_token_windows(FastWordTokenizer(), "  ", max_tokens=3) == []
+    with pytest.raises(ValueError):
+        chunk_token_windows(FastWordTokenizer(), TEXT, max_tokens=3, overlap=3)
+
+
+def test_spread_sample_keeps_both_ends():
+    items = list(range(10))
+    assert spread_sample(items, 4) == [0, 3, 6, 9]
+    assert spread_sample(items, 1) == [0]
+    assert spread_sample(items, 20) == items
+    assert spread_sample(items, 0) == items
@@ -0,0 +1,40 @@
+# tests/test_compare.py
+
+from benchmarks.compare import compare
+
+BASELINE = {
+    "results": {
+        "scrape": {"seconds": 1.0, "peak_rss_mb": 100.0},
+        "ocr": {"seconds": 2.0},
+        "agents": {"seconds": 3.0},
+        "broken": {"error": "RuntimeError: no model"},
+    }
+}
+
+
+def test_failed_or_missing_benchmarks_are_regressions():
+    results = {
+        "results": {
+            "scrape": {"seconds": 1.05, "peak_rss_mb": 100.0},
+            "ocr": {"error": "ValueError: boom"},
+            "broken": {"seconds": 9.0},  # Nothing to compare with
+        }
+    }
+    regressions = compare(results, BASELINE)
+    assert regressions == [
+        {"benchmark": "ocr", "error": "ValueError: boom"},
+        {"benchmark": "agents", "error": "missing from the results"},
+    ]
+
+
+def test_slower_benchmark_is_a_regression():
+    results = {
+        "results": {
+            "scrape": {"seconds": 1.5, "peak_rss_mb": 100.0},
+            "ocr": {"seconds": 2.0},
+            "agents": {"seconds": 3.0},
+        }
+    }
+    [regression] = compare(results, BASELINE)
+    assert regression["benchmark"] == "scrape"
+    assert regression["metric"] == "seconds"
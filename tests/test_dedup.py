@@ -0,0 +1,71 @@
+# tests/test_dedup.py
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.document import Document  # noqa: E402
+from src.pipelines.dedup import DuplicateIndex  # noqa: E402
+from src.pipelines.runner import build_pipeline, run_agents  # noqa: E402
+
+TEXT = (
+    "The lessee shall pay the monthly rent of the premises on the first day of "
+    "every month to the account named by the lessor in writing, and shall "
+    "keep the premises in good repair at their own expense."
+)
+OTHER_TEXT = (
+    "Quarterly revenue grew in every region, driven by new subscriptions and "
+    "lower churn, while operating costs stayed flat thanks to the migration of "
+    "the remaining services to the shared platform last spring."
+)
+
+
+def test_duplicates_reuse_the_outputs_of_their_canonical_document():
+    index = DuplicateIndex(threshold=0.8)
+    assert index.add("a.pdf", TEXT) is None
+    index.remember("a.pdf", {"summary": "Rent terms."})
+
+    canonical, similarity = index.add("b.pdf", TEXT.replace("expense", "cost"))
+    assert canonical == "a.pdf" and similarity >= 0.8
+    assert index.outputs(canonical) == {"summary": "Rent terms."}
+
+
+def test_outputs_of_least_recently_used_canonicals_are_evicted():
+    index = DuplicateIndex(threshold=0.8, max_results=1)
+    index.add("a.pdf", TEXT)
+    index.remember("a.pdf", {"summary": "Rent terms."})
+    index.add("c.pdf", OTHER_TEXT)
+    index.remember("c.pdf", {"summary": "Revenue grew."})
+
+    assert index.outputs("a.pdf") == {}
+    assert index.outputs("c.pdf") == {"summary": "Revenue grew."}
+    # Still indexed: a duplicate is found, its agents just run again
+    assert index.add("b.pdf", TEXT)[0] == "a.pdf"
+
+
+class CountingAgent:
+    def __init__(self):
+        self.seen = []
+
+    def accepts(self, document) -> bool:
+        return True
+
+    def execute_batch(self, documents: list, **kwargs) -> list:
+        self.seen += [document.file_path for document in documents]
+        return [f"output of {document.file_path}" for document in documents]
+
+
+def test_only_text_reading_agents_are_reused():
+    pipeline = build_pipeline({})
+    pipeline.dedup = DuplicateIndex(threshold=0.8)
+    agents = {"summarization_agent": CountingAgent(), "formula_agent": CountingAgent()}
+    items = [
+        (path, Document(text=text, file_path=path), {"agents": {}, "errors": {}})
+        for path, text in (("a.pdf", TEXT), ("b.pdf", TEXT.replace("expense", "cost")))
+    ]
+    run_agents(pipeline, agents, items, {})
+
+    assert agents["summarization_agent"].seen == ["a.pdf"]
+    # Formulas are read from the images, which the duplicate may not share
+    assert agents["formula_agent"].seen == ["a.pdf", "b.pdf"]
+    assert items[1][2]["agents"]["summary"] == "output of a.pdf"
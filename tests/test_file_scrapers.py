@@ -0,0 +1,180 @@
+# tests/test_file_scrapers.py
+
+import io
+import zipfile
+import pytest
+from src.scraper.file_scrapers import DocxScraper, ExcelScraper, _column_names
+
+NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+)
+RELATIONSHIP_TYPE = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+)
+
+
+def test_column_names_fall_back_to_positions_and_stay_unique():
+    header = ["Name", None, "Name", ""]
+    assert _column_names(header, 5) == [
+        "Name",
+        "column_2",
+        "Name_",
+        "column_4",
+        "column_5",
+    ]
+
+
+def write_workbook(path) -> str:
+    openpyxl = pytest.importorskip("openpyxl")
+    pytest.importorskip("pandas")
+    workbook = openpyxl.Workbook()
+    sales = workbook.active
+    sales.title = "Sales"
+    sales.append(["Quarterly sales"])
+    sales.append([])
+    sales.append(["Region", "Units"])
+    sales.append(["North", 120])
+    sales.append([None, 5])  # No first cell: skipped by default
+    sales.append(["South", 80, "estimate"])  # Wider than the header
+    notes = workbook.create_sheet("Notes")
+    notes.append(["Note"])
+    notes.append(["Checked"])
+    workbook.save(path)
+    return str(path)
+
+
+def test_excel_sheets_become_pages_and_dataframes(tmp_path):
+    path = write_workbook(tmp_path / "book.xlsx")
+    document = ExcelScraper().scrape(path)
+
+    assert list(document.sheets) == ["Sales", "Notes"]
+    sales = document.sheets["Sales"]
+    assert list(sales.columns) == ["Region", "Units", "column_3"]
+    assert sales["Region"].tolist() == ["North", "South"]
+    assert sales["Units"].tolist() == [120, 80]
+    assert sales["column_3"].isna().tolist() == [True, False]
+    assert document.page_count == 2
+    assert document.get_page(1) == "North 120\nSouth 80 estimate\n"
+    assert document.rows[1] == ("South", 80, "estimate")
+
+
+def test_excel_header_row_sheets_and_empty_first_cells(tmp_path):
+    path = write_workbook(tmp_path / "book.xlsx")
+    scraper = ExcelScraper(header_row=0, sheets=["Notes"], require_first_cell=False)
+    document = scraper.scrape(path)
+
+    assert list(document.sheets) == ["Notes"]
+    notes = document.sheets["Notes"]
+    assert list(notes.columns) == ["column_1"]
+    assert notes["column_1"].tolist() == ["Note", "Checked"]
+
+
+def paragraph(text: str, image_id: str = None) -> str:
+    drawing = f'<a:blip r:embed="{image_id}"/>' if image_id else ""
+    return f"<w:p><w:r><w:t>{text}</w:t>{drawing}</w:r></w:p>"
+
+
+def table(rows: list) -> str:
+    cells = "".join(
+        "<w:tr>" + "".join(f"<w:tc>{cell}</w:tc>" for cell in row) + "</w:tr>"
+        for row in rows
+    )
+    return f"<w:tbl>{cells}</w:tbl>"
+
+
+def relationships(targets: dict) -> str:
+    entries = "".join(
+        f'<Relationship Id="{rel_id}" Type="{RELATIONSHIP_TYPE}{kind}"'
+        f' Target="{target}"/>'
+        for rel_id, (kind, target) in targets.items()
+    )
+    return (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+        f'relationships">{entries}</Relationships>'
+    )
+
+
+def png_bytes() -> bytes:
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), "white").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def write_report(path, image: bytes = b"") -> str:
+    """
+    A .docx with a header, a paragraph, a nested table, an image and a footer.
+    """
+    body = (
+        paragraph("Quarterly report", image_id="rId4")
+        + table(
+            [
+                [paragraph("Region"), paragraph("Units")],
+                [paragraph("North"), table([[paragraph("120")], [paragraph("5")]])],
+            ]
+        )
+        + paragraph("Signed")
+    )
+    with zipfile.ZipFile(path, "w") as package:
+        package.writestr(
+            "word/document.xml",
+            f"<w:document {NAMESPACES}><w:body>{body}</w:body></w:document>",
+        )
+        package.writestr(
+            "word/_rels/document.xml.rels",
+            relationships(
+                {
+                    "rId1": ("header", "header1.xml"),
+                    "rId2": ("footer", "footer1.xml"),
+                    "rId4": ("image", "media/image1.png"),
+                }
+            ),
+        )
+        package.writestr(
+            "word/header1.xml", f"<w:hdr {NAMESPACES}>{paragraph('ACME')}</w:hdr>"
+        )
+        package.writestr(
+            "word/footer1.xml", f"<w:ftr {NAMESPACES}>{paragraph('Page 1')}</w:ftr>"
+        )
+        package.writestr("word/media/image1.png", image)
+    return str(path)
+
+
+def test_docx_text_in_document_order_with_tables(tmp_path):
+    document = DocxScraper(images=False).scrape(write_report(tmp_path / "r.docx"))
+    assert document.text.split("\n") == [
+        "ACME",
+        "Quarterly report",
+        "Region\tUnits",
+        "North\t120",
+        "5",
+        "Signed",
+        "Page 1",
+    ]
+    # The nested table is flattened into its cell
+    rows = [["Region", "Units"], ["North", "120\n5"]]
+    assert document.tables == [{"page": 1, "table_number": 1, "data": rows}]
+    assert document.rows == [("Region", "Units"), ("North", "120\n5")]
+    assert document.images == []
+
+
+def test_docx_without_headers_and_footers(tmp_path):
+    scraper = DocxScraper(headers_footers=False, images=False)
+    text = scraper.scrape(write_report(tmp_path / "r.docx")).text
+    assert text.startswith("Quarterly report") and text.endswith("Signed")
+
+
+def test_docx_embedded_images(tmp_path):
+    path = write_report(tmp_path / "r.docx", image=png_bytes())
+    [image] = DocxScraper().scrape(path).images
+    assert (image.page, image.index) == (1, 0)
+
+
+def test_docx_undecodable_images_are_logged_and_skipped(tmp_path, caplog):
+    path = write_report(tmp_path / "r.docx", image=b"not an image")
+    with caplog.at_level("ERROR", logger="ScraperLogger"):
+        document = DocxScraper().scrape(path)
+    assert document.images == []
+    assert "Error processing image word/media/image1.png" in caplog.text
@@ -0,0 +1,35 @@
+# tests/test_formula_filter.py
+
+import pytest
+
+pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+from src.agents.formula_filter import looks_like_formula  # noqa: E402
+
+
+def formula_crop(width: int, height: int):
+    """
+    Black 1-pixel strokes on white, like a typeset formula.
+    """
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    for left in range(10, width - 10, 14):
+        draw.line((left, 5, left + 6, height - 6), fill="black")
+        draw.line((left, height // 2, left + 8, height // 2), fill="black")
+    return image
+
+
+def test_wide_one_line_formula_is_kept():
+    # Shrunk to 256 pixels wide, this crop would be 6 pixels high
+    assert looks_like_formula(formula_crop(1000, 25))
+
+
+def test_formula_and_non_formula_images():
+    assert looks_like_formula(formula_crop(300, 120))
+    assert not looks_like_formula(formula_crop(1000, 6))  # A rule, not text
+    assert not looks_like_formula(Image.new("RGB", (400, 100), "white"))
+    photo = Image.linear_gradient("L").resize((300, 200)).convert("RGB")
+    assert not looks_like_formula(photo)
+    assert not looks_like_formula(Image.new("RGB", (300, 200), (200, 30, 30)))
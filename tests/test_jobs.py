@@ -0,0 +1,49 @@
+# tests/test_jobs.py
+
+import time
+from src.service.jobs import CANCELLED, DONE, JobManager
+from tests.utils import write_docx
+
+
+def wait_for(manager: JobManager, job_id: str, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        summary = manager.summary(job_id)
+        if summary["status"] in (DONE, CANCELLED):
+            return summary
+        time.sleep(0.01)
+    return manager.summary(job_id)
+
+
+def test_dispatcher_survives_cancelled_jobs(tmp_path):
+    first = write_docx(tmp_path / "first.docx", "First document")
+    second = write_docx(tmp_path / "second.docx", "Second document")
+    manager = JobManager({"use_text": True}, batch_wait=0.2, warm=False)
+    try:
+        # Cancelled before the dispatcher can take it: its batch comes up empty
+        with manager._condition:
+            cancelled = manager.submit(first)
+            manager.cancel(cancelled.id)
+        time.sleep(0.3)
+
+        job = manager.submit(second)
+        summary = wait_for(manager, job.id)
+        assert summary["status"] == DONE
+        assert summary["errors"] == 0
+        outputs = manager.outputs(job.id)["results"]
+        assert "Second document" in outputs[0]["result"]["text"]
+        assert manager.summary(cancelled.id)["status"] == CANCELLED
+    finally:
+        manager.close()
+
+
+def test_close_stops_the_table_extraction_pools():
+    options = {"use_table": True, "table_engine": "pymupdf"}
+    manager = JobManager(options, warm=False)
+    scraper_tables = manager.pipeline.pdf_scraper.table_extractor
+    agent_tables = manager.agents["table_agent"].extractor
+    scraper_tables._get_executor()  # Started by the first long PDF
+    agent_tables._get_executor()
+    manager.close()
+    assert scraper_tables._executor is None
+    assert agent_tables._executor is None
@@ -0,0 +1,40 @@
+# tests/test_metrics.py
+
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from src.pipelines.runner import init_worker, run_worker_task
+from src.utils.metrics import Metrics
+from tests.utils import write_docx
+
+
+def test_spans_record_memory_growth():
+    metrics = Metrics()
+    metrics.enable()
+    with metrics.span("allocate"):
+        buffer = bytearray(32 << 20)
+        buffer[::4096] = b"x" * len(buffer[::4096])  # Touch every page
+    event = metrics.trace()["traceEvents"][0]
+    assert event["args"]["rss_delta_bytes"] >= 16 << 20
+
+
+def test_pool_workers_export_metrics_once_at_exit(tmp_path):
+    paths = [write_docx(tmp_path / f"doc{i}.docx", f"Document {i}") for i in range(3)]
+    metrics_dir = str(tmp_path / "metrics")
+    options = {"use_text": True, "metrics_dir": metrics_dir}
+    with ProcessPoolExecutor(
+        1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(options,),
+    ) as pool:
+        for path in paths:
+            assert pool.submit(run_worker_task, [path]).result()[0][1] is None
+        assert not os.path.exists(metrics_dir)  # Nothing written per task
+
+    traces = [name for name in os.listdir(metrics_dir) if name.startswith("trace-")]
+    assert len(traces) == 1
+    with open(os.path.join(metrics_dir, traces[0]), encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    assert sum(event["name"] == "scraper_scrape" for event in events) == len(paths)
@@ -0,0 +1,47 @@
+# tests/test_ocr_policy.py
+
+from src.ocr_engines.base_ocr import BaseOCREngine
+from src.scraper.file_scrapers import OCRJob, PDFScraper
+from src.scraper.ocr_policy import OCRPolicy
+
+
+class RecordingOCREngine(BaseOCREngine):
+    def __init__(self):
+        self.images = []
+
+    def perform_ocr(self, image) -> str:
+        self.images.append(image)
+        return f"<{image}>"
+
+
+def parsed_job(hashes: list) -> OCRJob:
+    """
+    A job as a scrape worker returns it: one page, every image pending.
+    """
+    job = OCRJob("report.pdf")
+    job.page_parts = [["Native text. "] + [None] * len(hashes)]
+    job.pending = [
+        (f"image{i}", 0, i + 1, content_hash) for i, content_hash in enumerate(hashes)
+    ]
+    job.stats["ocr_images"] = len(hashes)
+    return job
+
+
+def test_completing_ocr_reuses_texts_learned_after_parsing():
+    # As with a process pool: the worker parsed with an empty policy, this
+    # process' policy already OCRed the first image for another document
+    policy = OCRPolicy()
+    policy.remember("logo", "ACME Corp")
+    engine = RecordingOCREngine()
+    scraper = PDFScraper(ocr_engine=engine, ocr_policy=policy)
+
+    document = scraper.complete_ocr(parsed_job(["logo", "chart", None]))
+    assert document.text == "Native text. ACME Corp<image1><image2>"
+    assert engine.images == ["image1", "image2"]
+    assert document.ocr_stats["ocr_images"] == 2
+    assert document.ocr_stats["reused_text"] == 1
+    assert policy.lookup("chart") == "<image1>"
+
+    # The next document with the same images is not OCRed at all
+    scraper.complete_ocr(parsed_job(["chart", "logo"]))
+    assert engine.images == ["image1", "image2"]
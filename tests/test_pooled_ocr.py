@@ -0,0 +1,33 @@
+# tests/test_pooled_ocr.py
+
+import os
+from src.ocr_engines.pooled_tesseract_ocr import PooledTesseractOCREngine
+from src.pipelines.runner import build_pipeline
+
+
+def test_thread_limit_is_set_when_the_pool_starts(monkeypatch):
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    engine = PooledTesseractOCREngine(workers=2)
+    assert "OMP_THREAD_LIMIT" not in os.environ
+    engine._get_executor()
+    assert os.environ["OMP_THREAD_LIMIT"] == "1"
+    engine.close()
+
+
+def test_thread_limit_can_be_left_alone(monkeypatch):
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    engine = PooledTesseractOCREngine(workers=2, omp_thread_limit=None)
+    engine._get_executor()
+    assert "OMP_THREAD_LIMIT" not in os.environ
+    engine.close()
+
+
+def test_pipeline_close_stops_the_ocr_pool(monkeypatch):
+    monkeypatch.setenv("OMP_THREAD_LIMIT", "4")  # Kept: set by the user
+    pipeline = build_pipeline({"pooled_ocr": True})
+    engine = pipeline.ocr_engine
+    executor = engine._get_executor()
+    pipeline.close()
+    assert engine._executor is None
+    assert executor._shutdown
+    assert os.environ["OMP_THREAD_LIMIT"] == "4"
@@ -0,0 +1,101 @@
+# tests/test_preprocessing.py
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from src.ocr_engines.preprocessing import (  # noqa: E402
+    ImagePreprocessor,
+    estimate_skew,
+    estimate_x_height,
+    ink_bounding_box,
+    otsu_threshold,
+    sauvola,
+    to_gray,
+)
+
+
+def text_lines(x_height: int = 10, lines: int = 5, width: int = 600) -> np.ndarray:
+    """
+    A white page with blocks of "letters": lines of x-height bars with
+    ascenders, as a grayscale array.
+    """
+    line_height = x_height * 3
+    page = np.full((lines * line_height + 80, width), 255, dtype=np.uint8)
+    for line in range(lines):
+        top = 40 + line * line_height + x_height
+        for left in range(40, width - 40, x_height):
+            page[top : top + x_height, left : left + x_height - 3] = 20
+            if left % (4 * x_height) == 0:  # An ascender every few letters
+                page[top - x_height // 2 : top, left : left + 2] = 20
+    return page
+
+
+def test_to_gray_handles_colour_and_transparency():
+    rgba = Image.new("RGBA", (2, 1), (0, 0, 0, 0))
+    rgba.putpixel((1, 0), (255, 0, 0, 255))
+    gray = to_gray(rgba)
+    assert gray.dtype == np.uint8
+    assert gray.tolist() == [[255, 76]]  # Transparent: white; red: its luma
+    assert to_gray(Image.new("L", (3, 2), 7)).tolist() == [[7] * 3] * 2
+
+
+def test_otsu_separates_ink_from_paper():
+    gray = np.array([[20, 30, 200, 210]], dtype=np.uint8)
+    threshold = otsu_threshold(gray)
+    assert 30 < threshold <= 200
+    assert otsu_threshold(np.full((4, 4), 128, dtype=np.uint8)) == 0
+
+
+def test_sauvola_copes_with_uneven_lighting():
+    page = text_lines().astype(np.float64)
+    shade = np.linspace(1.0, 0.25, page.shape[1])  # Darker towards the right
+    gray = (page * shade).astype(np.uint8)
+    ink = sauvola(gray)
+    truth = page < 128
+    assert (ink == truth).mean() > 0.97
+    # A global threshold turns the dark side's paper into ink
+    assert ((gray < otsu_threshold(gray)) == truth).mean() < (ink == truth).mean()
+
+
+def test_skew_and_x_height_are_estimated():
+    page = text_lines(x_height=12)
+    angle, profile = estimate_skew(page < 128)
+    assert angle == 0.0
+    assert estimate_x_height(profile) == pytest.approx(12, abs=1)
+
+    rotated = np.asarray(
+        Image.fromarray(page).rotate(2.0, expand=True, fillcolor=255)
+    )
+    angle, profile = estimate_skew(rotated < 128)
+    assert angle == pytest.approx(2.0, abs=0.5)
+    assert estimate_x_height(profile) == pytest.approx(12, abs=2)
+    assert estimate_x_height(np.zeros(10)) is None
+
+
+def test_ink_bounding_box_ignores_single_pixels():
+    ink = np.zeros((50, 50), dtype=bool)
+    ink[10:20, 15:30] = True
+    ink[45, 2] = True  # Speck
+    assert ink_bounding_box(ink, margin=2) == (13, 8, 32, 22)
+    assert ink_bounding_box(np.zeros((5, 5), dtype=bool)) is None
+
+
+def test_preprocessor_rescales_to_the_target_x_height():
+    page = Image.fromarray(text_lines(x_height=40, lines=3, width=1200))
+    output = ImagePreprocessor(target_x_height=20)(page)
+    assert output.mode == "L"
+    assert set(np.unique(np.asarray(output))) <= {0, 255}
+    # Halved, then cropped to the text plus margins
+    assert output.width < page.width / 2 and output.height < page.height / 2
+    _, profile = estimate_skew(np.asarray(output) == 0, max_angle=0)
+    assert estimate_x_height(profile) == pytest.approx(20, abs=2)
+
+
+def test_preprocessing_steps_can_be_switched_off():
+    page = Image.fromarray(text_lines())
+    preprocessor = ImagePreprocessor(
+        target_x_height=None, binarize=False, deskew=False, crop_margins=False
+    )
+    assert np.array_equal(np.asarray(preprocessor(page)), np.asarray(page))
@@ -0,0 +1,72 @@
+# tests/test_regex_agent.py
+
+import re
+from src.agents.regex_agent import RegexAgent
+from src.document import Document
+
+PAGES = [
+    "Invoice INV-1042 dated 2024-03-01. ",
+    "Contact billing@example.com about INV-1043 by 2024-04-01.",
+]
+
+
+def found(matches: list) -> list:
+    return [(match["pattern"], match["page"], match["match"]) for match in matches]
+
+
+def test_pattern_set_reports_name_page_and_offset():
+    agent = RegexAgent(
+        {
+            "invoice": r"INV-\d+",
+            "date": r"\d{4}-\d{2}-\d{2}",
+            "email": r"(?i)[a-z]+@[a-z]+\.com",
+        }
+    )
+    document = Document(pages=list(PAGES))
+    matches = agent.execute(document)
+    assert found(matches) == [
+        ("invoice", 1, "INV-1042"),
+        ("date", 1, "2024-03-01"),
+        ("email", 2, "billing@example.com"),
+        ("invoice", 2, "INV-1043"),
+        ("date", 2, "2024-04-01"),
+    ]
+    for match in matches:
+        offset = match["offset"]
+        assert document.text[offset : offset + len(match["match"])] == match["match"]
+
+
+def test_scoped_inline_flags_only_apply_to_their_pattern():
+    agent = RegexAgent({"upper": r"(?i)total", "exact": r"Due"})
+    matches = agent.execute(Document(text="TOTAL due Due"))
+    assert found(matches) == [("upper", 1, "TOTAL"), ("exact", 1, "Due")]
+
+
+def test_patterns_that_cannot_be_combined_are_scanned_separately():
+    agent = RegexAgent(
+        {
+            "repeated": r"\b(\w+) \1\b",  # Backreference
+            "year": r"(?P<year>\d{4})",
+            "also_year": r"(?P<year>19\d\d)",  # Same group name
+        }
+    )
+    matches = agent.execute(Document(text="the the report of 1999"))
+    assert found(matches) == [
+        ("repeated", 1, "the the"),
+        ("year", 1, "1999"),
+        ("also_year", 1, "1999"),
+    ]
+
+
+def test_flags_apply_to_every_pattern():
+    agent = RegexAgent({"total": r"total", "due": r"due"}, flags=re.IGNORECASE)
+    assert found(agent.execute(Document(text="Total Due"))) == [
+        ("total", 1, "Total"),
+        ("due", 1, "Due"),
+    ]
+
+
+def test_single_pattern_matches_across_page_breaks():
+    agent = RegexAgent(r"Total due:\s+\d+")
+    document = Document(pages=["Total due:\n", "120 EUR"])
+    assert agent.execute(document) == ["Total due:\n120"]
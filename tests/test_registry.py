@@ -0,0 +1,36 @@
+# tests/test_registry.py
+
+import pytest
+from src.agents import table_extraction_agent
+from src.agents.registry import AgentRegistry
+
+
+def test_failed_agent_construction_is_not_retried(monkeypatch):
+    attempts = []
+    original = table_extraction_agent.TableExtractionAgent.__init__
+
+    def counting_init(self, *args, **kwargs):
+        attempts.append(kwargs)
+        original(self, *args, **kwargs)
+
+    monkeypatch.setattr(
+        table_extraction_agent.TableExtractionAgent, "__init__", counting_init
+    )
+    registry = AgentRegistry({"use_table": True, "table_engine": "camelot"})
+    with pytest.raises(ValueError) as first:
+        registry["table_agent"]
+    with pytest.raises(ValueError) as second:
+        registry["table_agent"]
+    assert second.value is first.value
+    assert len(attempts) == 1
+    assert registry.loaded() == []
+
+
+def test_agents_are_built_once_on_first_use():
+    options = {"use_text": True, "use_regex": True, "regex_pattern": r"\d+"}
+    registry = AgentRegistry(options)
+    assert registry.loaded() == []
+    assert registry["regex_agent"] is registry["regex_agent"]
+    assert registry.loaded() == ["regex_agent"]
+    with pytest.raises(KeyError):
+        registry["qa_agent"]
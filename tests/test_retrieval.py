@@ -0,0 +1,101 @@
+# tests/test_retrieval.py
+
+import math
+import pytest
+from src.agents.qa_agent import QuestionAnsweringAgent
+from src.agents.retrieval import BM25Index, page_passages
+from src.document import Document
+
+# Pages 3-5 of a longer file, as scraped for one shard
+SHARD_PAGES = [
+    "The supplier ships the goods on Monday. ",
+    "Payment is due within thirty days of the invoice. ",
+    "Either party may terminate with written notice. ",
+]
+
+
+class StubTokenizer:
+    def __call__(self, texts, truncation=False, max_length=None):
+        return {"input_ids": [text.split() for text in texts]}
+
+
+class StubReader:
+    """
+    Stands in for the QA model: answers with the passage's first word.
+    """
+
+    tokenizer = StubTokenizer()
+
+    def __call__(self, question, context, batch_size):
+        return [
+            {"answer": text.split()[0], "score": 1.0, "start": 0} for text in context
+        ]
+
+
+def shard() -> Document:
+    return Document(pages=list(SHARD_PAGES), file_path="long.pdf", first_page=3)
+
+
+def test_passages_of_a_shard_keep_file_page_numbers():
+    document = shard()
+    passages = page_passages(document, window_words=4, overlap_words=1)
+    assert {passage["page"] for passage in passages} == {3, 4, 5}
+    for passage in passages:
+        offset = passage["offset"]
+        assert document.text[offset : offset + len(passage["text"])] == passage["text"]
+        assert document.page_for_offset(offset) == passage["page"]
+
+
+def test_passages_overlap_and_stay_within_their_page():
+    document = Document(pages=["a b c d e f g", "h i"])
+    passages = page_passages(document, window_words=4, overlap_words=2)
+    assert [(passage["page"], passage["text"]) for passage in passages] == [
+        (1, "a b c d"),
+        (1, "c d e f"),
+        (1, "e f g"),
+        (2, "h i"),
+    ]
+    with pytest.raises(ValueError):
+        page_passages(document, window_words=4, overlap_words=4)
+
+
+def test_bm25_ranks_rare_terms_higher():
+    index = BM25Index(
+        [
+            "the invoice is due",
+            "the contract ends in march",
+            "the invoice and the contract",
+        ]
+    )
+    assert index.idf("contract") > index.idf("the")
+    ranked = index.search("When does the contract end in March?")
+    assert [passage for passage, _ in ranked] == [1, 2, 0]
+    assert index.search("contract", top_k=1)[0][0] in (1, 2)
+    assert index.search("unknown words") == []
+
+
+def test_bm25_score_matches_the_okapi_formula():
+    texts = ["apple banana apple", "banana cherry", "cherry cherry cherry date"]
+    index = BM25Index(texts, k1=1.2, b=0.75)
+    average_length = 9 / 3
+    idf = math.log(1 + (3 - 1 + 0.5) / (1 + 0.5))  # "apple" is in one passage
+    norm = 1 - 0.75 + 0.75 * 3 / average_length
+    expected = idf * 2 * 2.2 / (2 + 1.2 * norm)
+    [(passage, score)] = index.search("Apple")
+    assert passage == 0
+    assert score == pytest.approx(expected)
+
+
+def test_qa_agent_on_a_shard():
+    agent = QuestionAnsweringAgent.__new__(QuestionAnsweringAgent)
+    agent.qa_pipeline = StubReader()
+    agent.max_batch_size = 16
+    agent.max_padded_tokens = 8192
+    agent.top_k = 1
+    agent.passage_words = 200
+    agent.passage_overlap = 50
+
+    [answers] = agent.execute(shard(), ["When is payment due?"])
+    assert answers[0]["answer"] == "Payment"
+    assert answers[0]["page"] == 4
+    assert answers[0]["offset"] == len(SHARD_PAGES[0])
@@ -0,0 +1,65 @@
+# tests/test_shards.py
+
+from src.document import Document
+from src.pipelines.runner import (
+    _shift_offsets,
+    build_pipeline,
+    merge_shards,
+    page_ranges,
+)
+
+
+def test_page_ranges():
+    assert page_ranges(10, 4) == [(1, 4), (5, 8), (9, 10)]
+    assert page_ranges(8, 4) == [(1, 4), (5, 8)]
+    assert page_ranges(4, 4) == []  # One range: not sharded
+    assert page_ranges(100, None) == []
+
+
+def test_shift_offsets_only_moves_offset_dicts():
+    output = [{"match": "x", "offset": 2}, "plain", {"page": 3}]
+    shifted = _shift_offsets(output, 10)
+    assert shifted == [{"match": "x", "offset": 12}, "plain", {"page": 3}]
+    assert output[0]["offset"] == 2  # Not modified in place
+    assert _shift_offsets(output, 0) is output
+
+
+def shard(pages: list, first_page: int, matches: list, errors: dict = None):
+    document = Document(pages=pages, file_path="long.pdf", first_page=first_page)
+    result = {
+        "text": document.text,
+        "agents": {"regex_matches": matches, "label": f"from {first_page}"},
+        "errors": errors or {},
+    }
+    return result, None, document
+
+
+def merge(*shards) -> tuple:
+    return merge_shards(build_pipeline({}), {}, "long.pdf", list(shards), {})
+
+
+def test_merge_shards_joins_texts_and_moves_offsets():
+    first = shard(["Invoice A. ", "Total 10. "], 1, [{"match": "A", "offset": 8}])
+    second = shard(["Invoice B. "], 3, [{"match": "B", "offset": 8, "page": 3}])
+    result, error = merge(first, second)
+
+    assert error is None
+    text = result["text"]
+    assert text == "Invoice A. Total 10. Invoice B. "
+    assert result["agents"]["regex_matches"] == [
+        {"match": "A", "offset": 8},
+        {"match": "B", "offset": 29, "page": 3},
+    ]
+    assert text[29] == "B"
+    assert result["agents"]["label"] == "from 1"  # First shard's non-list output
+
+
+def test_merge_shards_reports_errors_with_page_ranges():
+    first = shard(["a"], 1, [])
+    second = shard(["b", "c"], 2, [], errors={"table_agent": "no tables"})
+    result, error = merge(first, second)
+    assert error is None
+    assert result["errors"] == {"table_agent": "Pages 2-3: no tables"}
+
+    failed = (None, "Pages 4-5: unreadable", None)
+    assert merge(first, failed) == (None, "Pages 4-5: unreadable")
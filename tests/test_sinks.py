@@ -0,0 +1,130 @@
+# tests/test_sinks.py
+
+import json
+import sqlite3
+import pytest
+from src.pipelines.sinks import (
+    ConcatenatedTextWriter,
+    FolderSink,
+    SQLiteSink,
+    build_sink,
+)
+
+
+def result(text: str, **agents) -> dict:
+    return {"text": text, "agents": agents, "errors": {}}
+
+
+def test_concatenated_text_is_written_in_input_order(tmp_path):
+    path = tmp_path / "all.txt"
+    with ConcatenatedTextWriter(str(path), separator="|") as writer:
+        writer.write(2, "third")
+        writer.write(1, "second")
+        assert not path.exists()  # Waiting for the first document
+        writer.skip(0)  # Failed: nothing to write
+        writer.write(4, "fifth")  # Document 3 is never reported
+    assert path.read_text(encoding="utf-8") == "second|third|fifth|"
+    assert writer.written == 3
+
+
+def test_folder_sink_writes_one_folder_per_document(tmp_path):
+    sink = FolderSink(str(tmp_path))
+    outcome = result("Hello", summary="Greeting.")
+    outcome["errors"]["qa_agent"] = "No question"
+    outcome["duplicate_of"] = {"file": "a.pdf", "similarity": 0.95}
+    sink.write(0, "b?.pdf", outcome)
+    sink.write(1, "c.pdf", error="Unsupported file format.")
+    sink.close()
+
+    folder = tmp_path / "b"
+    assert (folder / "extracted_text.txt").read_text(encoding="utf-8") == "Hello"
+    with open(folder / "agent_results.json", encoding="utf-8") as f:
+        assert json.load(f) == {
+            "summary": "Greeting.",
+            "errors": {"qa_agent": "No question"},
+            "duplicate_of": {"file": "a.pdf", "similarity": 0.95},
+        }
+    assert not (tmp_path / "c").exists()
+
+
+def test_sqlite_sink_writes_documents_and_outputs_in_batches(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    sink = SQLiteSink(path, batch_size=2)
+    sink.write(1, "b.pdf", result("B", summary="Sum B", entities=["Ann"]))
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM documents").fetchone() == (0,)
+    sink.write(0, "a.pdf", error=ValueError("Broken file"))
+    sink.write(2, "c.pdf", result("C"))
+    sink.close()
+
+    with sqlite3.connect(path) as connection:
+        documents = connection.execute(
+            "SELECT input_index, file_name, text, error FROM documents"
+            " ORDER BY input_index"
+        ).fetchall()
+        outputs = connection.execute(
+            "SELECT file_name, agent, output FROM agent_outputs ORDER BY agent"
+        ).fetchall()
+    assert documents == [
+        (0, "a.pdf", None, "Broken file"),
+        (1, "b.pdf", "B", None),
+        (2, "c.pdf", "C", None),
+    ]
+    assert outputs == [
+        ("b.pdf", "entities", '["Ann"]'),
+        ("b.pdf", "summary", '"Sum B"'),
+    ]
+
+
+def test_parquet_sink_appends_row_groups(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    sink = build_sink("parquet", str(tmp_path))
+    sink.batch_size = 1
+    sink.write(0, "a.pdf", result("A", summary="Sum A"))
+    sink.write(1, "b.pdf", error="Broken file")
+    sink.close()
+
+    documents = pq.read_table(str(tmp_path / "documents.parquet"))
+    assert documents.column("file_name").to_pylist() == ["a.pdf", "b.pdf"]
+    assert documents.column("error").to_pylist() == [None, "Broken file"]
+    assert pq.ParquetFile(str(tmp_path / "documents.parquet")).num_row_groups == 2
+    outputs = pq.read_table(str(tmp_path / "agent_outputs.parquet")).to_pylist()
+    assert outputs == [
+        {
+            "input_index": 0,
+            "file_name": "a.pdf",
+            "agent": "summary",
+            "output": '"Sum A"',
+        }
+    ]
+
+
+def test_build_sink(tmp_path):
+    sink = FolderSink(str(tmp_path))
+    assert build_sink(sink, "elsewhere") is sink
+    with pytest.raises(ValueError):
+        build_sink("csv", str(tmp_path))
+
+
+def journal_mode(sink: SQLiteSink) -> str:
+    return sink._connection.execute("PRAGMA journal_mode").fetchone()[0]
+
+
+def test_sqlite_sink_journal_mode_is_configurable(tmp_path):
+    # Queue workers on several nodes share one database: no WAL there
+    sink = build_sink("sqlite", str(tmp_path), journal_mode="DELETE")
+    try:
+        assert journal_mode(sink) == "delete"
+    finally:
+        sink.close()
+
+    sink = SQLiteSink(str(tmp_path / "local.sqlite"))
+    try:
+        assert journal_mode(sink) == "wal"
+    finally:
+        sink.close()
+
+
+def test_sqlite_sink_rejects_unknown_journal_mode(tmp_path):
+    with pytest.raises(ValueError):
+        SQLiteSink(str(tmp_path / "results.sqlite"), journal_mode="OFF; --")
@@ -0,0 +1,38 @@
+# tests/test_staged.py
+
+import os
+import sqlite3
+from src.pipelines.runner import build_agents, build_pipeline
+from src.pipelines.sinks import SQLiteSink
+from src.pipelines.staged import StagedExecutor
+from tests.utils import write_docx
+
+
+def test_pipelined_run_writes_to_sqlite(tmp_path):
+    paths = [write_docx(tmp_path / f"doc{i}.docx", f"Document {i}") for i in range(5)]
+    options = {"use_text": True}
+    errors = []
+    database = os.path.join(tmp_path, "out", "results.sqlite")
+    # Created on this thread; SQLite refuses connections used from others
+    with SQLiteSink(database, batch_size=2) as sink:
+
+        def on_result(index, result, error):
+            errors.append(error)
+            sink.write(index, os.path.basename(paths[index]), result, error)
+
+        executor = StagedExecutor(
+            build_pipeline(options),
+            build_agents(options),
+            options,
+            batch_size=2,
+            report_interval=0,
+        )
+        stats = executor.run(paths, on_result)
+
+    assert errors == [None] * len(paths)
+    assert stats["write"]["done"] == len(paths)
+    with sqlite3.connect(database) as connection:
+        rows = connection.execute(
+            "SELECT file_name, text FROM documents ORDER BY input_index"
+        ).fetchall()
+    assert rows == [(f"doc{i}.docx", f"Document {i}") for i in range(5)]
@@ -0,0 +1,149 @@
+# tests/test_work_queue.py
+
+import os
+from concurrent.futures import Future
+import pytest
+from src.pipelines import work_queue
+from src.pipelines.work_queue import (
+    DONE,
+    FAILED,
+    LEASED,
+    PENDING,
+    WorkQueue,
+    process_queue,
+)
+
+
+def journal_mode(queue: WorkQueue) -> str:
+    return queue._connection.execute("PRAGMA journal_mode").fetchone()[0]
+
+
+def test_queue_defaults_to_rollback_journal(tmp_path):
+    # WAL needs shared memory, which network file systems don't provide
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    try:
+        assert journal_mode(queue) == "delete"
+    finally:
+        queue.close()
+
+
+def test_wal_is_opt_in(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), journal_mode="WAL")
+    try:
+        assert journal_mode(queue) == "wal"
+    finally:
+        queue.close()
+
+
+def test_unknown_journal_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        WorkQueue(str(tmp_path / "queue.sqlite"), journal_mode="WAL; DROP TABLE")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Controls the queue's time.time().
+    """
+    now = [1000.0]
+    monkeypatch.setattr(work_queue.time, "time", lambda: now[0])
+    return now
+
+
+def make_queue(tmp_path, **kwargs) -> WorkQueue:
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), **kwargs)
+    queue.add(["a.pdf", "b.pdf", "c.pdf"])
+    return queue
+
+
+def states(queue: WorkQueue) -> dict:
+    return dict(queue._connection.execute("SELECT path, status FROM files"))
+
+
+def test_files_are_added_once_and_leased_to_one_worker(tmp_path, clock):
+    queue = make_queue(tmp_path)
+    assert queue.add(["a.pdf", "d.pdf"]) == 1
+    first = queue.claim("w1", 2)
+    second = queue.claim("w2", 5)
+    assert [path for _, path, _ in first] == ["a.pdf", "b.pdf"]
+    assert [path for _, path, _ in second] == ["c.pdf", "d.pdf"]
+    assert queue.claim("w3", 5) == []
+    queue.close()
+
+
+def test_expired_leases_are_claimed_again(tmp_path, clock):
+    queue = make_queue(tmp_path, lease_seconds=60)
+    claimed = queue.claim("crashed", 1)
+    clock[0] += 30
+    queue.renew("crashed", [claimed[0][0]])  # Expires at 1090 now
+    clock[0] += 59
+    assert [path for _, path, _ in queue.claim("w2", 1)] == ["b.pdf"]
+    clock[0] += 2
+    [(file_id, path, attempt)] = queue.claim("w2", 1)
+    assert (path, attempt) == ("a.pdf", 2)
+
+    # The crashed worker's late outcome no longer counts
+    assert queue.complete("crashed", [(file_id, path, 1, {}, None)]) == []
+    assert states(queue)["a.pdf"] == LEASED
+    queue.close()
+
+
+def test_failures_are_retried_up_to_max_attempts(tmp_path, clock):
+    queue = make_queue(tmp_path, max_attempts=2)
+    [(file_id, path, attempt)] = queue.claim("w1", 1)
+    assert not queue.is_final(attempt, error="Broken")
+    queue.complete("w1", [(file_id, path, attempt, None, "Broken")])
+    assert states(queue)["a.pdf"] == PENDING
+
+    [(file_id, path, attempt)] = queue.claim("w1", 1)
+    assert attempt == 2 and queue.is_final(attempt, error="Broken")
+    queue.complete("w1", [(file_id, path, attempt, None, "Broken")])
+    assert states(queue)["a.pdf"] == FAILED
+
+    # Agent errors are retried too, then the file is done with its errors
+    [(file_id, path, _)] = queue.claim("w1", 1)
+    result = {"text": "B", "agents": {}, "errors": {"ner_agent": "OOM"}}
+    queue.complete("w1", [(file_id, path, 2, result, None)])
+    assert states(queue)["b.pdf"] == DONE
+    assert queue.progress()["agent_failures"] == {"ner_agent": 1}
+    queue.close()
+
+
+def test_files_crashing_every_attempt_end_up_failed(tmp_path, clock):
+    queue = make_queue(tmp_path, lease_seconds=10, max_attempts=1)
+    queue.claim("crashed", 1)
+    clock[0] += 11
+    assert [path for _, path, _ in queue.claim("w2", 5)] == ["b.pdf", "c.pdf"]
+    assert states(queue)["a.pdf"] == FAILED
+    queue.close()
+
+
+def test_process_queue_retries_and_reports_final_outcomes(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    calls = []
+
+    def submit(paths):
+        calls.append([os.path.basename(path) for path in paths])
+        outcomes = []
+        for path in paths:
+            if path.endswith("b.pdf") and len(calls) == 1:  # Fails once
+                outcomes.append((None, "Flaky"))
+            else:
+                outcomes.append(({"text": path, "agents": {}, "errors": {}}, None))
+        future = Future()
+        future.set_result(outcomes)
+        return future
+
+    reported = []
+    recorded = process_queue(
+        queue,
+        "/data",
+        submit,
+        lambda index, path, result, error: reported.append((path, error)),
+        batch_size=3,
+    )
+    assert calls == [["a.pdf", "b.pdf", "c.pdf"], ["b.pdf"]]
+    assert sorted(reported) == [("a.pdf", None), ("b.pdf", None), ("c.pdf", None)]
+    assert recorded == 4
+    assert queue.progress()["states"][DONE] == 3
+    queue.close()
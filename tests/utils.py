@@ -0,0 +1,17 @@
+# tests/utils.py
+
+import zipfile
+
+DOCUMENT_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/'
+    '2006/main"><w:body><w:p><w:r><w:t>{}</w:t></w:r></w:p></w:body></w:document>'
+)
+
+
+def write_docx(path, text: str) -> str:
+    """
+    Writes a minimal one-paragraph .docx and returns its path.
+    """
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", DOCUMENT_XML.format(text))
+    return str(path)